@@ -12,8 +12,9 @@ logger = logging.getLogger(__name__)
 # Create an application instance
 app = create_app()
 
-# Initialize rate limiter for all APIs
-limiter = Limiter(get_remote_address, app=app, storage_uri="memory://")
+# Initialize rate limiter for all APIs; point RATELIMIT_STORAGE_URI at Redis (e.g. redis://redis:6379/2)
+# so all worker processes share the same counters
+limiter = Limiter(get_remote_address, app=app, storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://"))
 
 # Global Error Handling
 @app.errorhandler(429)  # Rate limit exceeded
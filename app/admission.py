@@ -0,0 +1,239 @@
+import os
+import math
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager, nullcontext
+
+from app.metrics import ADMISSION_IN_USE, ADMISSION_QUEUED, ADMISSION_SHED, ADMISSION_WAIT_SECONDS
+
+# Admission control: bounded concurrency per resource, with load shedding once the wait queue is full
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+ADMISSION_OCR_SLOTS = int(os.getenv("ADMISSION_OCR_SLOTS", str(os.cpu_count() or 1)))
+ADMISSION_OCR_QUEUE = int(os.getenv("ADMISSION_OCR_QUEUE", "4"))
+ADMISSION_QUERY_SLOTS = int(os.getenv("ADMISSION_QUERY_SLOTS", "8"))
+ADMISSION_QUERY_QUEUE = int(os.getenv("ADMISSION_QUERY_QUEUE", "16"))
+ADMISSION_LLM_QUEUE = int(os.getenv("ADMISSION_LLM_QUEUE", "32"))
+# Longest a request waits for a slot before it is shed
+ADMISSION_TIMEOUT = float(os.getenv("ADMISSION_TIMEOUT", "10"))
+ADMISSION_RETRY_AFTER_MAX = int(os.getenv("ADMISSION_RETRY_AFTER_MAX", "60"))
+
+# Lower values are served first. Background work (queued jobs, batches) waits for a slot and is never shed.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+_priority = contextvars.ContextVar("admission_priority", default=PRIORITY_NORMAL)
+
+class Overloaded(Exception):
+    """Raised when a request is shed because a resource is saturated."""
+
+    def __init__(self, pool, retry_after):
+        super().__init__(f"Server busy ({pool}), retry in {retry_after}s")
+        self.pool = pool
+        self.retry_after = retry_after
+
+def current_priority():
+    """Returns the priority of the work running in this context."""
+    return _priority.get()
+
+@contextmanager
+def priority(level):
+    """Runs a block at the given priority; nested pool acquisitions (e.g. LLM calls) inherit it."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+class AdmissionPool:
+    """
+    Counting semaphore with a priority-ordered wait queue.
+
+    Free slots go to the waiter with the lowest priority value (FIFO within
+    a priority). A request arriving while max_queue others are already
+    waiting is shed right away, and one that waits longer than timeout is
+    shed as well, both with an Overloaded carrying a Retry-After estimate.
+    max_queue=None disables shedding, so the pool only bounds concurrency.
+    """
+
+    def __init__(self, name, slots, max_queue=None, timeout=None):
+        self.name = name
+        self.slots = max(1, slots)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._hold_seconds = 1.0  # moving average of how long a slot is held
+
+    @property
+    def in_use(self):
+        return self._in_use
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    def retry_after(self):
+        """Seconds until the queue ahead of a new request has likely drained."""
+        estimate = self._hold_seconds * (len(self._waiters) + 1) / self.slots
+        return max(1, min(ADMISSION_RETRY_AFTER_MAX, math.ceil(estimate)))
+
+    def _shed(self):
+        ADMISSION_SHED.inc(pool=self.name)
+        return Overloaded(self.name, self.retry_after())
+
+    def check(self, level=None):
+        """Sheds a request up front if it would not be admitted, before any work is done for it."""
+        level = current_priority() if level is None else level
+        if level < PRIORITY_BACKGROUND and self.max_queue is not None:
+            with self._cond:
+                if self._in_use >= self.slots and len(self._waiters) >= self.max_queue:
+                    raise self._shed()
+
+    def acquire(self, level=None):
+        """
+        Takes a slot, waiting behind higher-priority requests.
+
+        Args:
+            level (int): Request priority; defaults to current_priority().
+
+        Raises:
+            Overloaded: If the request is shed.
+        """
+        level = current_priority() if level is None else level
+        sheddable = level < PRIORITY_BACKGROUND and self.max_queue is not None
+        start = time.perf_counter()
+        with self._cond:
+            if self._in_use < self.slots and not self._waiters:
+                self._take(start)
+                return
+            if sheddable and len(self._waiters) >= self.max_queue:
+                raise self._shed()
+
+            entry = (level, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            ADMISSION_QUEUED.set(len(self._waiters), pool=self.name)
+            deadline = start + self.timeout if sheddable and self.timeout is not None else None
+            try:
+                while self._in_use >= self.slots or self._waiters[0] != entry:
+                    remaining = None if deadline is None else deadline - time.perf_counter()
+                    if remaining is not None and remaining <= 0:
+                        raise self._shed()
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                ADMISSION_QUEUED.set(len(self._waiters), pool=self.name)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiters)
+            ADMISSION_QUEUED.set(len(self._waiters), pool=self.name)
+            self._take(start)
+            # Another slot may still be free for the next waiter
+            self._cond.notify_all()
+
+    def _take(self, start):
+        self._in_use += 1
+        ADMISSION_IN_USE.set(self._in_use, pool=self.name)
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start, pool=self.name)
+
+    def release(self, held_seconds=None):
+        with self._cond:
+            self._in_use -= 1
+            ADMISSION_IN_USE.set(self._in_use, pool=self.name)
+            if held_seconds is not None:
+                self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * held_seconds
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, level=None):
+        """Holds a slot for the duration of a block."""
+        self.acquire(level)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def slot_releaser(self, level=None):
+        """
+        Takes a slot now and returns the function that gives it back, for
+        work that outlives the current call (e.g. a streamed response).
+        """
+        self.acquire(level)
+        start = time.perf_counter()
+        released = threading.Event()
+
+        def release():
+            if not released.is_set():
+                released.set()
+                self.release(time.perf_counter() - start)
+        return release
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+_POOL_SETTINGS = {
+    "ocr": lambda: (ADMISSION_OCR_SLOTS, ADMISSION_OCR_QUEUE),
+    "query": lambda: (ADMISSION_QUERY_SLOTS, ADMISSION_QUERY_QUEUE),
+}
+
+def get_pool(name):
+    """Returns the process-wide pool for "ocr" or "query", creating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            slots, max_queue = _POOL_SETTINGS[name]()
+            pool = _pools[name] = AdmissionPool(name, slots, max_queue, ADMISSION_TIMEOUT)
+        return pool
+
+def admit(name, level=None):
+    """
+    Holds a slot of the named pool for a block, running it at the given priority.
+
+    Returns a no-op context when ADMISSION_ENABLED is off.
+
+    Raises:
+        Overloaded: If the request is shed.
+    """
+    if not ADMISSION_ENABLED:
+        return nullcontext()
+    return _admitted(get_pool(name), level)
+
+@contextmanager
+def _admitted(pool, level):
+    level = current_priority() if level is None else level
+    with priority(level), pool.slot(level):
+        yield
+
+def check_admission(name, level=None):
+    """Sheds a request before its body is read if the named pool is already saturated."""
+    if ADMISSION_ENABLED:
+        get_pool(name).check(level)
+
+def admit_streaming(name, level=None):
+    """
+    Takes a slot for a response that is produced after the view returns.
+
+    Returns:
+        callable: Releases the slot; pass it to Response.call_on_close.
+    """
+    if not ADMISSION_ENABLED:
+        return lambda: None
+    return get_pool(name).slot_releaser(level)
+
+def init_admission(app):
+    """Answers shed requests with 503 and a Retry-After header."""
+    from flask import jsonify
+
+    @app.errorhandler(Overloaded)
+    def _overloaded(e):
+        response = jsonify({"error": "Server is busy, please retry shortly.", "retry_after": e.retry_after})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response
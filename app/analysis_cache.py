@@ -0,0 +1,200 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+
+from app import db
+from app.models import AnalysisCache
+from app.parser import PARSER_VERSION
+from app.parser.ocr_engine import resolved_engine_name, OCR_DPI
+from app.llm_operations.llm import PROMPT_VERSION, ANALYSIS_MODEL
+from app.metrics import CACHE_EVENTS
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.getcwd(), "cache", "analysis"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_DB_ENABLED = os.getenv("CACHE_DB_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Hit/miss counters, exposed through cache_stats()
+_stats = {"hits": 0, "disk_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+    CACHE_EVENTS.inc(amount, cache="analysis", event=name)
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """
+    Hashes a file without reading it into memory at once.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        str: Hex SHA-256 digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(content_hash):
+    """
+    Builds the cache key for a file hash under the current parser, OCR setup and prompt.
+
+    Args:
+        content_hash (str): Hex SHA-256 of the uploaded file.
+
+    Returns:
+        str: Cache key; changes whenever the parser, OCR engine or resolution, prompt or model changes.
+    """
+    parser = f"{PARSER_VERSION}:{resolved_engine_name()}:{OCR_DPI}"
+    version = hashlib.sha256(f"{parser}:{PROMPT_VERSION}:{ANALYSIS_MODEL}".encode()).hexdigest()[:12]
+    return f"{content_hash}-{version}"
+
+class DiskLRUCache:
+    """
+    Size-bounded JSON cache on disk with least-recently-used eviction.
+
+    Each entry is one file; its modification time is refreshed on every hit,
+    and the oldest files are removed once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        return [entry for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith(".json")]
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # Mark as recently used
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error reading cache entry {key}: {e}")
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)  # Atomic, so readers never see a partial entry
+        with self._lock:
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Re-scan the directory: other worker processes share it
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        self._size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+                self._size -= size
+                _count("evictions")
+            except FileNotFoundError:
+                continue
+
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+def get_disk_cache():
+    """Returns the process-wide disk cache, creating it on first use."""
+    global _disk_cache
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            _disk_cache = DiskLRUCache(CACHE_DIR, CACHE_MAX_BYTES)
+        return _disk_cache
+
+def get_cached_analysis(key):
+    """
+    Looks up the extracted text and structured data for a cache key.
+
+    Args:
+        key (str): Key from cache_key().
+
+    Returns:
+        dict: {"text": ..., "structured_data": ...} on a hit, otherwise None.
+    """
+    if not CACHE_ENABLED:
+        return None
+
+    entry = get_disk_cache().get(key)
+    if entry is not None:
+        _count("hits")
+        _count("disk_hits")
+        return entry
+
+    if CACHE_DB_ENABLED:
+        try:
+            row = db.session.get(AnalysisCache, key)
+        except Exception as e:
+            print(f"Error reading analysis cache table: {e}")
+            row = None
+        if row is not None:
+            entry = {"text": row.text_content, "structured_data": row.structured_data}
+            get_disk_cache().set(key, entry)
+            _count("hits")
+            _count("db_hits")
+            return entry
+
+    _count("misses")
+    return None
+
+def store_analysis(key, text, structured_data):
+    """
+    Stores the extracted text and structured data for a cache key.
+
+    Args:
+        key (str): Key from cache_key().
+        text (str): Extracted resume text.
+        structured_data (dict): Parsed LLM analysis.
+    """
+    if not CACHE_ENABLED:
+        return
+    try:
+        get_disk_cache().set(key, {"text": text, "structured_data": structured_data})
+        _count("stores")
+    except (OSError, TypeError) as e:
+        print(f"Error writing cache entry {key}: {e}")
+
+    if CACHE_DB_ENABLED:
+        try:
+            db.session.merge(AnalysisCache(key=key, text_content=text, structured_data=structured_data))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error writing analysis cache table: {e}")
+
+def cache_stats():
+    """Returns a snapshot of the cache counters."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
@@ -0,0 +1,185 @@
+import os
+import zipfile
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.utils import secure_filename
+
+from app.analysis_cache import file_sha256
+from app.db_operations import save_candidates
+from app.pipeline import prepare_document, IngestionError
+from app.admission import priority, PRIORITY_BACKGROUND
+
+# Configure Logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_FILE_BYTES = int(os.getenv("BATCH_MAX_FILE_BYTES", str(20 * 1024 * 1024)))
+BATCH_DB_SIZE = int(os.getenv("BATCH_DB_SIZE", "100"))
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+class BatchError(Exception):
+    """Raised when a batch upload cannot be accepted at all."""
+
+def _unique_name(filename, seen):
+    """Renames filename (cv.pdf -> cv-1.pdf, ...) if it was already used in this batch."""
+    base, ext = os.path.splitext(filename)
+    candidate, counter = filename, 1
+    while candidate in seen:
+        candidate = f"{base}-{counter}{ext}"
+        counter += 1
+    seen.add(candidate)
+    return candidate
+
+def _copy_limited(src, filepath, max_bytes):
+    """
+    Copies a binary stream to filepath in chunks, giving up past max_bytes.
+
+    Returns:
+        bool: True if the whole stream was copied; otherwise the partial file is removed.
+    """
+    written = 0
+    with open(filepath, "wb") as dst:
+        while True:
+            chunk = src.read(1024 * 1024)
+            if not chunk:
+                return True
+            written += len(chunk)
+            if written > max_bytes:
+                break
+            dst.write(chunk)
+    os.unlink(filepath)
+    return False
+
+def unpack_zip(archive, upload_folder):
+    """
+    Writes the supported CVs of a zip archive into the upload folder.
+
+    Args:
+        archive (file-like): The uploaded zip archive.
+        upload_folder (str): Directory the extracted files are written to.
+
+    Returns:
+        list: (filename, filepath) for extracted files and (filename, None) for
+        skipped members, in archive order.
+    """
+    try:
+        zf = zipfile.ZipFile(archive)
+    except zipfile.BadZipFile:
+        raise BatchError("Invalid zip archive")
+
+    entries = []
+    seen = set()
+    with zf:
+        members = [info for info in zf.infolist()
+                   if not info.is_dir() and not info.filename.startswith("__MACOSX/")]
+        if len(members) > BATCH_MAX_FILES:
+            raise BatchError(f"Too many files in batch (limit {BATCH_MAX_FILES})")
+        for info in members:
+            filename = secure_filename(os.path.basename(info.filename))
+            # Check the declared size before inflating anything
+            if not filename.lower().endswith(SUPPORTED_EXTENSIONS) or info.file_size > BATCH_MAX_FILE_BYTES:
+                entries.append((filename or info.filename, None))
+                continue
+            filename = _unique_name(filename, seen)
+            filepath = os.path.join(upload_folder, filename)
+            # The declared size may lie; the copy enforces the limit on the inflated data too
+            with zf.open(info) as src:
+                copied = _copy_limited(src, filepath, BATCH_MAX_FILE_BYTES)
+            entries.append((filename, filepath if copied else None))
+    return entries
+
+def save_uploaded_files(files, upload_folder):
+    """
+    Stores the files of a multi-file form in the upload folder.
+
+    Args:
+        files (list): werkzeug FileStorage objects.
+        upload_folder (str): Directory the files are written to.
+
+    Returns:
+        list: (filename, filepath) for stored files and (filename, None) for skipped
+        ones (unsupported type, or larger than BATCH_MAX_FILE_BYTES).
+    """
+    if len(files) > BATCH_MAX_FILES:
+        raise BatchError(f"Too many files in batch (limit {BATCH_MAX_FILES})")
+    entries = []
+    seen = set()
+    for file in files:
+        filename = secure_filename(file.filename or "")
+        if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            entries.append((file.filename, None))
+            continue
+        filename = _unique_name(filename, seen)
+        filepath = os.path.join(upload_folder, filename)
+        copied = _copy_limited(file.stream, filepath, BATCH_MAX_FILE_BYTES)
+        entries.append((filename, filepath if copied else None))
+    return entries
+
+def ingest_batch(app, entries, workers=None):
+    """
+    Ingests many stored uploads at once.
+
+    Files are deduplicated by content hash, extracted and analyzed on a
+    bounded thread pool, and the resulting Resume rows are written in
+    batched transactions.
+
+    Args:
+        app (Flask): Application providing the context for worker threads.
+        entries (list): (filename, filepath) pairs; filepath None marks a skipped file.
+        workers (int): Number of concurrent documents; defaults to BATCH_WORKERS.
+
+    Returns:
+        list: One manifest entry per input file, in input order.
+    """
+    manifest = []
+    unique = {}  # content hash -> index of the first manifest entry with it
+    jobs = []
+
+    for filename, filepath in entries:
+        entry = {"filename": filename, "status": None, "error": None}
+        manifest.append(entry)
+        if filepath is None:
+            entry.update(status="skipped", error="Unsupported or oversized file")
+            continue
+        content_hash = file_sha256(filepath)
+        entry["sha256"] = content_hash
+        if content_hash in unique:
+            entry.update(status="duplicate", duplicate_of=manifest[unique[content_hash]]["filename"])
+            continue
+        unique[content_hash] = len(manifest) - 1
+        jobs.append((entry, filepath, content_hash))
+
+    def prepare(job):
+        entry, filepath, content_hash = job
+        with app.app_context(), priority(PRIORITY_BACKGROUND):
+            try:
+                return entry, prepare_document(filepath, entry["filename"], content_hash=content_hash)
+            except IngestionError as e:
+                entry.update(status="failed", error=e.message)
+            except Exception as e:
+                logger.error(f"Error processing {entry['filename']} in batch: {str(e)}")
+                entry.update(status="failed", error=str(e))
+            return entry, None
+
+    candidates = []
+    with ThreadPoolExecutor(max_workers=max(1, workers or BATCH_WORKERS)) as executor:
+        for entry, document in executor.map(prepare, jobs):
+            if document is not None:
+                entry["status"] = "cached" if document["cached"] else "processed"
+                if document.get("near_duplicate"):
+                    entry["near_duplicate"] = document["near_duplicate"]
+                candidates.append((document["filename"], document["text"], document["structured_data"],
+                                   document.get("analysis_version")))
+
+    with app.app_context():
+        failed = set(save_candidates(candidates, batch_size=BATCH_DB_SIZE))
+    for entry in manifest:
+        if entry["filename"] in failed and entry["status"] in ("processed", "cached"):
+            entry.update(status="failed", error="Failed to save to database")
+
+    logger.info(f"Batch ingested {len(candidates) - len(failed)} of {len(entries)} files")
+    return manifest
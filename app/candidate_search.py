@@ -0,0 +1,143 @@
+import re
+import base64
+import logging
+
+from app import db
+from app.models import Resume, ResumeSkill, ResumeEmployer, ResumeEducation, resume_query, resume_summaries
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 100
+
+_YEAR_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
+
+def normalize(value, max_length=200):
+    """Lowercases and collapses whitespace so lookups match regardless of formatting."""
+    return " ".join(str(value).lower().split())[:max_length]
+
+def _flatten_skills(skills):
+    if isinstance(skills, str):
+        return [part for part in re.split(r"[,;\n]", skills)]
+    if isinstance(skills, dict):
+        # Grouped skills, e.g. {"languages": [...], "tools": [...]}
+        return [skill for group in skills.values() for skill in _flatten_skills(group)]
+    if isinstance(skills, list):
+        flat = []
+        for skill in skills:
+            if isinstance(skill, dict):
+                skill = skill.get("name") or skill.get("skill") or ""
+            flat.extend(_flatten_skills(skill) if isinstance(skill, (list, dict)) else [skill])
+        return flat
+    return []
+
+def _entries(value):
+    if isinstance(value, dict):
+        return [value]
+    return [entry for entry in value or [] if isinstance(entry, dict)]
+
+def graduation_year(value):
+    """Parses the last four-digit year out of strings like "2015 - 2019" or "May 2019"."""
+    years = _YEAR_RE.findall(str(value or ""))
+    return int(years[-1]) if years else None
+
+def sync_facets(resume):
+    """
+    Rewrites the normalized skill, employer and education rows of a resume.
+
+    Runs inside the caller's transaction; the resume must have an ID (flush first).
+
+    Args:
+        resume (Resume): The row whose JSON columns are mirrored.
+    """
+    for model in (ResumeSkill, ResumeEmployer, ResumeEducation):
+        model.query.filter_by(resume_id=resume.id).delete(synchronize_session=False)
+
+    skills = {normalize(skill, 120) for skill in _flatten_skills(resume.skills)}
+    rows = [ResumeSkill(resume_id=resume.id, name=skill) for skill in sorted(skills) if skill]
+    for job in _entries(resume.work_experience):
+        if job.get("company"):
+            rows.append(ResumeEmployer(resume_id=resume.id, company=normalize(job["company"]),
+                                       job_title=normalize(job.get("jobTitle") or "") or None))
+    for degree in _entries(resume.education):
+        rows.append(ResumeEducation(resume_id=resume.id,
+                                    institution=normalize(degree.get("institution") or "") or None,
+                                    degree=normalize(degree.get("degree") or "") or None,
+                                    graduation_year=graduation_year(degree.get("yearOfGraduation"))))
+    db.session.add_all(rows)
+
+def backfill_facets(batch_size=500):
+    """
+    Builds the facet rows for every stored resume, e.g. after the tables were added.
+
+    Returns:
+        int: Number of resumes processed.
+    """
+    count = 0
+    last_id = 0
+    while True:
+        batch = (resume_query(Resume.id, Resume.skills, Resume.work_experience, Resume.education)
+                 .filter(Resume.id > last_id)
+                 .order_by(Resume.id).limit(batch_size).all())
+        if not batch:
+            break
+        for resume in batch:
+            sync_facets(resume)
+        db.session.commit()
+        count += len(batch)
+        last_id = batch[-1].id
+    logger.info(f"Backfilled facets for {count} resumes")
+    return count
+
+def encode_cursor(resume_id):
+    return base64.urlsafe_b64encode(str(resume_id).encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def search_candidates(skills=None, company=None, graduated_after=None, graduated_before=None,
+                      limit=20, cursor=None):
+    """
+    Answers structured candidate questions straight from the database.
+
+    All filters are combined with AND; each one is an indexed lookup on a
+    facet table. Results are ordered by resume ID and paginated with a
+    keyset cursor, so deep pages cost the same as the first one.
+
+    Args:
+        skills (list): Skills the candidate must all have.
+        company (str): Employer name prefix.
+        graduated_after (int): Graduation year strictly after this year.
+        graduated_before (int): Graduation year strictly before this year.
+        limit (int): Page size, capped at MAX_PAGE_SIZE.
+        cursor (str): Cursor returned with the previous page.
+
+    Returns:
+        tuple: (list of Resume rows, cursor for the next page or None).
+    """
+    limit = max(1, min(limit or 20, MAX_PAGE_SIZE))
+    query = resume_summaries()
+
+    for skill in skills or []:
+        query = query.filter(Resume.id.in_(
+            db.select(ResumeSkill.resume_id).where(ResumeSkill.name == normalize(skill, 120))))
+    if company:
+        query = query.filter(Resume.id.in_(
+            db.select(ResumeEmployer.resume_id).where(ResumeEmployer.company.startswith(normalize(company), autoescape=True))))
+    if graduated_after is not None or graduated_before is not None:
+        degrees = db.select(ResumeEducation.resume_id)
+        if graduated_after is not None:
+            degrees = degrees.where(ResumeEducation.graduation_year > graduated_after)
+        if graduated_before is not None:
+            degrees = degrees.where(ResumeEducation.graduation_year < graduated_before)
+        query = query.filter(Resume.id.in_(degrees))
+
+    if cursor:
+        query = query.filter(Resume.id > decode_cursor(cursor))
+
+    # Fetch one extra row to know whether there is a next page
+    rows = query.order_by(Resume.id).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
@@ -0,0 +1,5 @@
+# Entry point for Celery workers: celery -A app.celery_worker.celery worker
+from app import create_app, celery
+import app.jobs  # noqa: F401 - registers the ingestion task
+
+flask_app = create_app()
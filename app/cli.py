@@ -0,0 +1,84 @@
+import click
+
+def register_cli(app):
+    """Registers the management commands (`flask <command>`) of the application."""
+
+    @app.cli.command("backfill-facets")
+    def backfill_facets_command():
+        """Build the skill/employer/education search tables for existing resumes."""
+        from app.candidate_search import backfill_facets
+        count = backfill_facets()
+        click.echo(f"Backfilled facets for {count} resumes")
+
+    @app.cli.command("export-candidates")
+    @click.option("--format", "fmt", type=click.Choice(["jsonl", "csv"]), default="jsonl", show_default=True)
+    @click.option("--fields", default="", help="Comma-separated columns (default: all but text_content).")
+    @click.option("--created-after", default="", help="ISO date/datetime, inclusive.")
+    @click.option("--created-before", default="", help="ISO date/datetime, exclusive.")
+    @click.option("--updated-after", default="", help="ISO date/datetime, inclusive.")
+    @click.option("--updated-before", default="", help="ISO date/datetime, exclusive.")
+    @click.option("--output", "-o", type=click.File("w", encoding="utf-8"), default="-",
+                  help="Output file (default: stdout).")
+    def export_candidates_command(fmt, fields, created_after, created_before, updated_after, updated_before, output):
+        """Stream every candidate as JSON lines or CSV."""
+        from app.export import parse_fields, parse_date, export_chunks
+        try:
+            fields = parse_fields(fields)
+            filters = {
+                "created_after": parse_date(created_after),
+                "created_before": parse_date(created_before),
+                "updated_after": parse_date(updated_after),
+                "updated_before": parse_date(updated_before),
+            }
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+        for chunk in export_chunks(fmt, fields, **filters):
+            output.write(chunk)
+
+    @app.cli.command("reanalyze")
+    @click.option("--all", "redo_all", is_flag=True, help="Redo resumes already analyzed with the current version.")
+    @click.option("--filename", default="", help="Only the resume with exactly this filename.")
+    @click.option("--filename-like", default="",
+                  help="SQL LIKE pattern on the filename, e.g. '2023-%'; '%' and '_' are wildcards "
+                       "(escape with a backslash).")
+    @click.option("--updated-before", default="", help="ISO date/datetime, exclusive.")
+    @click.option("--concurrency", type=int, default=None, help="Resumes analyzed at once (REANALYZE_CONCURRENCY).")
+    @click.option("--batch-size", type=int, default=None, help="Resumes per transaction (REANALYZE_BATCH_SIZE).")
+    @click.option("--checkpoint", default=None, help="Checkpoint file (REANALYZE_CHECKPOINT).")
+    @click.option("--restart", is_flag=True, help="Ignore an existing checkpoint and retry failed resumes.")
+    @click.option("--dry-run", is_flag=True, help="Only count the resumes and estimate the LLM requests and tokens.")
+    @click.option("--sample", type=int, default=0, help="Re-analyze this many resumes and report changes, without saving.")
+    def reanalyze_command(redo_all, filename, filename_like, updated_before, concurrency, batch_size, checkpoint, restart,
+                          dry_run, sample):
+        """Re-run the LLM analysis on stored resume text after a prompt or model change."""
+        from app.export import parse_date
+        from app.reanalysis import reanalyze, estimate, sample as sample_resumes
+        from app.llm_operations.llm import ANALYSIS_VERSION
+        try:
+            filters = {"redo_all": redo_all, "filename": filename or None, "filename_like": filename_like or None,
+                       "updated_before": parse_date(updated_before)}
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+
+        if dry_run:
+            totals = estimate(batch_size=batch_size, **filters)
+            click.echo(f"{totals['resumes']} resumes to re-analyze with version {ANALYSIS_VERSION}: "
+                       f"{totals['requests']} LLM requests, ~{totals['prompt_tokens']} prompt tokens")
+            return
+        if sample:
+            for entry in sample_resumes(sample, concurrency=concurrency, **filters):
+                outcome = f"error: {entry['error']}" if "error" in entry else \
+                    f"changed: {', '.join(entry['changed']) or 'nothing'}"
+                click.echo(f"{entry['id']}\t{entry['filename']}\t{outcome}")
+            return
+
+        def report(done, failed, total, rate):
+            left = max(total - done - failed, 0)
+            eta = f"{left / rate:.0f}s" if rate else "?"
+            click.echo(f"{done + failed}/{total} processed ({failed} failed), {rate:.1f} resumes/s, ETA {eta}")
+
+        result = reanalyze(concurrency=concurrency, batch_size=batch_size, checkpoint=checkpoint,
+                           restart=restart, progress=report, **filters)
+        click.echo(f"Re-analyzed {result['done']} resumes, {len(result['failed'])} failed")
+        if result["failed"]:
+            click.echo(f"Failed resume IDs: {', '.join(map(str, result['failed']))}")
@@ -1,34 +1,122 @@
-from app.models import Resume
+from app.models import Resume, ANALYSIS_FIELDS, resume_query
 from app import db
+from app.search import index_resumes
+from app.candidate_search import sync_facets
+from app.query_cache import bump_corpus_generation
+from app.metrics import timed, STAGE_ERRORS
+from app.llm_operations.llm import ANALYSIS_VERSION
 import logging
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def save_candidate(filename,text,structured_data):
-    """ Save a candidate's information to the database """
+def _resume_values(filename, text, structured_data, analysis_version=None):
+    """ Column values of a Resume row for an extracted text and analysis (by default from the current prompt/model) """
+    values = {"filename": filename, "text_content": text, "analysis_version": analysis_version or ANALYSIS_VERSION}
+    for column, field in ANALYSIS_FIELDS.items():
+        values[column] = structured_data.get(field, {})
+    return values
+
+def upsert_resumes(rows):
+    """
+    Inserts or updates resumes by filename in a single statement.
+
+    Uses INSERT ... ON CONFLICT (filename) DO UPDATE ... RETURNING on
+    PostgreSQL and SQLite, so concurrent uploads of the same filename cannot
+    race between a SELECT and an INSERT. Other databases fall back to a
+    SELECT followed by ORM inserts/updates. Runs inside the caller's
+    transaction.
+
+    Args:
+        rows (list): Column value dictionaries (see _resume_values); filenames must be unique.
+
+    Returns:
+        dict: Resume ID by filename.
+    """
+    if not rows:
+        return {}
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        insert = None
+
+    if insert is not None:
+        statement = insert(Resume).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Resume.filename],
+            set_={**{column: statement.excluded[column] for column in rows[0] if column != "filename"},
+                  "updated_at": db.func.now()},
+        ).returning(Resume.id, Resume.filename)
+        return {filename: resume_id for resume_id, filename in db.session.execute(statement)}
+
+    existing = {resume.filename: resume for resume in
+                resume_query(Resume.id, Resume.filename).filter(Resume.filename.in_([row["filename"] for row in rows]))}
+    for row in rows:
+        resume = existing.get(row["filename"])
+        if resume is None:
+            resume = existing[row["filename"]] = Resume()
+            db.session.add(resume)
+        for column, value in row.items():
+            setattr(resume, column, value)
+    db.session.flush()
+    return {filename: resume.id for filename, resume in existing.items()}
+
+def _saved_resumes(rows, ids):
+    # Detached Resume objects carrying the saved values, for facet sync and indexing without a reload
+    return [Resume(id=ids[row["filename"]], **row) for row in rows]
+
+@timed("save_candidate")
+def save_candidate(filename,text,structured_data,analysis_version=None):
+    """ Save a candidate's information to the database, inserting or updating by filename """
     try:
-        resume = Resume.query.filter_by(filename=filename).first()
-        if resume:
-            resume.data = structured_data
-        else:
-            resume = Resume(
-        filename=filename,
-        text_content=text,
-        personal_info=structured_data.get("personalInfo", {}),
-        education=structured_data.get("education", {}),
-        work_experience=structured_data.get("workExperience", {}),
-        skills=structured_data.get("skills", {}),
-        projects=structured_data.get("projects", {}),
-        certifications=structured_data.get("certifications", {})
-    )
-    
-        db.session.add(resume)
+        row = _resume_values(filename, text, structured_data, analysis_version)
+        ids = upsert_resumes([row])
+        resume = _saved_resumes([row], ids)[0]
+        sync_facets(resume)
+        # Invalidates cached query answers in every worker
+        bump_corpus_generation()
         db.session.commit()
         logger.info(f"Successfully saved resume to database with ID: {resume.id}")
+        index_resumes([resume])
         
     except Exception as e:
         db.session.rollback()
+        STAGE_ERRORS.inc(stage="save_candidate")
         print(f"Error storing CV data: {e}")
-    
\ No newline at end of file
+    
+
+def save_candidates(candidates, batch_size=100):
+    """
+    Save many candidates with one upsert statement and one commit per batch.
+
+    Args:
+        candidates (list): (filename, text, structured_data) tuples, optionally followed
+            by the analysis version when the analysis was not made with the current one.
+        batch_size (int): Number of rows written per transaction.
+
+    Returns:
+        list: Filenames whose batch failed to commit.
+    """
+    failed = []
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        try:
+            # A statement may touch each row only once: the last entry per filename wins
+            rows = list({candidate[0]: _resume_values(*candidate) for candidate in batch}.values())
+            ids = upsert_resumes(rows)
+            resumes = _saved_resumes(rows, ids)
+            for saved in resumes:
+                sync_facets(saved)
+            bump_corpus_generation()
+            db.session.commit()
+            logger.info(f"Saved batch of {len(batch)} resumes to database")
+            index_resumes(resumes)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error storing CV batch: {e}")
+            failed.extend(candidate[0] for candidate in batch)
+    return failed
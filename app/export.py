@@ -0,0 +1,158 @@
+import io
+import csv
+import json
+import logging
+from datetime import date, datetime
+
+from app import db
+from app.models import Resume
+
+logger = logging.getLogger(__name__)
+
+# Columns that can be exported, in output order; text_content only on request
+EXPORT_FIELDS = ("id", "filename", "created_at", "updated_at", "personal_info", "education",
+                 "work_experience", "skills", "projects", "certifications", "text_content")
+DEFAULT_EXPORT_FIELDS = tuple(field for field in EXPORT_FIELDS if field != "text_content")
+EXPORT_FORMATS = ("jsonl", "csv")
+
+# Rows fetched from the database cursor per round trip
+EXPORT_BATCH_SIZE = 1000
+# Bytes collected before a chunk is handed to the HTTP response or file
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+def parse_fields(spec):
+    """
+    Parses a comma-separated field list.
+
+    Args:
+        spec (str): e.g. "id,filename,skills"; empty for the default fields.
+
+    Returns:
+        tuple: Field names, in the requested order.
+
+    Raises:
+        ValueError: If a field is not exportable.
+    """
+    if not spec:
+        return DEFAULT_EXPORT_FIELDS
+    fields = tuple(field.strip() for field in spec.split(",") if field.strip())
+    unknown = [field for field in fields if field not in EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown export fields: {', '.join(unknown)}")
+    return fields
+
+def parse_date(value):
+    """
+    Parses an ISO date or datetime filter value.
+
+    Returns:
+        datetime: The parsed value, or None for an empty string.
+
+    Raises:
+        ValueError: If the value is not ISO 8601.
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value!r} (expected YYYY-MM-DD or an ISO 8601 datetime)")
+
+def iter_resumes(fields=DEFAULT_EXPORT_FIELDS, created_after=None, created_before=None,
+                 updated_after=None, updated_before=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Streams resume rows as dictionaries, in ID order.
+
+    Selects plain columns (no ORM objects, so nothing accumulates in the
+    session) with yield_per/stream_results: PostgreSQL uses a server-side
+    cursor, and at most batch_size rows are held in memory at any time.
+
+    Args:
+        fields (tuple): Columns to export, see EXPORT_FIELDS.
+        created_after, created_before (datetime): Bounds on created_at (inclusive/exclusive).
+        updated_after, updated_before (datetime): Bounds on updated_at (inclusive/exclusive).
+        batch_size (int): Rows per fetch.
+
+    Yields:
+        dict: One row per resume.
+    """
+    statement = db.select(*(getattr(Resume, field) for field in fields)).order_by(Resume.id)
+    if created_after:
+        statement = statement.where(Resume.created_at >= created_after)
+    if created_before:
+        statement = statement.where(Resume.created_at < created_before)
+    if updated_after:
+        statement = statement.where(Resume.updated_at >= updated_after)
+    if updated_before:
+        statement = statement.where(Resume.updated_at < updated_before)
+
+    result = db.session.execute(statement.execution_options(yield_per=batch_size, stream_results=True))
+    try:
+        for row in result:
+            yield dict(zip(fields, row))
+    finally:
+        result.close()
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+def jsonl_lines(rows):
+    """Formats rows as JSON lines."""
+    for row in rows:
+        yield json.dumps(row, default=_json_default) + "\n"
+
+def csv_lines(rows, fields):
+    """Formats rows as CSV with a header line; JSON columns are embedded as JSON text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_csv_value(row[field]) for field in fields])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_chunks(fmt="jsonl", fields=DEFAULT_EXPORT_FIELDS, chunk_bytes=EXPORT_CHUNK_BYTES, **filters):
+    """
+    Streams an export as text chunks of roughly chunk_bytes.
+
+    Args:
+        fmt (str): "jsonl" or "csv".
+        fields (tuple): Columns to export.
+        chunk_bytes (int): Size at which buffered lines are emitted.
+        **filters: Date filters, see iter_resumes.
+
+    Yields:
+        str: Export text; concatenated, the chunks form the whole file.
+
+    Raises:
+        ValueError: For an unknown format.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    rows = iter_resumes(fields, **filters)
+    lines = jsonl_lines(rows) if fmt == "jsonl" else csv_lines(rows, fields)
+
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield "".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk)
+    logger.info(f"Finished {fmt} export of {', '.join(fields)}")
@@ -0,0 +1,183 @@
+import os
+import time
+import uuid
+import base64
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from app import celery
+from app.pipeline import ingest_document, IngestionError
+from app.admission import priority, PRIORITY_BACKGROUND
+
+# Configure Logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "local" runs jobs on an in-process thread pool, "celery" sends them to CELERY_BROKER_URL
+INGEST_BACKEND = os.getenv("INGEST_BACKEND", "local")
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "1000"))
+# Celery jobs carry uploads up to this size in the task message; larger ones are passed by path,
+# which requires the upload folder on a volume shared by the web app and the workers
+INGEST_INLINE_MAX_BYTES = int(os.getenv("INGEST_INLINE_MAX_BYTES", str(10 * 1024 * 1024)))
+
+_queue_lock = threading.Lock()
+
+def _new_job(job_id, filename):
+    return {
+        "job_id": job_id,
+        "filename": filename,
+        "status": "queued",
+        "stage": "queued",
+        "result": None,
+        "error": None,
+        "submitted_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+    }
+
+def _remove_upload(filepath):
+    """Deletes a job's private copy of the upload once the job has finished."""
+    try:
+        os.unlink(filepath)
+    except FileNotFoundError:
+        pass
+
+class LocalJobQueue:
+    """
+    Runs ingestion jobs on a bounded in-process thread pool.
+
+    Needs no broker, which makes it the default for development and tests.
+    Job state is kept in memory for the last JOB_HISTORY jobs of this process.
+    """
+
+    def __init__(self, app, workers=INGEST_WORKERS, history=JOB_HISTORY):
+        self.app = app
+        self.history = history
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ingest")
+
+    def submit(self, filepath, filename, content_hash=None, cleanup=False):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = _new_job(job_id, filename)
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job_id, filepath, filename, content_hash, cleanup)
+        return job_id
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _run(self, job_id, filepath, filename, content_hash=None, cleanup=False):
+        self._update(job_id, status="running", started_at=time.time())
+        # Queued jobs wait for OCR/LLM slots behind interactive requests instead of being shed
+        with self.app.app_context(), priority(PRIORITY_BACKGROUND):
+            try:
+                result = ingest_document(filepath, filename, content_hash=content_hash,
+                                         progress=lambda stage: self._update(job_id, stage=stage))
+                outcome = {"status": "done", "stage": "done", "result": result}
+            except IngestionError as e:
+                outcome = {"status": "failed", "error": e.message}
+            except Exception as e:
+                logger.error(f"Ingestion job {job_id} failed: {str(e)}")
+                outcome = {"status": "failed", "error": str(e)}
+            finally:
+                if cleanup:
+                    _remove_upload(filepath)
+            # Reported finished only once its copy of the upload is gone
+            self._update(job_id, finished_at=time.time(), **outcome)
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+@celery.task(bind=True, name="app.jobs.ingest")
+def ingest_task(self, filepath, filename, content_hash=None, cleanup=False, data=None):
+    """
+    Celery task running the ingestion pipeline, reporting the current stage as task meta.
+
+    The upload comes either inline as base64 `data` or as `filepath`, which
+    must exist on the worker's filesystem.
+    """
+    def progress(stage):
+        self.update_state(state="PROGRESS", meta={"filename": filename, "stage": stage})
+    if data is not None:
+        source = base64.b64decode(data)
+    elif os.path.exists(filepath):
+        source = filepath
+    else:
+        raise RuntimeError(f"Upload {filepath} not found on this worker; files above INGEST_INLINE_MAX_BYTES "
+                           "need the upload folder on a volume shared with the web app")
+    try:
+        with priority(PRIORITY_BACKGROUND):
+            return ingest_document(source, filename, progress=progress, content_hash=content_hash)
+    except IngestionError as e:
+        # Re-raise as a plain exception so the message survives result serialization
+        raise RuntimeError(e.message)
+    finally:
+        if cleanup and data is None:
+            _remove_upload(filepath)
+
+class CeleryJobQueue:
+    """
+    Sends ingestion jobs to Celery workers; job state comes from the result backend.
+
+    Uploads up to INGEST_INLINE_MAX_BYTES travel inside the task message, so
+    workers need no access to the web host's disk; larger ones are sent by
+    path and need a shared upload folder.
+    """
+
+    def __init__(self, inline_max_bytes=INGEST_INLINE_MAX_BYTES):
+        self.inline_max_bytes = inline_max_bytes
+
+    _STATES = {"PENDING": "queued", "RECEIVED": "queued", "STARTED": "running", "PROGRESS": "running",
+               "RETRY": "running", "SUCCESS": "done", "FAILURE": "failed", "REVOKED": "failed"}
+
+    def submit(self, filepath, filename, content_hash=None, cleanup=False):
+        if os.path.getsize(filepath) > self.inline_max_bytes:
+            return ingest_task.delay(filepath, filename, content_hash=content_hash, cleanup=cleanup).id
+        with open(filepath, "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+        if cleanup:
+            # The worker gets its own copy in the message
+            _remove_upload(filepath)
+        return ingest_task.delay(None, filename, content_hash=content_hash, data=data).id
+
+    def status(self, job_id):
+        result = ingest_task.AsyncResult(job_id)
+        job = {"job_id": job_id, "status": self._STATES.get(result.state, result.state.lower()),
+               "stage": result.state.lower(), "result": None, "error": None}
+        if result.state == "PROGRESS" and isinstance(result.info, dict):
+            job.update(result.info)
+        elif result.state == "SUCCESS":
+            job.update(stage="done", result=result.result)
+        elif result.state == "FAILURE":
+            job["error"] = str(result.result)
+        return job
+
+def get_job_queue(app):
+    """
+    Returns the ingestion queue for an application, creating it on first use.
+
+    Args:
+        app (Flask): The application the jobs run against.
+
+    Returns:
+        LocalJobQueue or CeleryJobQueue, depending on INGEST_BACKEND.
+    """
+    with _queue_lock:
+        queue = app.extensions.get("ingest_queue")
+        if queue is None:
+            if INGEST_BACKEND == "celery":
+                queue = CeleryJobQueue()
+            else:
+                queue = LocalJobQueue(app)
+            app.extensions["ingest_queue"] = queue
+        return queue
@@ -0,0 +1,140 @@
+import os
+import re
+import math
+
+# Rough characters per token of the analysis model's tokenizer; kept low so estimates err on the long side
+CHARS_PER_TOKEN = float(os.getenv("ANALYSIS_CHARS_PER_TOKEN", "3.5"))
+
+# Headings that start a new resume section (matched case-insensitively on short lines)
+SECTION_HEADINGS = (
+    "summary", "profile", "objective", "about me", "experience", "work experience", "professional experience",
+    "employment", "employment history", "career history", "education", "academic background", "qualifications",
+    "skills", "technical skills", "core competencies", "projects", "selected projects", "certifications",
+    "certificates", "licenses", "awards", "honors", "publications", "selected publications", "presentations",
+    "talks", "teaching", "teaching experience", "research", "research experience", "grants", "funding",
+    "languages", "interests", "volunteering", "volunteer experience", "references", "memberships",
+)
+_HEADING_RE = re.compile(r"^(?:%s)\s*:?$" % "|".join(re.escape(h) for h in SECTION_HEADINGS), re.IGNORECASE)
+
+# OCR noise: runs of separator characters, lone symbols, bullets and repeated punctuation
+_RULE_RE = re.compile(r"[-_=~*.·•|]{3,}")
+_BULLET_RE = re.compile(r"^[\s•●▪■‣⁃◦∙*>-]+(?=\S)")
+_NOISE_LINE_RE = re.compile(r"^[^\w]{0,3}$")
+_SPACES_RE = re.compile(r"[ \t\u00a0\u200b]+")
+
+def estimate_tokens(text):
+    """
+    Estimates the number of tokens the model will see for a text.
+
+    Args:
+        text (str): Prompt or resume text.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def compact_text(text):
+    """
+    Removes whitespace and OCR noise that cost tokens without carrying content.
+
+    Collapses runs of spaces, strips bullet glyphs and separator rules,
+    drops lines made only of stray symbols and squeezes blank lines, while
+    keeping one line per original line so section headings stay detectable.
+
+    Args:
+        text (str): Extracted resume text.
+
+    Returns:
+        str: Compacted text.
+    """
+    lines = []
+    for line in (text or "").splitlines():
+        line = _RULE_RE.sub(" ", line)
+        line = _BULLET_RE.sub("", line)
+        line = _SPACES_RE.sub(" ", line).strip()
+        if _NOISE_LINE_RE.match(line):
+            # Keep a single blank line as a paragraph break
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+def is_heading(line):
+    """Returns True for a line that opens a resume section, e.g. "EXPERIENCE" or "Publications:"."""
+    line = line.strip()
+    return 0 < len(line) <= 40 and bool(_HEADING_RE.match(line))
+
+def split_sections(text):
+    """
+    Splits a resume into sections at recognized headings.
+
+    Returns:
+        list: Section texts in order; the first holds everything before the first heading.
+    """
+    sections, current = [], []
+    for line in text.splitlines():
+        if is_heading(line) and current:
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current).strip())
+    return [section for section in sections if section]
+
+def _split_oversized(section, max_tokens):
+    """Splits a section that alone exceeds the budget at line boundaries, cutting overlong lines at a space."""
+    lines = section.splitlines()
+    heading = lines[0] if lines and is_heading(lines[0]) else None
+    if heading:
+        # Leave room for the repeated heading
+        max_tokens -= estimate_tokens(f"{heading} (continued)\n")
+    pieces, current = [], []
+    for line in lines:
+        while estimate_tokens(line) > max_tokens:
+            cut = int(max_tokens * CHARS_PER_TOKEN)
+            # Prefer to cut at a word boundary
+            space = line.rfind(" ", 0, cut)
+            cut = space if space > cut // 2 else cut
+            if current:
+                pieces.append("\n".join(current))
+                current = []
+            pieces.append(line[:cut])
+            line = line[cut:].lstrip()
+        if current and estimate_tokens("\n".join(current + [line])) > max_tokens:
+            pieces.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        pieces.append("\n".join(current))
+    # Repeat the heading so the model knows what each piece is about
+    if heading:
+        pieces = [pieces[0]] + [f"{heading} (continued)\n{piece}" for piece in pieces[1:]]
+    return pieces
+
+def chunk_resume(text, max_tokens):
+    """
+    Packs the sections of a resume into chunks of at most max_tokens.
+
+    Whole sections are kept together wherever they fit; a section larger
+    than the budget is split on its own.
+
+    Args:
+        text (str): Compacted resume text.
+        max_tokens (int): Token budget per chunk.
+
+    Returns:
+        list: Chunk texts in document order.
+    """
+    chunks, current = [], []
+    for section in split_sections(text):
+        parts = [section] if estimate_tokens(section) <= max_tokens else _split_oversized(section, max_tokens)
+        for part in parts:
+            if current and estimate_tokens("\n\n".join(current + [part])) > max_tokens:
+                chunks.append("\n\n".join(current))
+                current = []
+            current.append(part)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.metrics import LLM_REQUESTS, LLM_RETRIES, LLM_TOKENS, LLM_SECONDS, LLM_IN_FLIGHT
+from app.admission import AdmissionPool, Overloaded, ADMISSION_ENABLED, ADMISSION_LLM_QUEUE, ADMISSION_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Set up the Together AI API
+API_KEY = os.getenv('API_KEY',"38302e34fb50f335c6af24c728a126c76df4ca2afd3bc3fbfe62770988d8c38b")
+TOGETHER_API_URL = os.getenv('TOGETHER_API_URL',"https://api.together.xyz/v1/completions")
+
+# HTTP client configuration
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', "5"))
+LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', "60"))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', "3"))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', "20"))
+LLM_MAX_IN_FLIGHT = int(os.getenv('LLM_MAX_IN_FLIGHT', "8"))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class LLMError(Exception):
+    """Raised when the LLM API call fails after all retries."""
+
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+def completion_text(data):
+    """
+    Pulls the generated text out of a completion response.
+
+    Args:
+        data (dict): Parsed API response.
+
+    Returns:
+        str: The generated text, or None if the response has no choices.
+    """
+    choices = data.get("choices") if isinstance(data, dict) else None
+    if not choices:
+        return None
+    choice = choices[0]
+    text = choice.get("text")
+    if text is None:
+        text = (choice.get("message") or {}).get("content", "")
+    return text.strip()
+
+def chunk_text(data):
+    """
+    Pulls the text delta out of one streamed completion chunk.
+
+    Args:
+        data (dict): Parsed "data:" payload of a server-sent event.
+
+    Returns:
+        str: The new text, or "" if the chunk carries none.
+    """
+    choices = data.get("choices") if isinstance(data, dict) else None
+    if not choices:
+        return ""
+    choice = choices[0]
+    text = choice.get("text")
+    if text is None:
+        text = (choice.get("delta") or {}).get("content")
+    return text or ""
+
+class LLMClient:
+    """
+    Shared HTTP client for the Together API.
+
+    Reuses keep-alive connections from a pool, applies connect/read
+    timeouts, retries 429/5xx responses and connection errors with
+    exponential backoff and full jitter (honouring Retry-After), and caps
+    the number of requests in flight across all threads of the process.
+    """
+
+    def __init__(self, api_url=TOGETHER_API_URL, api_key=API_KEY, max_in_flight=LLM_MAX_IN_FLIGHT,
+                 max_retries=LLM_MAX_RETRIES, timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT),
+                 backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX):
+        self.api_url = api_url
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Interactive queries get free slots before uploads; shedding only when admission control is on
+        self._in_flight = AdmissionPool("llm", max_in_flight,
+                                        ADMISSION_LLM_QUEUE if ADMISSION_ENABLED else None, ADMISSION_TIMEOUT)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm")
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def complete(self, payload):
+        """
+        Sends one completion request.
+
+        Args:
+            payload (dict): Request body (model, prompt/messages, max_tokens, ...).
+
+        Returns:
+            dict: The parsed JSON response.
+
+        Raises:
+            LLMError: On a non-retryable error, or once retries are exhausted.
+        """
+        model = payload.get("model", "")
+        start = time.perf_counter()
+        try:
+            data = self._complete(payload, model)
+        except LLMError:
+            LLM_REQUESTS.inc(model=model, status="error")
+            raise
+        finally:
+            LLM_SECONDS.observe(time.perf_counter() - start, model=model)
+        LLM_REQUESTS.inc(model=model, status="ok")
+        usage = data.get("usage") if isinstance(data, dict) else None
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if isinstance(usage, dict) and usage.get(kind):
+                LLM_TOKENS.inc(usage[kind], model=model, kind=kind.split("_")[0])
+        return data
+
+    def _complete(self, payload, model):
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                with self._in_flight.slot(), LLM_IN_FLIGHT.track_in_progress():
+                    response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = LLMError(f"Request failed: {e}")
+            else:
+                if response.status_code == 200:
+                    try:
+                        return response.json()
+                    except ValueError:
+                        raise LLMError("Invalid JSON in response", response.status_code, response.text)
+                error = LLMError(f"HTTP {response.status_code}: {response.text}", response.status_code, response.text)
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise error
+                retry_after = response.headers.get("Retry-After")
+
+            if attempt == self.max_retries:
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            logger.warning(f"LLM request failed ({error}), retrying in {delay:.2f}s")
+            LLM_RETRIES.inc(model=model)
+            time.sleep(delay)
+
+    def stream(self, payload):
+        """
+        Sends a completion request with streaming enabled and yields text as it arrives.
+
+        Connection errors and 429/5xx responses are retried like complete()
+        as long as nothing has been received yet. Closing the generator (e.g.
+        when the HTTP client went away) closes the upstream connection, which
+        stops the generation.
+
+        Args:
+            payload (dict): Request body; "stream" is set to true.
+
+        Yields:
+            str: Text deltas, in order.
+
+        Raises:
+            LLMError: On a non-retryable error, once retries are exhausted, or
+                if the stream breaks off midway.
+        """
+        payload = dict(payload, stream=True)
+        model = payload.get("model", "")
+        start = time.perf_counter()
+        status = "error"
+        response = None
+        with self._in_flight.slot(), LLM_IN_FLIGHT.track_in_progress():
+            try:
+                response = self._open_stream(payload, model)
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError:
+                        logger.warning(f"Skipping malformed stream chunk: {data[:200]}")
+                        continue
+                    usage = chunk.get("usage") if isinstance(chunk, dict) else None
+                    for kind in ("prompt_tokens", "completion_tokens"):
+                        if isinstance(usage, dict) and usage.get(kind):
+                            LLM_TOKENS.inc(usage[kind], model=model, kind=kind.split("_")[0])
+                    text = chunk_text(chunk)
+                    if text:
+                        yield text
+                status = "ok"
+            except GeneratorExit:
+                status = "cancelled"
+                raise
+            except requests.RequestException as e:
+                raise LLMError(f"Stream interrupted: {e}")
+            finally:
+                if response is not None:
+                    response.close()
+                LLM_REQUESTS.inc(model=model, status=status)
+                LLM_SECONDS.observe(time.perf_counter() - start, model=model)
+
+    def _open_stream(self, payload, model):
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=self.timeout, stream=True)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = LLMError(f"Request failed: {e}")
+            else:
+                if response.status_code == 200:
+                    return response
+                body = response.text
+                response.close()
+                error = LLMError(f"HTTP {response.status_code}: {body}", response.status_code, body)
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise error
+                retry_after = response.headers.get("Retry-After")
+
+            if attempt == self.max_retries:
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            logger.warning(f"LLM stream request failed ({error}), retrying in {delay:.2f}s")
+            LLM_RETRIES.inc(model=model)
+            time.sleep(delay)
+
+    def submit(self, payload):
+        """Sends a completion request in the background and returns a Future of its response."""
+        # Carry the caller's context over, so the request keeps its admission priority
+        return self._executor.submit(contextvars.copy_context().run, self.complete, payload)
+
+    def complete_many(self, payloads):
+        """
+        Sends many completion requests concurrently, within the in-flight limit.
+
+        Args:
+            payloads (list): Request bodies.
+
+        Returns:
+            list: Parsed responses in input order; a failed request yields its LLMError.
+        """
+        futures = [self.submit(payload) for payload in payloads]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except LLMError as e:
+                results.append(e)
+            except Overloaded:
+                raise
+            except Exception as e:
+                results.append(LLMError(str(e)))
+        return results
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_llm_client():
+    """Returns the process-wide LLM client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
@@ -1,15 +1,44 @@
+import os
+import re
+import json
+import logging
 
+from app.llm_operations.client import get_llm_client, completion_text, LLMError
+from app.llm_operations.chunking import compact_text, estimate_tokens, chunk_resume
+from app.metrics import timed, STAGE_ERRORS
+from app.admission import Overloaded
 
-import requests
-import os
+logger = logging.getLogger(__name__)
 
+ANALYSIS_MODEL = os.getenv('ANALYSIS_MODEL', "mistralai/Mistral-7B-Instruct-v0.1")
 
-# Set up the Together AI API
-API_KEY = os.getenv('API_KEY',"38302e34fb50f335c6af24c728a126c76df4ca2afd3bc3fbfe62770988d8c38b")
-TOGETHER_API_URL = os.getenv('TOGETHER_API_URL',"https://api.together.xyz/v1/completions")
+# Token budget of the analysis model ("auto" chunking splits resumes whose prompt would not fit)
+ANALYSIS_CHUNKING = os.getenv("ANALYSIS_CHUNKING", "auto").lower()
+ANALYSIS_CONTEXT_TOKENS = int(os.getenv("ANALYSIS_CONTEXT_TOKENS", "8192"))
+ANALYSIS_MAX_TOKENS = int(os.getenv("ANALYSIS_MAX_TOKENS", "1000"))
+ANALYSIS_CHUNK_TOKENS = int(os.getenv("ANALYSIS_CHUNK_TOKENS", "3000"))
+ANALYSIS_COMPACT = os.getenv("ANALYSIS_COMPACT", "true").lower() in ("1", "true", "yes")
 
-def get_resume_analysis(resume_text):
-    prompt = f"""
+# Bump whenever the prompt below changes, so cached analyses are not reused
+PROMPT_VERSION = "2"
+# Stored with every analyzed resume; rows with another value are redone by `flask reanalyze`
+ANALYSIS_VERSION = f"{PROMPT_VERSION}:{ANALYSIS_MODEL}"
+
+# List sections of the analysis JSON, and the fields that identify a duplicate entry when merging chunks
+LIST_SECTIONS = {
+    "education": ("degree", "institution"),
+    "workExperience": ("jobTitle", "company", "duration"),
+    "projects": ("projectName",),
+    "certifications": ("certificationName", "issuingOrganization"),
+}
+
+def build_analysis_prompt(resume_text, part=None, parts=None):
+    # Chunks of a long resume are analyzed separately and merged afterwards
+    scope = ""
+    if parts and parts > 1:
+        scope = (f"\nThis is part {part} of {parts} of a longer resume. Extract only what appears in this part "
+                 "and leave everything else empty.\n")
+    return f"""
 You are a highly skilled resume parser. Extract structured details from the given resume text and return a **valid JSON object** with the following structure:
 
 {{
@@ -36,50 +65,248 @@ You are a highly skilled resume parser. Extract structured details from the give
 }}
 
 The response **must be a valid JSON**. No additional text, explanations, or markdown formatting.
-
+{scope}
 Here is the resume text:
 {resume_text}
 """
 
+def analysis_prompts(resume_text):
+    """
+    Builds the analysis prompt(s) for one resume.
+
+    The text is compacted first. If the prompt plus the response budget
+    would not fit the model's context (ANALYSIS_CONTEXT_TOKENS), the resume
+    is split into section-aligned chunks of ANALYSIS_CHUNK_TOKENS.
+
+    Args:
+        resume_text (str): Extracted resume text.
+
+    Returns:
+        list: One prompt per chunk (a single prompt for most resumes).
+    """
+    if ANALYSIS_COMPACT:
+        resume_text = compact_text(resume_text)
+    prompt = build_analysis_prompt(resume_text)
+    if ANALYSIS_CHUNKING == "off" or estimate_tokens(prompt) + ANALYSIS_MAX_TOKENS <= ANALYSIS_CONTEXT_TOKENS:
+        return [prompt]
+
+    chunks = chunk_resume(resume_text, ANALYSIS_CHUNK_TOKENS)
+    logger.info(f"Resume of ~{estimate_tokens(resume_text)} tokens split into {len(chunks)} chunks")
+    return [build_analysis_prompt(chunk, part, len(chunks)) for part, chunk in enumerate(chunks, start=1)]
+
+@timed("llm_analysis")
+def get_resume_analysis(resume_text):
+    """
+    Analyzes one resume, in parallel chunks if it is too long for a single prompt.
+
+    Args:
+        resume_text (str): Extracted resume text.
+
+    Returns:
+        dict: Structured resume data, or an error dictionary.
+    """
+    prompts = analysis_prompts(resume_text)
+
     try:
-        headers = {
-            "Authorization": f"Bearer {API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        data = {
-            "model": "mistralai/Mistral-7B-Instruct-v0.1",
-             "messages": [
+        if len(prompts) == 1:
+            return parse_analysis_response(get_llm_client().complete(build_analysis_payload(prompts[0])))
+        responses = get_llm_client().complete_many([build_analysis_payload(prompt) for prompt in prompts])
+        return merge_responses(responses)
+    except Overloaded:
+        # Shed by admission control; surfaces as a 503
+        raise
+    except Exception as e:
+        STAGE_ERRORS.inc(stage="llm_analysis")
+        return {"error": str(e)}
+
+def build_analysis_payload(prompt):
+    """Builds the request body for one analysis prompt."""
+    return {
+        "model": ANALYSIS_MODEL,
+        "messages": [
             {"role": "system", "content": "You are an AI trained to extract structured resume data."},
             {"role": "user", "content": prompt}  # Explicitly sending the prompt
         ],
-            "max_tokens": 1000
-        }
+        "max_tokens": ANALYSIS_MAX_TOKENS
+    }
 
-        response = requests.post(TOGETHER_API_URL, headers=headers, json=data)
-        print("Raw API Response:", response.text)  # Debugging
+def close_truncated_json(text):
+    """
+    Repairs a JSON object cut off by the response token limit.
 
-        print(f"response  data is ->{response}")
+    Drops the incomplete trailing value and closes the open strings,
+    arrays and objects, so the complete part of the answer survives.
 
-        data = response.json()
-        if response.status_code != 200:
-            return {"error": f"HTTP {response.status_code}: {response.text}"}
+    Args:
+        text (str): Response text starting with "{".
 
-        # Parse JSON response
-        data = response.json()
-        print("Parsed JSON Response:", data)  # Debugging
+    Returns:
+        str: Repaired JSON text, or None if nothing complete was found.
+    """
+    stack = []
+    in_string = escaped = False
+    safe = None  # (end offset, brackets to close) after the last complete value
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return text[:i + 1]
+            safe = (i + 1, list(stack))
+        elif ch == ",":
+            safe = (i, list(stack))
+    if safe is None:
+        return None
+    end, open_brackets = safe
+    return text[:end] + "".join(reversed(open_brackets))
 
-        if "choices" not in data or not data["choices"]:
-            return {"error": "Invalid response format", "raw_output": data}
+def parse_analysis_json(result_text):
+    """
+    Parses the model's analysis into a dictionary.
 
-        # Extract the model's generated response (it's inside "text" field)
-        result_text = data["choices"][0].get("text", "").strip()
-        print("Extracted Result:", result_text,type(result_text))  # Debugging        
+    Tolerates markdown fences and text around the JSON object, and
+    salvages responses truncated by the token limit.
 
-        return result_text
+    Args:
+        result_text (str): Generated text.
 
+    Returns:
+        dict: Structured resume data, or an error dictionary with the raw output.
+    """
+    text = re.sub(r"^```(?:json)?|```$", "", result_text.strip()).strip()
+    start = text.find("{")
+    if start == -1:
+        return {"error": "No JSON object in response", "raw_output": result_text}
+    text = text[start:]
+    try:
+        data = json.JSONDecoder().raw_decode(text)[0]
+        if isinstance(data, dict):
+            return data
+    except json.JSONDecodeError:
+        pass
 
-    except Exception as e:
-        return {"error": str(e)}
+    repaired = close_truncated_json(text)
+    try:
+        data = json.loads(repaired) if repaired else None
+    except json.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        return {"error": "Invalid JSON in response", "raw_output": result_text}
+    logger.warning("Analysis response was truncated; kept the complete part")
+    return data
+
+def parse_analysis_response(data):
+    """Returns the structured data of an analysis response, or an error dictionary."""
+    logger.debug(f"Parsed JSON Response: {data}")
+    # Extract the model's generated response (it's inside "text" field)
+    result_text = completion_text(data)
+    if result_text is None:
+        return {"error": "Invalid response format", "raw_output": data}
+    return parse_analysis_json(result_text)
+
+def _entry_key(entry, fields):
+    if isinstance(entry, dict):
+        return tuple(str(entry.get(field) or "").strip().lower() for field in fields)
+    return (str(entry).strip().lower(),)
+
+def merge_analyses(analyses):
+    """
+    Merges the analyses of the chunks of one resume into a single result.
+
+    Personal info fields come from the first chunk that has them, skills
+    are deduplicated case-insensitively, and the list sections are
+    concatenated in document order without repeated entries.
+
+    Args:
+        analyses (list): Per-chunk structured data dictionaries.
+
+    Returns:
+        dict: Structured resume data in the single-prompt schema.
+    """
+    merged = {"personalInfo": {}, "education": [], "workExperience": [], "skills": [],
+              "projects": [], "certifications": []}
+    seen = {section: set() for section in LIST_SECTIONS}
+    seen_skills = set()
+
+    for analysis in analyses:
+        info = analysis.get("personalInfo")
+        if isinstance(info, dict):
+            for field, value in info.items():
+                if value and not merged["personalInfo"].get(field):
+                    merged["personalInfo"][field] = value
+
+        for skill in analysis.get("skills") or []:
+            key = json.dumps(skill, sort_keys=True).lower() if isinstance(skill, dict) else str(skill).strip().lower()
+            if key and key not in seen_skills:
+                seen_skills.add(key)
+                merged["skills"].append(skill)
+
+        for section, fields in LIST_SECTIONS.items():
+            for entry in analysis.get(section) or []:
+                key = _entry_key(entry, fields)
+                # Skip the empty placeholder entries the template invites
+                if not any(key) or key in seen[section]:
+                    continue
+                seen[section].add(key)
+                merged[section].append(entry)
+    return merged
+
+def merge_responses(responses):
+    """
+    Parses and merges the responses for the chunks of one resume.
+
+    Failed chunks are skipped as long as at least one succeeded.
+
+    Args:
+        responses (list): Responses from complete_many (an LLMError for a failed request).
+
+    Returns:
+        dict: Merged structured data, or the first error if every chunk failed.
+    """
+    analyses, errors = [], []
+    for response in responses:
+        result = {"error": str(response)} if isinstance(response, LLMError) else parse_analysis_response(response)
+        (errors if "error" in result else analyses).append(result)
+    if not analyses:
+        return errors[0]
+    if errors:
+        logger.warning(f"{len(errors)} of {len(responses)} resume chunks failed: {errors[0]['error']}")
+    return merge_analyses(analyses)
+
+def get_resume_analyses(resume_texts):
+    """
+    Analyzes several resumes concurrently through the shared LLM client.
+
+    The chunks of long resumes are sent in the same concurrent batch.
+
+    Args:
+        resume_texts (list): Extracted resume texts.
+
+    Returns:
+        list: For each text, the structured data or an error dictionary, in input order.
+    """
+    plans = [analysis_prompts(text) for text in resume_texts]
+    payloads = [build_analysis_payload(prompt) for prompts in plans for prompt in prompts]
+    responses = get_llm_client().complete_many(payloads)
 
-    
+    results, offset = [], 0
+    for prompts in plans:
+        batch, offset = responses[offset:offset + len(prompts)], offset + len(prompts)
+        if len(batch) == 1:
+            data = batch[0]
+            results.append({"error": str(data)} if isinstance(data, LLMError) else parse_analysis_response(data))
+        else:
+            results.append(merge_responses(batch))
+    return results
@@ -1,18 +1,77 @@
-
-
-import requests
 import os
 import json
-from app.models import Resume
+import time
+import logging
+from app.models import Resume, resume_query
+from app.search import search_resume_ids, semantic_search
+from app.llm_operations.client import get_llm_client, completion_text, LLMError
+from app.query_cache import corpus_generation, query_cache_key, get_cached_answer, store_answer
+from app.metrics import timed, stage, record_stage, STAGE_ERRORS, QUERY_FIRST_TOKEN_SECONDS
+from app.admission import Overloaded
 
+logger = logging.getLogger(__name__)
 
-# Set up the Together AI API
-API_KEY = os.getenv('API_KEY',"38302e34fb50f335c6af24c728a126c76df4ca2afd3bc3fbfe62770988d8c38b")
-TOGETHER_API_URL = os.getenv('TOGETHER_API_URL',"https://api.together.xyz/v1/completions")
+QUERY_MODEL = os.getenv('QUERY_MODEL', "mistralai/Mistral-7B-Instruct-v0.1")
 
-def query_cv_data(query_text):
-    cvs = Resume.query.all()
-    all_cv_data = [{"filename": resume.filename, "data": resume.text_content} for resume in cvs]
+# Retrieval settings: only the top-k resumes (each capped in length) go into the prompt
+QUERY_TOP_K = int(os.getenv('QUERY_TOP_K', "5"))
+QUERY_MAX_CHARS_PER_CV = int(os.getenv('QUERY_MAX_CHARS_PER_CV', "6000"))
+
+def prompt_rows():
+    """Resume query loading just what the prompt uses: filename and text."""
+    return resume_query(Resume.id, Resume.filename, Resume.text_content)
+
+def retrieve_relevant_cvs(query_text, k=None):
+    """
+    Selects the resumes most relevant to a query instead of the whole table.
+
+    Args:
+        query_text (str): The user's query.
+        k (int): Maximum number of resumes; defaults to QUERY_TOP_K.
+
+    Returns:
+        list: Resume rows, most relevant first.
+    """
+    k = k or QUERY_TOP_K
+    rankings = []
+    try:
+        rankings.append([resume_id for resume_id, _ in search_resume_ids(query_text, k=k)])
+    except Exception as e:
+        print(f"Error searching resume index: {e}")
+    try:
+        rankings.append([hit["resume_id"] for hit in semantic_search([query_text], k=k)[0] if hit["score"] > 0])
+    except Exception as e:
+        print(f"Error searching vector index: {e}")
+
+    # Reciprocal rank fusion of the keyword and semantic rankings
+    fused = {}
+    for ranking in rankings:
+        for rank, resume_id in enumerate(ranking):
+            fused[resume_id] = fused.get(resume_id, 0.0) + 1.0 / (60 + rank)
+    ranked_ids = sorted(fused, key=lambda resume_id: -fused[resume_id])[:k]
+
+    if not ranked_ids:
+        # Nothing matched the query terms (e.g. "summarize the candidates") - use a bounded sample
+        return prompt_rows().order_by(Resume.id.desc()).limit(k).all()
+
+    rows = {resume.id: resume for resume in prompt_rows().filter(Resume.id.in_(ranked_ids))}
+    return [rows[resume_id] for resume_id in ranked_ids if resume_id in rows]
+
+def answer_cache_key(query_text):
+    """Cache key for a query against the current corpus, or None if the generation can't be read."""
+    try:
+        generation = corpus_generation()
+    except Exception as e:
+        print(f"Error reading corpus generation: {e}")
+        return None
+    return query_cache_key(query_text, generation, f"{QUERY_MODEL}:{QUERY_TOP_K}:{QUERY_MAX_CHARS_PER_CV}")
+
+def build_query_prompt(query_text):
+    """Retrieves the relevant CVs and builds the chat prompt for a query."""
+    with stage("query_retrieve"):
+        cvs = retrieve_relevant_cvs(query_text)
+    all_cv_data = [{"filename": resume.filename, "data": (resume.text_content or "")[:QUERY_MAX_CHARS_PER_CV]}
+                   for resume in cvs]
 
     prompt = f"""
     Given the following CV data (in JSON format), answer the user's query:
@@ -24,47 +83,90 @@ def query_cv_data(query_text):
 
     Provide a concise and relevant response.
     """
+    return prompt
 
-    try:
-        headers = {
-            "Authorization": f"Bearer {API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        data = {
-            "model": "mistralai/Mistral-7B-Instruct-v0.1",
-             "messages": [
-            {"role": "system", "content": "You are an AI trained to extract structured resume data."},
-            {"role": "user", "content": prompt}  # Explicitly sending the prompt
-        ],
-            "max_tokens": 1000
-        }
-
-        response = requests.post(TOGETHER_API_URL, headers=headers, json=data)
-        print("Raw API Response:", response.text)  # Debugging
-
-        print(f"response  data is ->{response}")
-
-        data = response.json()
-        if response.status_code != 200:
-            return {"error": f"HTTP {response.status_code}: {response.text}"}
+@timed("query")
+def query_cv_data(query_text):
+    # Answers are reused until a resume is added or updated
+    key = answer_cache_key(query_text)
+    cached = get_cached_answer(key)
+    if cached is not None:
+        return cached
 
-        # Parse JSON response
-        data = response.json()
-        print("Parsed JSON Response:", data)  # Debugging
+    prompt = build_query_prompt(query_text)
 
-        if "choices" not in data or not data["choices"]:
-            return {"error": "Invalid response format", "raw_output": data}
+    try:
+        with stage("query_llm"):
+            data = get_llm_client().complete(build_query_payload(prompt))
+        logger.debug(f"Parsed JSON Response: {data}")
 
         # Extract the model's generated response (it's inside "text" field)
-        result_text = data["choices"][0].get("text", "").strip()
-        print("Extracted Result:", result_text,type(result_text))  # Debugging        
-
+        result_text = completion_text(data)
+        if result_text is None:
+            return {"error": "Invalid response format", "raw_output": data}
+        store_answer(key, result_text)
         return result_text
 
-
+    except LLMError as e:
+        STAGE_ERRORS.inc(stage="query")
+        if e.status_code is not None:
+            return {"error": f"HTTP {e.status_code}: {e.body}"}
+        print(f"Error querying CV data: {e}")
+        return "Sorry, I couldn't process your query."
+    except Overloaded:
+        raise
     except Exception as e:
-        print(f"Error querying CV data with OpenAI: {e}")
+        STAGE_ERRORS.inc(stage="query")
+        print(f"Error querying CV data: {e}")
         return "Sorry, I couldn't process your query."
 
-    
+def query_cv_data_stream(query_text):
+    """
+    Answers a query like query_cv_data, yielding the answer as the model generates it.
+
+    Closing the generator cancels the upstream request.
+
+    Args:
+        query_text (str): The user's query.
+
+    Yields:
+        str: Answer text deltas.
+
+    Raises:
+        LLMError: If the completion request fails.
+    """
+    start = time.perf_counter()
+    key = answer_cache_key(query_text)
+    cached = get_cached_answer(key)
+    if cached is not None:
+        yield cached
+        return
+
+    prompt = build_query_prompt(query_text)
+    parts = []
+    try:
+        for text in get_llm_client().stream(build_query_payload(prompt)):
+            if not parts:
+                QUERY_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start)
+                record_stage("query_first_token", time.perf_counter() - start)
+            parts.append(text)
+            yield text
+        # Only complete answers are cached; a cancelled stream never gets here
+        if parts:
+            store_answer(key, "".join(parts).strip())
+    except LLMError:
+        STAGE_ERRORS.inc(stage="query_stream")
+        raise
+    finally:
+        record_stage("query_stream", time.perf_counter() - start)
+
+def build_query_payload(prompt):
+    """Builds the request body for a chat query prompt."""
+    return {
+        "model": QUERY_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are an AI trained to extract structured resume data."},
+            {"role": "user", "content": prompt}  # Explicitly sending the prompt
+        ],
+        "max_tokens": 1000
+    }
@@ -0,0 +1,305 @@
+import os
+import time
+import math
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Metrics configuration
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Latest samples kept per series for the quantiles of a summary
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "1024"))
+# Requests carrying this header get a Server-Timing stage breakdown (empty disables profiling)
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_registry = []
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value):
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, "")) for label in self.labelnames)
+
+    def _labels(self, key, extra=None):
+        pairs = list(zip(self.labelnames, key)) + list(extra or [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in sorted(series):
+            lines.extend(self._render_series(key, value))
+        return lines
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. pages OCR'd or errors."""
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. requests in flight."""
+
+    type = "gauge"
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+class _SummarySeries:
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+class Summary(_Metric):
+    """
+    Latency distribution reported as p50/p95/p99 plus count and sum.
+
+    Quantiles are computed over the latest METRICS_WINDOW samples of each
+    series, so they follow the current behavior rather than the whole uptime.
+    """
+
+    type = "summary"
+
+    def __init__(self, name, documentation, labelnames=(), window=None):
+        super().__init__(name, documentation, labelnames)
+        self.window = window or METRICS_WINDOW
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _SummarySeries(self.window)
+            series.samples.append(value)
+            series.count += 1
+            series.sum += value
+
+    def quantiles(self, **labels):
+        """Returns {quantile: value} for the series, or {} if it has no samples."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            samples = sorted(series.samples) if series else []
+        if not samples:
+            return {}
+        return {q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in QUANTILES}
+
+    def _render_series(self, key, series):
+        with self._lock:
+            samples = sorted(series.samples)
+            count, total = series.count, series.sum
+        lines = []
+        for q in QUANTILES:
+            value = samples[min(len(samples) - 1, int(q * len(samples)))] if samples else float("nan")
+            lines.append(f"{self.name}{self._labels(key, [('quantile', q)])} {_format_value(value)}")
+        lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+# Pipeline stages (see stage() below)
+STAGE_SECONDS = Summary("cv_stage_seconds", "Time spent per pipeline stage.", ("stage",))
+STAGE_ERRORS = Counter("cv_stage_errors_total", "Pipeline stage failures.", ("stage",))
+STAGE_IN_FLIGHT = Gauge("cv_stage_in_flight", "Pipeline stages currently running.", ("stage",))
+
+# HTTP requests
+HTTP_REQUESTS = Counter("cv_http_requests_total", "HTTP requests by endpoint and status.",
+                        ("endpoint", "method", "status"))
+HTTP_SECONDS = Summary("cv_http_request_seconds", "HTTP request latency by endpoint.", ("endpoint",))
+HTTP_IN_FLIGHT = Gauge("cv_http_requests_in_flight", "HTTP requests currently being handled.", ("endpoint",))
+
+# Extraction
+PDF_PAGES = Counter("cv_pdf_pages_total", "PDF pages extracted, by method.", ("method",))
+OCR_PAGES = Counter("cv_ocr_pages_total", "Pages rasterized and OCR'd.")
+OCR_PAGE_SECONDS = Summary("cv_ocr_page_seconds", "Per-page OCR time by phase.", ("phase",))
+
+# LLM calls
+LLM_REQUESTS = Counter("cv_llm_requests_total", "LLM API calls by model and outcome.", ("model", "status"))
+LLM_RETRIES = Counter("cv_llm_retries_total", "LLM API calls retried after a failure.", ("model",))
+LLM_TOKENS = Counter("cv_llm_tokens_total", "LLM tokens reported by the API.", ("model", "kind"))
+LLM_SECONDS = Summary("cv_llm_request_seconds", "LLM API round trip, including retries.", ("model",))
+LLM_IN_FLIGHT = Gauge("cv_llm_requests_in_flight", "LLM API calls currently in flight.")
+QUERY_FIRST_TOKEN_SECONDS = Summary("cv_query_first_token_seconds",
+                                    "Time from a streamed query to its first answer token.")
+
+# Admission control (see app/admission.py)
+ADMISSION_IN_USE = Gauge("cv_admission_slots_in_use", "Slots held per admission pool.", ("pool",))
+ADMISSION_QUEUED = Gauge("cv_admission_queued", "Requests waiting for a slot per admission pool.", ("pool",))
+ADMISSION_SHED = Counter("cv_admission_shed_total", "Requests rejected with 503 per admission pool.", ("pool",))
+ADMISSION_WAIT_SECONDS = Summary("cv_admission_wait_seconds", "Time spent waiting for a slot.", ("pool",))
+
+# Caches
+CACHE_EVENTS = Counter("cv_cache_events_total", "Cache hits, misses, stores and evictions.", ("cache", "event"))
+
+_profile = contextvars.ContextVar("profile", default=None)
+
+def record_stage(name, seconds):
+    """
+    Records a stage duration measured elsewhere, e.g. inside an OCR worker process.
+
+    Args:
+        name (str): Stage name.
+        seconds (float): Duration.
+    """
+    STAGE_SECONDS.observe(seconds, stage=name)
+    profile = _profile.get()
+    if profile is not None:
+        profile.append((name, seconds))
+
+@contextmanager
+def stage(name):
+    """
+    Times a block as a pipeline stage: latency, errors, in-flight count and,
+    for profiled requests, an entry in the Server-Timing breakdown.
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    STAGE_IN_FLIGHT.inc(stage=name)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        STAGE_IN_FLIGHT.dec(stage=name)
+        record_stage(name, time.perf_counter() - start)
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def render_metrics():
+    """Returns every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+def server_timing(entries):
+    """
+    Formats (stage, seconds) pairs as a Server-Timing header value.
+
+    Repeated stages (e.g. one entry per OCR'd page) are summed, keeping the
+    order in which they first ran.
+
+    Args:
+        entries (list): (stage, seconds) pairs.
+
+    Returns:
+        str: e.g. 'extract_pdf;dur=812.4, llm_analysis;dur=2310.0;desc="x1"'.
+    """
+    totals = {}
+    for name, seconds in entries:
+        total, count = totals.get(name, (0.0, 0))
+        totals[name] = (total + seconds, count + 1)
+    return ", ".join(f'{name};dur={total * 1000:.1f};desc="x{count}"' for name, (total, count) in totals.items())
+
+def init_metrics(app):
+    """
+    Adds per-endpoint request metrics, optional request profiling and the
+    /metrics endpoint to the Flask app.
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_request_metrics():
+        g._metrics_start = time.perf_counter()
+        g._metrics_endpoint = request.endpoint or "unmatched"
+        HTTP_IN_FLIGHT.inc(endpoint=g._metrics_endpoint)
+        if PROFILE_HEADER and request.headers.get(PROFILE_HEADER):
+            _profile.set([])
+
+    @app.after_request
+    def _finish_request_metrics(response):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        endpoint = g._metrics_endpoint
+        HTTP_SECONDS.observe(elapsed, endpoint=endpoint)
+        HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        profile = _profile.get()
+        if profile is not None:
+            response.headers["Server-Timing"] = server_timing(profile + [("total", elapsed)])
+        return response
+
+    @app.teardown_request
+    def _teardown_request_metrics(exc):
+        endpoint = g.pop("_metrics_endpoint", None)
+        if endpoint is not None:
+            HTTP_IN_FLIGHT.dec(endpoint=endpoint)
+        _profile.set(None)
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
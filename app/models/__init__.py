@@ -1 +1,4 @@
-from app.models.resume import Resume
\ No newline at end of file
+from app.models.resume import Resume, ANALYSIS_FIELDS, resume_query, resume_summaries
+from app.models.analysis_cache import AnalysisCache
+from app.models.candidate_facets import ResumeSkill, ResumeEmployer, ResumeEducation
+from app.models.corpus_state import CorpusState
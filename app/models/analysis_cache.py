@@ -0,0 +1,11 @@
+from app import db
+
+class AnalysisCache(db.Model):
+    """Extracted text and structured analysis, keyed by file hash + parser/prompt version."""
+    key = db.Column(db.String(128), primary_key=True)
+    text_content = db.Column(db.Text)
+    structured_data = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    def __repr__(self):
+        return f"<AnalysisCache {self.key}>"
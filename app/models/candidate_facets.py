@@ -0,0 +1,37 @@
+from app import db
+
+class ResumeSkill(db.Model):
+    """One normalized skill of a resume, for indexed "who knows X" lookups."""
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey("resume.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = db.Column(db.String(120), nullable=False)
+
+    __table_args__ = (db.Index("ix_resume_skill_name_resume", "name", "resume_id"),)
+
+    def __repr__(self):
+        return f"<ResumeSkill {self.name}>"
+
+class ResumeEmployer(db.Model):
+    """One employer from a resume's work experience."""
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey("resume.id", ondelete="CASCADE"), nullable=False, index=True)
+    company = db.Column(db.String(200), nullable=False)
+    job_title = db.Column(db.String(200))
+
+    __table_args__ = (db.Index("ix_resume_employer_company_resume", "company", "resume_id"),)
+
+    def __repr__(self):
+        return f"<ResumeEmployer {self.company}>"
+
+class ResumeEducation(db.Model):
+    """One degree from a resume, with the graduation year parsed to an integer."""
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey("resume.id", ondelete="CASCADE"), nullable=False, index=True)
+    institution = db.Column(db.String(200))
+    degree = db.Column(db.String(200))
+    graduation_year = db.Column(db.Integer)
+
+    __table_args__ = (db.Index("ix_resume_education_year_resume", "graduation_year", "resume_id"),)
+
+    def __repr__(self):
+        return f"<ResumeEducation {self.degree} {self.graduation_year}>"
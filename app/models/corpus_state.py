@@ -0,0 +1,10 @@
+from app import db
+
+class CorpusState(db.Model):
+    """Single-row table holding the resume corpus generation, bumped on every insert or update."""
+    __tablename__ = "corpus_state"
+    id = db.Column(db.Integer, primary_key=True)
+    generation = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CorpusState generation={self.generation}>"
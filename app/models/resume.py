@@ -3,13 +3,55 @@ from app import db
 class Resume(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(120), index=True,  unique=True)
-    text_content = db.Column(db.Text)
-    personal_info = db.Column(db.JSON)
-    education = db.Column(db.JSON)
-    work_experience = db.Column(db.JSON)
-    skills = db.Column(db.JSON) 
-    projects = db.Column(db.JSON)
-    certifications = db.Column(db.JSON)
+    # Heavy columns are deferred: loading a Resume fetches them only when accessed
+    # or requested up front with resume_query(text=True / analysis=True)
+    text_content = db.deferred(db.Column(db.Text))
+    personal_info = db.deferred(db.Column(db.JSON), group="analysis")
+    education = db.deferred(db.Column(db.JSON), group="analysis")
+    work_experience = db.deferred(db.Column(db.JSON), group="analysis")
+    skills = db.deferred(db.Column(db.JSON), group="analysis")
+    projects = db.deferred(db.Column(db.JSON), group="analysis")
+    certifications = db.deferred(db.Column(db.JSON), group="analysis")
+    # Prompt and model that produced the structured columns (see llm.ANALYSIS_VERSION)
+    analysis_version = db.Column(db.String(200), index=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now(), index=True)
 
     def __repr__(self):
-        return f"<Resume {self.filename}>"
\ No newline at end of file
+        return f"<Resume {self.filename}>"
+
+# Structured columns filled from the LLM analysis, keyed by the analysis JSON field they come from
+ANALYSIS_FIELDS = {
+    "personal_info": "personalInfo",
+    "education": "education",
+    "work_experience": "workExperience",
+    "skills": "skills",
+    "projects": "projects",
+    "certifications": "certifications",
+}
+
+def resume_query(*columns, text=False, analysis=False):
+    """
+    Builds a Resume query that loads only what the caller needs.
+
+    Args:
+        *columns: Resume attributes to load; the primary key is always loaded.
+            Without columns, every column that is not deferred is loaded.
+        text (bool): Also load text_content in the same query.
+        analysis (bool): Also load the six structured JSON columns.
+
+    Returns:
+        Query: Resume query with the loader options applied.
+    """
+    options = []
+    if columns:
+        options.append(db.load_only(*columns))
+    if text:
+        options.append(db.undefer(Resume.text_content))
+    if analysis:
+        options.append(db.undefer_group("analysis"))
+    return Resume.query.options(*options)
+
+def resume_summaries():
+    """Resume query for list and search views: ID, filename, personal info and skills, never the text."""
+    return resume_query(Resume.id, Resume.filename, Resume.personal_info, Resume.skills)
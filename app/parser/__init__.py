@@ -1,3 +1,8 @@
 # parser/__init__.py
+
+# Bump when a parser change alters extracted text, so cached extractions are not reused
+PARSER_VERSION = "5"
+
 from app.parser.pdf_parser import extract_text_from_pdf_with_ocr
+from app.parser.pdf_text_layer import extract_text_from_pdf
 from app.parser.docx_parser import extract_text_from_docx
@@ -1,16 +1,57 @@
 # parser/docx_parser.py
+import io
+import os
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
 from docx import Document
+from app.metrics import timed
+
+# "stream" reads the XML parts directly, "python-docx" uses the full object model (body paragraphs only)
+DOCX_PARSER = os.getenv("DOCX_PARSER", "stream")
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_P = f"{{{W_NS}}}p"
+_T = f"{{{W_NS}}}t"
+_TAB = f"{{{W_NS}}}tab"
+_BR = f"{{{W_NS}}}br"
+_CR = f"{{{W_NS}}}cr"
+_TR = f"{{{W_NS}}}tr"
+_TC = f"{{{W_NS}}}tc"
+_FALLBACK = f"{{{MC_NS}}}Fallback"
 
+@timed("extract_docx")
 def extract_text_from_docx(docx_path):
     """
     Extracts text from a DOCX file.
 
     Args:
-        docx_path (str): Path to the DOCX file.
+        docx_path (str): Path to the DOCX file (or its bytes / a binary file object
+            with the streaming parser).
+
+    Returns:
+        str: Extracted text from the DOCX.
+    """
+    if DOCX_PARSER == "python-docx":
+        return extract_text_from_docx_legacy(docx_path)
+    return extract_text_from_docx_stream(docx_path)
+
+def extract_text_from_docx_legacy(docx_path):
+    """
+    Extracts the body paragraphs of a DOCX file through python-docx.
+
+    Args:
+        docx_path (str): Path to the DOCX file, its bytes or a binary file object.
 
     Returns:
         str: Extracted text from the DOCX.
     """
+    if isinstance(docx_path, (bytes, bytearray, memoryview)):
+        docx_path = io.BytesIO(docx_path)
     text = ""
     try:
         doc = Document(docx_path)
@@ -21,3 +62,118 @@ def extract_text_from_docx(docx_path):
         return ""
 
     return text.strip()
+
+def _part_lines(stream):
+    """
+    Yields the text lines of one WordprocessingML part in document order.
+
+    Paragraphs become lines; the cells of a table row are joined with " | "
+    into one line. Text boxes (w:txbxContent) are ordinary paragraphs nested
+    in a run, so they come out next to their anchor. mc:Fallback content
+    duplicates the mc:Choice it belongs to and is skipped.
+    """
+    paragraphs = []  # runs of the open paragraphs (text boxes nest inside a paragraph)
+    cells = []       # paragraph texts of the open table cells
+    rows = []        # cell texts of the open table rows
+    fallback_depth = 0
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _FALLBACK:
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif tag == _P:
+                paragraphs.append([])
+            elif tag == _TC:
+                cells.append([])
+            elif tag == _TR:
+                rows.append([])
+            continue
+
+        if tag == _FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth:
+            pass
+        elif tag == _T and paragraphs:
+            paragraphs[-1].append(elem.text or "")
+        elif tag == _TAB and paragraphs:
+            paragraphs[-1].append("\t")
+        elif tag in (_BR, _CR) and paragraphs:
+            paragraphs[-1].append("\n")
+        elif tag == _P and paragraphs:
+            line = "".join(paragraphs.pop()).strip()
+            if line:
+                if cells:
+                    cells[-1].append(line)
+                else:
+                    yield line
+        elif tag == _TC and cells:
+            cell = " ".join(cells.pop())
+            if rows:
+                rows[-1].append(cell)
+        elif tag == _TR and rows:
+            line = " | ".join(cell for cell in rows.pop() if cell)
+            if line:
+                if cells:  # nested table
+                    cells[-1].append(line)
+                else:
+                    yield line
+        # Drop parsed content so memory stays flat on long documents
+        elem.clear()
+
+def _header_footer_parts(archive):
+    """Returns the header and footer part names referenced by the main document, in order."""
+    try:
+        rels = ET.fromstring(archive.read("word/_rels/document.xml.rels"))
+    except KeyError:
+        return [], []
+    headers, footers = [], []
+    for rel in rels.iter(f"{{{REL_NS}}}Relationship"):
+        kind = rel.get("Type", "").rsplit("/", 1)[-1]
+        if kind in ("header", "footer") and rel.get("TargetMode") != "External":
+            name = posixpath.normpath(posixpath.join("word", rel.get("Target", "")))
+            (headers if kind == "header" else footers).append(name)
+    return sorted(headers), sorted(footers)
+
+def extract_text_from_docx_stream(source):
+    """
+    Extracts text from a DOCX by streaming its XML parts out of the zip.
+
+    Collects body paragraphs, tables, text boxes, and header/footer text
+    (headers first, footers last, repeated lines only once), without
+    building the python-docx object model, and joins the lines once.
+
+    Args:
+        source (str, bytes or file): Path, in-memory bytes, or a binary file object.
+
+    Returns:
+        str: Extracted text, or "" if the file is not a readable DOCX.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    lines = []
+    try:
+        with zipfile.ZipFile(source) as archive:
+            headers, footers = _header_footer_parts(archive)
+            seen = set()
+            for names, body in ((headers, False), (["word/document.xml"], True), (footers, False)):
+                for name in names:
+                    try:
+                        part = archive.open(name)
+                    except KeyError:
+                        continue
+                    with part:
+                        for line in _part_lines(part):
+                            # Different first-page/even-page headers usually repeat the same text
+                            if not body:
+                                if line in seen:
+                                    continue
+                                seen.add(line)
+                            lines.append(line)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError, OSError) as e:
+        print(f"Error extracting text from DOCX: {e}")
+        return ""
+
+    return "\n".join(lines)
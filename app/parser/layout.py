@@ -0,0 +1,38 @@
+# parser/layout.py
+import os
+
+# Drop the first and last text block of each page (usually running headers/footers)
+OCR_STRIP_HEADER_FOOTER = os.getenv("OCR_STRIP_HEADER_FOOTER", "true").lower() in ("1", "true", "yes")
+
+def words_from_ocr_data(data, strip_header_footer=None):
+    """
+    Joins the words of a pytesseract image_to_data dictionary into page text.
+
+    Works directly on the dictionary's parallel lists, without building a
+    DataFrame. With header/footer stripping enabled, words of block 1 and of
+    the highest-numbered block (as seen on level-2 block rows) are dropped.
+
+    Args:
+        data (dict): Output of pytesseract.image_to_data(..., output_type=Output.DICT).
+        strip_header_footer (bool): Defaults to OCR_STRIP_HEADER_FOOTER.
+
+    Returns:
+        str: Page text, or "" if the page has no OCR rows.
+    """
+    strip = OCR_STRIP_HEADER_FOOTER if strip_header_footer is None else strip_header_footer
+    levels = data.get("level") or []
+    if not levels:
+        print("Warning: No text detected on the page.")
+        return ""
+
+    last_block = None
+    words = []  # (block_num, text) of every word, in reading order
+    for level, block_num, text in zip(levels, data["block_num"], data["text"]):
+        if level == 5:
+            words.append((block_num, text))
+        elif level == 2 and (last_block is None or block_num > last_block):
+            last_block = block_num
+
+    if strip:
+        words = [(block_num, text) for block_num, text in words if block_num != 1 and block_num != last_block]
+    return ' '.join(str(text) for _, text in words).strip()
@@ -0,0 +1,145 @@
+# parser/ocr_engine.py
+import os
+import atexit
+import logging
+import threading
+
+import numpy as np
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:  # tesserocr is optional; without it OCR shells out through pytesseract
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+# OCR backend: "auto" prefers tesserocr when installed, "tesserocr" or "pytesseract" force one
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto").lower()
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+# Resolution PDF pages are rendered at; tesserocr gets raw buffers with no DPI metadata
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+
+# Columns of Tesseract's TSV output, which is also what pytesseract parses into its dictionary
+TSV_COLUMNS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height", "conf", "text")
+
+def parse_tsv(tsv):
+    """
+    Converts Tesseract TSV output into the dictionary pytesseract.image_to_data returns.
+
+    Args:
+        tsv (str): TSV rows, with or without the header line.
+
+    Returns:
+        dict: Parallel lists keyed by TSV_COLUMNS.
+    """
+    data = {column: [] for column in TSV_COLUMNS}
+    for line in tsv.splitlines():
+        fields = line.split("\t")
+        if len(fields) < len(TSV_COLUMNS) - 1 or fields[0] == "level":
+            continue
+        # Rows above word level have an empty text column, which may be missing entirely
+        fields += [""] * (len(TSV_COLUMNS) - len(fields))
+        for column, value in zip(TSV_COLUMNS[:-2], fields):
+            data[column].append(int(value))
+        data["conf"].append(float(fields[-2]))
+        data["text"].append(fields[-1])
+    return data
+
+class PytesseractEngine:
+    """Runs the tesseract binary once per image (temp file + fresh process)."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang=None):
+        self.lang = lang or OCR_LANG
+
+    def image_to_data(self, image):
+        return pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT)
+
+    def close(self):
+        pass
+
+class TesserocrEngine:
+    """
+    Keeps one initialized Tesseract API and feeds it image buffers directly.
+
+    Language data is loaded once, when the engine is created, and images are
+    passed as raw bytes, so no process is spawned and no temp file written
+    per page. Raw buffers carry no resolution, so every image is tagged with
+    the DPI it was rendered at. An API instance must not be shared between threads.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang=None, dpi=None):
+        self.lang = lang or OCR_LANG
+        self.dpi = dpi or OCR_DPI
+        self.api = tesserocr.PyTessBaseAPI(lang=self.lang)
+
+    def image_to_data(self, image):
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+        self.api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+        # Must follow SetImageBytes, which resets the resolution
+        self.api.SetSourceResolution(self.dpi)
+        return parse_tsv(self.api.GetTSVText(0))
+
+    def close(self):
+        self.api.End()
+
+_local = threading.local()
+_engines = []
+_engines_lock = threading.Lock()
+
+def create_ocr_engine(backend=None):
+    """
+    Creates an OCR engine, falling back to pytesseract if tesserocr is unusable.
+
+    Args:
+        backend (str): "auto", "tesserocr" or "pytesseract"; defaults to OCR_ENGINE.
+
+    Returns:
+        PytesseractEngine or TesserocrEngine.
+    """
+    backend = (backend or OCR_ENGINE).lower()
+    if backend in ("auto", "tesserocr"):
+        if tesserocr is None:
+            if backend == "tesserocr":
+                logger.warning("OCR_ENGINE=tesserocr but tesserocr is not installed, using pytesseract")
+        else:
+            try:
+                return TesserocrEngine()
+            except Exception as e:
+                print(f"Error initializing tesserocr, using pytesseract: {e}")
+    return PytesseractEngine()
+
+_resolved_engine_name = None
+
+def resolved_engine_name():
+    """Returns the name of the backend create_ocr_engine picks in this environment, probed once per process."""
+    global _resolved_engine_name
+    if _resolved_engine_name is None:
+        engine = create_ocr_engine()
+        engine.close()
+        _resolved_engine_name = engine.name
+    return _resolved_engine_name
+
+def get_ocr_engine():
+    """Returns this thread's OCR engine, creating it on first use (once per pool worker)."""
+    engine = getattr(_local, "engine", None)
+    if engine is None:
+        engine = _local.engine = create_ocr_engine()
+        with _engines_lock:
+            _engines.append(engine)
+        logger.info(f"Initialized {engine.name} OCR engine in process {os.getpid()}")
+    return engine
+
+def close_ocr_engines():
+    with _engines_lock:
+        while _engines:
+            _engines.pop().close()
+
+atexit.register(close_ocr_engines)
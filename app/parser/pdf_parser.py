@@ -1,21 +1,161 @@
 import cv2
 import os
+import time
+import atexit
+import queue
+import tempfile
+import threading
 import numpy as np
 import pytesseract
-import pandas as pd
-from pdf2image import convert_from_path
+from collections import deque
+from functools import partial
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pdf2image import convert_from_path, convert_from_bytes, pdfinfo_from_path
+from app.parser.layout import words_from_ocr_data
+from app.parser.ocr_engine import get_ocr_engine, OCR_DPI
+from app.metrics import timed, record_stage, OCR_PAGES, OCR_PAGE_SECONDS, STAGE_ERRORS
+from app.admission import admit
+
+# OCR process pool configuration (OCR_WORKERS=0 or 1 keeps OCR in the request process)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0"))
+OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+# Page rasterization configuration
+PDF_STREAMING = os.getenv("PDF_STREAMING", "true").lower() in ("1", "true", "yes")
+PDF_RENDER_WINDOW = max(1, int(os.getenv("PDF_RENDER_WINDOW", "1")))
+OCR_GRAYSCALE = os.getenv("OCR_GRAYSCALE", "true").lower() in ("1", "true", "yes")
+
+# Deskew configuration ("fast" estimates the angle on a downscaled binarized copy, "legacy" on the full page)
+DESKEW_MODE = os.getenv("DESKEW_MODE", "fast")
+DESKEW_MAX_DIM = int(os.getenv("DESKEW_MAX_DIM", "1000"))
+DESKEW_ANGLE_TOLERANCE = float(os.getenv("DESKEW_ANGLE_TOLERANCE", "0.2"))
+
+_ocr_pool = None
+_ocr_pool_size = 0
+_ocr_pool_lock = threading.Lock()
+
+@contextmanager
+def pdf_path(pdf_file):
+    """
+    Yields a filesystem path for a PDF given as a path or as in-memory bytes.
+
+    pdftoppm can only read files, so bytes are written to one temp file that
+    lives as long as the context (instead of once per rendered window).
+    """
+    if isinstance(pdf_file, (bytes, bytearray, memoryview)):
+        with tempfile.NamedTemporaryFile(prefix="cv-pdf-", suffix=".pdf") as tmp:
+            tmp.write(pdf_file)
+            tmp.flush()
+            yield tmp.name
+    else:
+        yield pdf_file
 
 # Step 1: Reading PDF Files
 def read_pdf(pdf_file):
+    if isinstance(pdf_file, (bytes, bytearray, memoryview)):
+        return convert_from_bytes(bytes(pdf_file))
     if not os.path.exists(pdf_file):
         print(f"Error: File not found at {pdf_file}")
         return []
     pages = convert_from_path(pdf_file)
     return pages
 
+def iter_pdf_pages(pdf_file, dpi=None, grayscale=None, window=None, page_numbers=None):
+    """
+    Rasterizes a PDF a few pages at a time instead of all at once.
+
+    Args:
+        pdf_file (str or bytes): Path to the PDF file, or its contents.
+        dpi (int): Render resolution; defaults to OCR_DPI.
+        grayscale (bool): Render single-channel images; defaults to OCR_GRAYSCALE.
+        window (int): Pages rendered per pdftoppm call; defaults to PDF_RENDER_WINDOW.
+        page_numbers (list): 1-based pages to render; defaults to every page.
+
+    Yields:
+        PIL.Image.Image: One page image at a time, in page order.
+    """
+    if isinstance(pdf_file, str) and not os.path.exists(pdf_file):
+        print(f"Error: File not found at {pdf_file}")
+        return
+    dpi = dpi or OCR_DPI
+    grayscale = OCR_GRAYSCALE if grayscale is None else grayscale
+    window = window or PDF_RENDER_WINDOW
+
+    with pdf_path(pdf_file) as path:
+        if page_numbers is None:
+            page_numbers = range(1, pdfinfo_from_path(path)["Pages"] + 1)
+
+        for first_page, last_page in _page_windows(sorted(page_numbers), window):
+            pages = convert_from_path(path, dpi=dpi, grayscale=grayscale,
+                                      first_page=first_page, last_page=last_page)
+            while pages:
+                # Hand pages over one by one so the window is released as it is consumed
+                yield pages.pop(0)
+
+def _page_windows(page_numbers, window):
+    """Groups sorted page numbers into consecutive (first, last) runs of at most window pages."""
+    first_page = last_page = None
+    for number in page_numbers:
+        if first_page is not None and number == last_page + 1 and number - first_page < window:
+            last_page = number
+            continue
+        if first_page is not None:
+            yield first_page, last_page
+        first_page = last_page = number
+    if first_page is not None:
+        yield first_page, last_page
+
+def _prefetch(iterable, depth):
+    """
+    Produces items from iterable on a background thread, at most depth ahead.
+
+    An exception raised by the iterable is handed over and re-raised in the
+    consumer after the items produced before it. When the consumer stops
+    early (an error, or the generator is closed) the producer notices at its
+    next put and exits, dropping the items it still holds.
+    """
+    items = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def put(item):
+        # Gives up once the consumer is gone instead of blocking on a full queue forever
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        put(done)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
 # Step 2: Image Preprocessing - Deskewing the images
 def deskew(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     gray = cv2.bitwise_not(gray)
     coords = np.column_stack(np.where(gray > 0))
     angle = cv2.minAreaRect(coords)[-1]
@@ -32,57 +172,228 @@ def deskew(image):
 
     return rotated
 
+def estimate_skew_angle(gray, max_dim=None):
+    """
+    Estimates the skew of a grayscale page on a downscaled, Otsu-binarized copy.
+
+    Args:
+        gray (numpy.ndarray): Single-channel page image (dark text on light background).
+        max_dim (int): Longest side of the copy used for estimation; defaults to DESKEW_MAX_DIM.
+
+    Returns:
+        float: Rotation in degrees that straightens the page (0.0 for blank pages).
+    """
+    max_dim = max_dim or DESKEW_MAX_DIM
+    scale = min(1.0, max_dim / max(gray.shape[:2]))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+    _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    coords = cv2.findNonZero(binary)
+    if coords is None or len(coords) < 10:
+        return 0.0
+
+    angle = cv2.minAreaRect(coords)[-1]
+    # minAreaRect reports the angle in [-90, 0) or (0, 90] depending on the OpenCV version
+    if angle < -45:
+        angle += 90
+    elif angle > 45:
+        angle -= 90
+    return angle
+
+def deskew_fast(gray, tolerance=None, max_dim=None):
+    """
+    Deskews a grayscale page, skipping the rotation when the skew is negligible.
+
+    Args:
+        gray (numpy.ndarray): Single-channel page image.
+        tolerance (float): Angles below this many degrees are left alone;
+            defaults to DESKEW_ANGLE_TOLERANCE.
+        max_dim (int): See estimate_skew_angle.
+
+    Returns:
+        tuple: (deskewed image, angle in degrees).
+    """
+    tolerance = DESKEW_ANGLE_TOLERANCE if tolerance is None else tolerance
+    angle = estimate_skew_angle(gray, max_dim)
+    if abs(angle) < tolerance:
+        return gray, angle
+
+    (h, w) = gray.shape[:2]
+    M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    rotated = cv2.warpAffine(gray, M, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    return rotated, angle
+
 # Step 3: Running OCR using pytesseract
 def extract_text_from_image(image):
     text = pytesseract.image_to_string(image)
     return text
 
 # Step 4: Text Extraction with Additional Preprocessing
-def process_page(page):
+def process_page(page, strip_header_footer=None, return_timings=False):
+    timings = {"deskew_mode": DESKEW_MODE}
     try:
         # Convert PIL image to numpy array
         page_arr = np.array(page)
         
-        # Deskew the page using the original color image
-        page_deskew = deskew(page_arr)
+        start = time.perf_counter()
+        if DESKEW_MODE == "fast":
+            # Convert to grayscale once, then estimate the angle on a small copy
+            gray = page_arr if page_arr.ndim == 2 else cv2.cvtColor(page_arr, cv2.COLOR_BGR2GRAY)
+            page_deskew_gray, timings["skew_angle"] = deskew_fast(gray)
+        else:
+            # Deskew the page using the original color image
+            page_deskew = deskew(page_arr)
+            
+            # Convert to grayscale after deskewing
+            if page_deskew.ndim == 2:
+                page_deskew_gray = page_deskew
+            else:
+                page_deskew_gray = cv2.cvtColor(page_deskew, cv2.COLOR_BGR2GRAY)
+        timings["deskew_seconds"] = time.perf_counter() - start
         
-        # Convert to grayscale after deskewing
-        page_deskew_gray = cv2.cvtColor(page_deskew, cv2.COLOR_BGR2GRAY)
-        
-        # Extract text using pytesseract
-        d = pytesseract.image_to_data(page_deskew_gray, output_type=pytesseract.Output.DICT)
-        d_df = pd.DataFrame.from_dict(d)
-        
-        if d_df.empty:
-            print("Warning: No text detected on the page.")
-            return ""
-
-        # Identify block numbers
-        block_num = d_df.loc[d_df['level'] == 2, 'block_num'].max()
+        # Extract text with this worker's OCR engine (tesserocr if available, else pytesseract)
+        start = time.perf_counter()
+        d = get_ocr_engine().image_to_data(page_deskew_gray)
+        timings["ocr_seconds"] = time.perf_counter() - start
         
-        # Identify header and footer
-        header_index = d_df[d_df['block_num'] == 1].index.values
-        footer_index = d_df[d_df['block_num'] == block_num].index.values
-        
-        # Extract relevant text excluding headers and footers
-        text = ' '.join(d_df.loc[
-            (d_df['level'] == 5) & 
-            (~d_df.index.isin(header_index) & ~d_df.index.isin(footer_index)), 'text'
-        ].values)
-        
-        return text.strip()
+        # Extract relevant text, optionally excluding headers and footers
+        text = words_from_ocr_data(d, strip_header_footer)
     except Exception as e:
         print(f"Error processing page: {e}")
-        return ""
+        text = ""
+        # Lets callers tell a failed page from a blank one
+        timings["error"] = str(e)
+    return (text, timings) if return_timings else text
+
+# Shared process pool so worker startup is paid once, not on every upload
+def get_ocr_pool(workers=None):
+    """
+    Returns the process pool used for per-page OCR, creating it on first use.
+
+    Args:
+        workers (int): Requested pool size, capped at OCR_MAX_WORKERS.
+            Only used when the pool is created.
+
+    Returns:
+        ProcessPoolExecutor: The shared pool.
+    """
+    global _ocr_pool, _ocr_pool_size
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool_size = max(1, min(workers or OCR_WORKERS or 1, OCR_MAX_WORKERS))
+            _ocr_pool = ProcessPoolExecutor(max_workers=_ocr_pool_size)
+        return _ocr_pool
+
+def shutdown_ocr_pool():
+    """Shuts down the shared OCR pool, if one was started."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=False, cancel_futures=True)
+            _ocr_pool = None
+
+atexit.register(shutdown_ocr_pool)
+
+def _record_page_timings(results, return_timings):
+    # Pages may be OCR'd in pool workers, so their timings are recorded here, in the parent
+    texts = []
+    for text, timings in results:
+        OCR_PAGES.inc()
+        if "error" in timings:
+            STAGE_ERRORS.inc(stage="ocr_page")
+        for phase in ("deskew", "ocr"):
+            seconds = timings.get(f"{phase}_seconds")
+            if seconds is not None:
+                OCR_PAGE_SECONDS.observe(seconds, phase=phase)
+                record_stage(f"ocr_page_{phase}", seconds)
+        texts.append((text, timings) if return_timings else text)
+    return texts
+
+def process_pages(pages, workers=None, return_timings=False):
+    """
+    Runs process_page over every page, in a process pool when enabled.
+
+    Args:
+        pages (list): Page images.
+        workers (int): Number of OCR processes; defaults to OCR_WORKERS.
+        return_timings (bool): Return (text, timings) per page, see process_page.
+
+    Returns:
+        list: Extracted text per page, in page order.
+    """
+    workers = OCR_WORKERS if workers is None else workers
+    if workers > 1 and len(pages) > 1:
+        try:
+            # Executor.map yields results in submission order, so pages stay ordered
+            results = list(get_ocr_pool(workers).map(partial(process_page, return_timings=True), pages))
+            return _record_page_timings(results, return_timings)
+        except BrokenProcessPool as e:
+            print(f"OCR pool failed, falling back to serial OCR: {e}")
+            shutdown_ocr_pool()
+    return _record_page_timings([process_page(page, return_timings=True) for page in pages], return_timings)
+
+def process_pages_streaming(pages, workers=None, return_timings=False):
+    """
+    Runs process_page over a page iterator while later pages are still rendering.
+
+    Only a bounded number of pages is held in memory at any time: in pool mode
+    at most two pages per worker are in flight, otherwise a single page is
+    rendered ahead of the one being OCR'd.
+
+    Args:
+        pages (iterable): Page images, e.g. from iter_pdf_pages.
+        workers (int): Number of OCR processes; defaults to OCR_WORKERS.
+        return_timings (bool): Return (text, timings) per page, see process_page.
+
+    Returns:
+        list: Extracted text per page, in page order.
+    """
+    workers = OCR_WORKERS if workers is None else workers
+    if workers > 1:
+        pool = get_ocr_pool(workers)
+        max_in_flight = 2 * _ocr_pool_size
+        in_flight = deque()
+        results = []
+        try:
+            for page in pages:
+                in_flight.append(pool.submit(process_page, page, None, True))
+                if len(in_flight) >= max_in_flight:
+                    results.append(in_flight.popleft().result())
+            while in_flight:
+                results.append(in_flight.popleft().result())
+            return _record_page_timings(results, return_timings)
+        except BrokenProcessPool as e:
+            print(f"OCR pool failed: {e}")
+            shutdown_ocr_pool()
+            raise
+
+    results = [process_page(page, return_timings=True) for page in _prefetch(pages, PDF_RENDER_WINDOW)]
+    return _record_page_timings(results, return_timings)
 
 # Step 5: Extracting Text from Multiple Pages in a PDF
-def extract_text_from_pdf_with_ocr(pdf_file):
+@timed("ocr_pdf")
+def extract_text_from_pdf_with_ocr(pdf_file, workers=None):
+    # One OCR slot per document; sheds the upload if too many are already waiting
+    with admit("ocr"):
+        return _extract_text_from_pdf_with_ocr(pdf_file, workers)
+
+def _extract_text_from_pdf_with_ocr(pdf_file, workers=None):
+    if PDF_STREAMING:
+        # Render and OCR page by page so memory stays flat for long documents
+        try:
+            extracted_text = process_pages_streaming(iter_pdf_pages(pdf_file), workers=workers)
+        except Exception as e:
+            print(f"Error extracting text from PDF: {e}")
+            return f"Error: Failed to render PDF pages: {e}"
+        if not extracted_text:
+            return "Error: No pages found in the PDF."
+        return '\n'.join(filter(None, extracted_text))
+
     # Read the PDF and convert it to images
     pages = read_pdf(pdf_file)
     if not pages:
         return "Error: No pages found in the PDF."
 
-    extracted_text = [process_page(page) for page in pages]
+    extracted_text = process_pages(pages, workers=workers)
     
     return '\n'.join(filter(None, extracted_text))  # Remove empty text entries
 
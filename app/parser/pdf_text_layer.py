@@ -0,0 +1,147 @@
+# parser/pdf_text_layer.py
+import io
+import os
+import time
+import logging
+
+from app.parser.pdf_parser import (iter_pdf_pages, process_pages, process_pages_streaming,
+                                   extract_text_from_pdf_with_ocr, PDF_STREAMING)
+from app.metrics import timed, PDF_PAGES
+from app.admission import admit
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pypdf is optional; without it every page goes through OCR
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of letters/digits for a page's text layer to be trusted over OCR
+TEXT_LAYER_MIN_CHARS = int(os.getenv("TEXT_LAYER_MIN_CHARS", "40"))
+
+def has_usable_text(text, min_chars=None):
+    """
+    Checks whether a page's embedded text is worth using instead of OCR.
+
+    Scanned pages usually have no text layer at all, while broken font
+    encodings show up as replacement characters instead of letters.
+
+    Args:
+        text (str): Text extracted from the page's text layer.
+        min_chars (int): Minimum number of alphanumeric characters.
+
+    Returns:
+        bool: True if the text layer can be used as-is.
+    """
+    if not text:
+        return False
+    min_chars = TEXT_LAYER_MIN_CHARS if min_chars is None else min_chars
+    alnum = sum(1 for ch in text if ch.isalnum())
+    garbage = text.count("�") + text.count("(cid:")
+    return alnum >= min_chars and garbage * 10 < alnum
+
+def extract_text_layer(pdf_file):
+    """
+    Reads the embedded text of every page without rasterizing anything.
+
+    Args:
+        pdf_file (str or bytes): Path to the PDF file, or its contents.
+
+    Returns:
+        list: Text per page, or None if the text layer could not be read.
+    """
+    if PdfReader is None:
+        return None
+    try:
+        if isinstance(pdf_file, (bytes, bytearray, memoryview)):
+            pdf_file = io.BytesIO(pdf_file)
+        reader = PdfReader(pdf_file)
+        pages = []
+        for page in reader.pages:
+            try:
+                pages.append(page.extract_text() or "")
+            except Exception as e:
+                print(f"Error reading text layer of page, falling back to OCR: {e}")
+                pages.append("")
+        return pages
+    except Exception as e:
+        print(f"Error reading PDF text layer, falling back to OCR: {e}")
+        return None
+
+def _ocr_pages(pdf_file, page_numbers):
+    # Streams pages into OCR as they render, or renders them all first when PDF_STREAMING is off
+    if PDF_STREAMING:
+        return process_pages_streaming(iter_pdf_pages(pdf_file, page_numbers=page_numbers), return_timings=True)
+    pages = list(iter_pdf_pages(pdf_file, page_numbers=page_numbers, window=len(page_numbers)))
+    return process_pages(pages, return_timings=True)
+
+@timed("extract_pdf")
+def extract_text_from_pdf(pdf_file, return_stats=False):
+    """
+    Extracts text from a PDF, using the text layer where possible and OCR otherwise.
+
+    Each page is probed for a usable text layer first; only pages without one
+    are rasterized and OCR'd, so mixed documents fall back page by page.
+
+    Args:
+        pdf_file (str or bytes): Path to the PDF file, or its contents.
+        return_stats (bool): Also return per-page extraction stats.
+
+    Returns:
+        str: Extracted text (or (text, stats) if return_stats is set), where
+        stats is a list of {"page", "method", "chars"} dicts; OCR'd pages
+        also carry the deskew/OCR timings from process_page. Pages whose
+        OCR failed carry an "error" message, so a broken PDF can be told
+        apart from a blank one.
+    """
+    start = time.perf_counter()
+    layer = extract_text_layer(pdf_file)
+
+    if layer is None:
+        # No readable text layer at all - whole-document OCR
+        text = extract_text_from_pdf_with_ocr(pdf_file)
+        if text.startswith("Error:"):
+            print(f"Error running OCR: {text}")
+            stats = [{"page": None, "method": "ocr", "chars": 0, "error": text[len("Error:"):].strip()}]
+            return ("", stats) if return_stats else ""
+        stats = [{"page": None, "method": "ocr", "chars": len(text)}]
+        return (text, stats) if return_stats else text
+
+    texts = [page_text.strip() if has_usable_text(page_text) else None for page_text in layer]
+    ocr_pages = [number for number, page_text in enumerate(texts, start=1) if page_text is None]
+    ocr_set = set(ocr_pages)
+    ocr_timings = {}
+
+    if ocr_pages:
+        with admit("ocr"):
+            error = "page could not be rendered"
+            try:
+                ocr_results = _ocr_pages(pdf_file, ocr_pages)
+            except Exception as e:
+                print(f"Error running OCR fallback: {e}")
+                ocr_results, error = [], str(e)
+        for number, (page_text, timings) in zip(ocr_pages, ocr_results):
+            texts[number - 1] = page_text
+            ocr_timings[number] = timings
+        # Pages the renderer or OCR never returned
+        for number in ocr_pages[len(ocr_results):]:
+            ocr_timings[number] = {"error": error}
+
+    stats = [
+        {
+            "page": number,
+            "method": "ocr" if number in ocr_set else "text_layer",
+            "chars": len(page_text or ""),
+            **ocr_timings.get(number, {}),
+        }
+        for number, page_text in enumerate(texts, start=1)
+    ]
+    PDF_PAGES.inc(len(texts) - len(ocr_pages), method="text_layer")
+    PDF_PAGES.inc(len(ocr_pages), method="ocr")
+    logger.info(
+        f"Extracted {len(texts)} PDF pages in {time.perf_counter() - start:.3f}s "
+        f"({len(texts) - len(ocr_pages)} text layer, {len(ocr_pages)} OCR)"
+    )
+
+    text = '\n'.join(filter(None, texts))
+    return (text, stats) if return_stats else text
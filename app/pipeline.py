@@ -0,0 +1,234 @@
+import os
+import json
+import difflib
+import hashlib
+import logging
+
+from app.llm_operations.llm import get_resume_analysis
+from app.db_operations import save_candidate
+from app.parser.pdf_text_layer import extract_text_from_pdf
+from app.parser.docx_parser import extract_text_from_docx
+from app.admission import Overloaded
+from app.analysis_cache import file_sha256, cache_key, get_cached_analysis, store_analysis
+from app.search import find_near_duplicates
+from app.models import Resume, ANALYSIS_FIELDS, resume_query
+
+# Configure Logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Near-duplicate uploads (edited versions of a stored CV): "flag" reports them, "reuse" also
+# takes over the stored analysis instead of calling the LLM, "off" skips the lookup
+NEAR_DUPLICATE_MODE = os.getenv("NEAR_DUPLICATE_MODE", "flag").lower()
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+# Changed lines listed per direction in a near-duplicate report
+NEAR_DUPLICATE_MAX_CHANGES = 20
+
+class IngestionError(Exception):
+    """Raised when a stage of the ingestion pipeline fails."""
+
+    def __init__(self, message, status_code=200):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def extract_text(filepath, filename):
+    """
+    Extracts text from an uploaded CV based on its file type.
+
+    Args:
+        filepath (str or bytes): Path to the stored upload, or its contents.
+        filename (str): Sanitized original filename.
+
+    Returns:
+        str: Extracted text.
+
+    Raises:
+        IngestionError: If the format is unsupported or a PDF could not be rendered or OCR'd.
+    """
+    if filename.lower().endswith(".pdf"):
+        text, page_stats = extract_text_from_pdf(filepath, return_stats=True)
+        logger.info(f"Extracted text from PDF: {len(text)} characters, pages: {page_stats}")
+        errors = [stats["error"] for stats in page_stats if "error" in stats]
+        if errors:
+            # A PDF that failed to render or OCR must not pass for a blank one
+            logger.error(f"Failed to read {filename}: {errors[0]}")
+            raise IngestionError(f"Failed to read PDF: {errors[0]}", 500)
+    elif filename.lower().endswith(".docx"):
+        text = extract_text_from_docx(filepath)
+        logger.info(f"Extracted text from DOCX: {len(text)} characters")
+    else:
+        raise IngestionError("Unsupported file format", 400)
+    return text
+
+def analyze_text(text):
+    """
+    Runs the LLM analysis and returns the structured data as a dictionary.
+
+    Args:
+        text (str): Extracted resume text.
+
+    Returns:
+        dict: Structured resume data, or None if the analysis failed.
+    """
+    try:
+        structured_data = get_resume_analysis(text)
+        # Ensure structured_data is a dictionary
+        if isinstance(structured_data, str):
+            structured_data = json.loads(structured_data)  # Convert JSON string to dictionary
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error in processing resume: {str(e)}")
+        raise IngestionError(f"An error occurred while processing the resume: {str(e)}", 500)
+
+    if not structured_data or "error" in structured_data:
+        logger.error(f"Resume analysis failed: {structured_data}")
+        return None
+    logger.info("Successfully analyzed resume data")
+    return structured_data
+
+def text_changes(old_text, new_text, limit=NEAR_DUPLICATE_MAX_CHANGES):
+    """
+    Lists the lines added and removed between two versions of a resume.
+
+    Returns:
+        dict: {"added": [...], "removed": [...]}, at most limit lines each.
+    """
+    added, removed = [], []
+    old_lines = [line.strip() for line in (old_text or "").splitlines() if line.strip()]
+    new_lines = [line.strip() for line in (new_text or "").splitlines() if line.strip()]
+    for line in difflib.unified_diff(old_lines, new_lines, lineterm="", n=0):
+        if line.startswith(("---", "+++", "@@")):
+            continue
+        target = added if line.startswith("+") else removed
+        if len(target) < limit:
+            target.append(line[1:])
+    return {"added": added, "removed": removed}
+
+def find_previous_version(text, filename):
+    """
+    Looks up the stored resume most similar to a new upload.
+
+    The row stored under the same filename is skipped: the upload is about
+    to overwrite it, so its analysis describes the old text, not an
+    earlier version worth reusing.
+
+    Args:
+        text (str): Extracted text of the upload.
+        filename (str): Sanitized filename of the upload.
+
+    Returns:
+        dict: {"resume_id", "filename", "similarity", "changes", "analysis_version", "structured_data"}
+        for the closest resume at or above NEAR_DUPLICATE_THRESHOLD, or None.
+    """
+    try:
+        same_file = resume_query(Resume.id).filter(Resume.filename == filename).first()
+        hits = find_near_duplicates(text, NEAR_DUPLICATE_THRESHOLD, exclude=same_file.id if same_file else None)
+        if not hits:
+            return None
+        resume_id, score = hits[0]
+        resume = resume_query(text=True, analysis=True).filter(Resume.id == resume_id).first()
+    except Exception as e:
+        print(f"Error looking up near-duplicates: {e}")
+        return None
+    if resume is None:
+        return None
+
+    structured_data = {key: getattr(resume, column) for column, key in ANALYSIS_FIELDS.items()}
+    logger.info(f"{filename} is a near-duplicate of {resume.filename} (similarity {score:.2f})")
+    return {
+        "resume_id": resume.id,
+        "filename": resume.filename,
+        "similarity": round(score, 3),
+        "changes": text_changes(resume.text_content, text),
+        "analysis_version": resume.analysis_version,
+        # Only reusable if the stored version was actually analyzed
+        "structured_data": structured_data if any(structured_data.values()) else None,
+    }
+
+def prepare_document(filepath, filename, progress=None, content_hash=None):
+    """
+    Runs the extract and analyze stages for one stored upload, without saving.
+
+    Args:
+        filepath (str or bytes): Path to the stored upload, or its contents.
+        filename (str): Sanitized original filename.
+        progress (callable): Optional callback receiving the name of each stage
+            ("extracting", "analyzing") as it starts.
+        content_hash (str): SHA-256 of the file, if the caller already computed it.
+
+    Returns:
+        dict: {"filename", "text", "structured_data", "cached", "near_duplicate"}, where
+        near_duplicate describes a stored resume with nearly the same text (or is None).
+        A reused analysis also carries the "analysis_version" it was made with.
+
+    Raises:
+        IngestionError: If text extraction or analysis fails.
+    """
+    report = progress or (lambda stage: None)
+
+    # Identical bytes under the same parser/prompt version were already processed
+    if content_hash is None:
+        if isinstance(filepath, (bytes, bytearray)):
+            content_hash = hashlib.sha256(filepath).hexdigest()
+        else:
+            content_hash = file_sha256(filepath)
+    key = cache_key(content_hash)
+    cached = get_cached_analysis(key)
+    if cached:
+        logger.info(f"Analysis cache hit for {filename}")
+        return {"filename": filename, "text": cached["text"],
+                "structured_data": cached["structured_data"], "cached": True, "near_duplicate": None}
+
+    report("extracting")
+    text = extract_text(filepath, filename)
+    if not text:
+        raise IngestionError("Failed to extract text from CV")
+
+    # An edited version of a stored CV (new phone number, an extra bullet) misses the exact-hash cache
+    previous = find_previous_version(text, filename) if NEAR_DUPLICATE_MODE != "off" else None
+    near_duplicate = None
+    if previous:
+        structured_data = previous.pop("structured_data")
+        analysis_version = previous.pop("analysis_version")
+        near_duplicate = dict(previous, reused=NEAR_DUPLICATE_MODE == "reuse" and structured_data is not None)
+        if near_duplicate["reused"]:
+            # Not stored in the analysis cache: this result was not produced for these bytes.
+            # It keeps the earlier row's analysis version, so a re-analysis still picks it up if stale
+            return {"filename": filename, "text": text, "structured_data": structured_data,
+                    "cached": False, "near_duplicate": near_duplicate, "analysis_version": analysis_version}
+
+    report("analyzing")
+    structured_data = analyze_text(text)
+    if not structured_data:
+        raise IngestionError("Failed to analyze CV")
+    store_analysis(key, text, structured_data)
+
+    return {"filename": filename, "text": text, "structured_data": structured_data, "cached": False,
+            "near_duplicate": near_duplicate}
+
+def ingest_document(filepath, filename, progress=None, content_hash=None):
+    """
+    Runs the extract -> analyze -> save pipeline for one stored upload.
+
+    Args:
+        filepath (str or bytes): Path to the stored upload, or its contents.
+        filename (str): Sanitized original filename.
+        progress (callable): Optional callback receiving the name of each stage
+            ("extracting", "analyzing", "saving") as it starts.
+        content_hash (str): SHA-256 of the file, if the caller already computed it.
+
+    Returns:
+        dict: Summary of the processed document.
+
+    Raises:
+        IngestionError: If text extraction or analysis fails.
+    """
+    report = progress or (lambda stage: None)
+    document = prepare_document(filepath, filename, progress=report, content_hash=content_hash)
+
+    report("saving")
+    save_candidate(filename, document["text"], document["structured_data"], document.get("analysis_version"))
+    return {"filename": filename, "cached": document["cached"], "characters": len(document["text"] or ""),
+            "near_duplicate": document["near_duplicate"]}
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from app import db
+from app.models import CorpusState
+from app.metrics import CACHE_EVENTS
+
+try:
+    import redis
+except ImportError:  # redis is optional; only needed for QUERY_CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Query-answer cache configuration ("memory" per process, "redis" shared between workers, "none" disables)
+QUERY_CACHE_BACKEND = os.getenv("QUERY_CACHE_BACKEND", "memory").lower()
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "3600"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024"))
+QUERY_CACHE_REDIS_URL = os.getenv("QUERY_CACHE_REDIS_URL", "redis://localhost:6379/1")
+
+def normalize_query(query_text):
+    """Lowercases, collapses whitespace and drops trailing punctuation, so trivial variants share an entry."""
+    return " ".join(str(query_text).lower().split()).rstrip("?!. ")
+
+def corpus_generation():
+    """
+    Returns the current corpus generation.
+
+    Returns:
+        int: Counter bumped by every resume insert or update (0 for an empty corpus).
+    """
+    state = db.session.get(CorpusState, 1)
+    return state.generation if state else 0
+
+def bump_corpus_generation():
+    """
+    Increments the corpus generation inside the caller's transaction.
+
+    On PostgreSQL and SQLite the increment is a single INSERT ... ON
+    CONFLICT (id) DO UPDATE, so concurrent writers never lose a bump and
+    two first bumps cannot both insert the row (which would fail one of the
+    callers' save transactions). Other databases update the row and create
+    it if the update matched nothing.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(CorpusState).values(id=1, generation=1)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[CorpusState.id], set_={"generation": CorpusState.generation + 1}))
+        return
+
+    updated = db.session.execute(
+        db.update(CorpusState).where(CorpusState.id == 1).values(generation=CorpusState.generation + 1))
+    if updated.rowcount == 0:
+        db.session.add(CorpusState(id=1, generation=1))
+
+class MemoryQueryCache:
+    """In-process cache with a per-entry TTL and least-recently-used eviction."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                CACHE_EVENTS.inc(cache="query", event="evictions")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisQueryCache:
+    """
+    Cache shared by all workers through Redis.
+
+    Entries expire after the TTL; size is bounded by the server's maxmemory
+    with an LRU eviction policy (e.g. allkeys-lru).
+    """
+
+    def __init__(self, url, ttl, prefix="cv:query:"):
+        if redis is None:
+            raise RuntimeError("QUERY_CACHE_BACKEND=redis requires the redis package")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(key)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_query_cache():
+    """Returns the configured cache backend, or None if the cache is disabled."""
+    global _cache
+    if QUERY_CACHE_BACKEND == "none":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            if QUERY_CACHE_BACKEND == "redis":
+                _cache = RedisQueryCache(QUERY_CACHE_REDIS_URL, QUERY_CACHE_TTL)
+            else:
+                _cache = MemoryQueryCache(QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_TTL)
+        return _cache
+
+def query_cache_key(query_text, generation, settings=""):
+    """
+    Builds the cache key for a query against one corpus generation.
+
+    Args:
+        query_text (str): The user's query.
+        generation (int): Value of corpus_generation().
+        settings (str): Anything else the answer depends on (model, retrieval limits).
+
+    Returns:
+        str: Hex digest.
+    """
+    raw = f"{normalize_query(query_text)}\x00{generation}\x00{settings}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def get_cached_answer(key):
+    """Returns the cached answer for a key, or None. Backend errors count as misses."""
+    cache = get_query_cache() if key else None
+    if cache is None:
+        return None
+    try:
+        answer = cache.get(key)
+    except Exception as e:
+        print(f"Error reading query cache: {e}")
+        answer = None
+    CACHE_EVENTS.inc(cache="query", event="hits" if answer is not None else "misses")
+    return answer
+
+def store_answer(key, answer):
+    """Stores an answer; failures are logged and otherwise ignored."""
+    cache = get_query_cache() if key else None
+    if cache is None:
+        return
+    try:
+        cache.set(key, answer)
+        CACHE_EVENTS.inc(cache="query", event="stores")
+    except Exception as e:
+        print(f"Error writing query cache: {e}")
@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from app import db
+from app.models import Resume, ANALYSIS_FIELDS, resume_query
+from app.db_operations import save_candidates
+from app.admission import priority, PRIORITY_BACKGROUND
+from app.llm_operations.llm import get_resume_analysis, analysis_prompts, ANALYSIS_VERSION
+from app.llm_operations.chunking import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Bulk re-analysis defaults (flask reanalyze)
+REANALYZE_CONCURRENCY = int(os.getenv("REANALYZE_CONCURRENCY", "4"))
+REANALYZE_BATCH_SIZE = int(os.getenv("REANALYZE_BATCH_SIZE", "50"))
+REANALYZE_CHECKPOINT = os.getenv("REANALYZE_CHECKPOINT", os.path.join(os.getcwd(), "reanalyze.checkpoint.json"))
+
+def stale_resumes(redo_all=False, filename=None, updated_before=None, after_id=0, filename_like=None):
+    """
+    Builds the query for the resumes a re-analysis should visit, in ID order.
+
+    Args:
+        redo_all (bool): Include rows already analyzed with ANALYSIS_VERSION.
+        filename (str): Exact filename.
+        updated_before (datetime): Only rows last written before this time.
+        after_id (int): Skip rows up to this ID (keyset pagination / checkpoint).
+        filename_like (str): SQL LIKE pattern on the filename, e.g. "2023-%"; "%" and "_"
+            are wildcards, escape them with a backslash to match them literally.
+
+    Returns:
+        Query: Resume query over id and filename.
+    """
+    query = resume_query(Resume.id, Resume.filename).filter(Resume.id > after_id)
+    if not redo_all:
+        query = query.filter(db.or_(Resume.analysis_version.is_(None), Resume.analysis_version != ANALYSIS_VERSION))
+    if filename:
+        query = query.filter(Resume.filename == filename)
+    if filename_like:
+        query = query.filter(Resume.filename.like(filename_like, escape="\\"))
+    if updated_before:
+        query = query.filter(Resume.updated_at < updated_before)
+    return query.order_by(Resume.id)
+
+def run_key(**filters):
+    """Identifies a run by its analysis version and filters, so a checkpoint is only resumed by the same run."""
+    raw = json.dumps(dict(filters, version=ANALYSIS_VERSION), sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+def load_checkpoint(path, key):
+    """
+    Reads the checkpoint of an interrupted run.
+
+    Returns:
+        dict: {"key", "last_id", "done", "failed"}; a fresh state if the file is
+        missing, unreadable or belongs to a different run.
+    """
+    fresh = {"key": key, "last_id": 0, "done": 0, "failed": []}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return fresh
+    if state.get("key") != key:
+        logger.info(f"Ignoring checkpoint {path} from a different run")
+        return fresh
+    return state
+
+def save_checkpoint(path, state):
+    """Writes the checkpoint atomically, so a crash mid-write keeps the previous one."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def _analyze(resume):
+    # Runs on a worker thread: below interactive queries and uploads in the LLM pool, never shed
+    with priority(PRIORITY_BACKGROUND):
+        return get_resume_analysis(resume.text_content or "")
+
+def _load_texts(ids):
+    return (resume_query(Resume.id, Resume.filename, text=True, analysis=True)
+            .filter(Resume.id.in_(ids)).order_by(Resume.id).all())
+
+def _changed_fields(resume, structured_data):
+    return [column for column, field in ANALYSIS_FIELDS.items()
+            if getattr(resume, column) != structured_data.get(field, {})]
+
+def estimate(redo_all=False, filename=None, updated_before=None, batch_size=None, filename_like=None):
+    """
+    Dry run: counts the resumes a re-analysis would redo and the LLM work involved.
+
+    Returns:
+        dict: {"resumes", "requests", "prompt_tokens"} (token count estimated).
+    """
+    batch_size = batch_size or REANALYZE_BATCH_SIZE
+    totals = {"resumes": 0, "requests": 0, "prompt_tokens": 0}
+    last_id = 0
+    while True:
+        ids = [row.id for row in
+               stale_resumes(redo_all, filename, updated_before, last_id, filename_like).limit(batch_size)]
+        if not ids:
+            return totals
+        for resume in _load_texts(ids):
+            prompts = analysis_prompts(resume.text_content or "")
+            totals["resumes"] += 1
+            totals["requests"] += len(prompts)
+            totals["prompt_tokens"] += sum(estimate_tokens(prompt) for prompt in prompts)
+        last_id = ids[-1]
+
+def sample(size, redo_all=False, filename=None, updated_before=None, concurrency=None, filename_like=None):
+    """
+    Re-analyzes a few resumes without writing anything, to preview a prompt or model change.
+
+    Returns:
+        list: {"id", "filename", "changed" (columns that would change) or "error"} per resume.
+    """
+    ids = [row.id for row in stale_resumes(redo_all, filename, updated_before, 0, filename_like).limit(size)]
+    resumes = _load_texts(ids)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency or REANALYZE_CONCURRENCY)) as executor:
+        results = list(executor.map(_analyze, resumes))
+    report = []
+    for resume, structured_data in zip(resumes, results):
+        entry = {"id": resume.id, "filename": resume.filename}
+        if not isinstance(structured_data, dict) or "error" in structured_data:
+            entry["error"] = structured_data.get("error") if isinstance(structured_data, dict) else "no result"
+        else:
+            entry["changed"] = _changed_fields(resume, structured_data)
+        report.append(entry)
+    return report
+
+def reanalyze(redo_all=False, filename=None, updated_before=None, concurrency=None, batch_size=None,
+              checkpoint=None, restart=False, progress=None, filename_like=None):
+    """
+    Re-runs the LLM analysis on stored text for out-of-date (or all) resumes.
+
+    Rows are visited in ID order, batch_size at a time: each batch is
+    analyzed with at most `concurrency` resumes in flight, written with one
+    upsert and commit (facets, corpus generation and search indexes
+    included), and then recorded in the checkpoint file. Rerunning the
+    same command after a crash continues after the last committed batch;
+    rows whose analysis failed are listed in the checkpoint and skipped
+    until the run is restarted.
+
+    Args:
+        redo_all (bool): Redo rows already analyzed with ANALYSIS_VERSION.
+        filename (str): Exact filename.
+        updated_before (datetime): Only rows last written before this time.
+        concurrency (int): Resumes analyzed at once; defaults to REANALYZE_CONCURRENCY.
+        batch_size (int): Resumes per database transaction; defaults to REANALYZE_BATCH_SIZE.
+        checkpoint (str): Checkpoint file; defaults to REANALYZE_CHECKPOINT.
+        restart (bool): Ignore an existing checkpoint.
+        progress (callable): Called after each batch with (done, failed, total, rate), where
+            rate is resumes processed per second by this run.
+        filename_like (str): SQL LIKE pattern on the filename, see stale_resumes.
+
+    Returns:
+        dict: {"done", "failed", "total"}, where failed lists resume IDs.
+    """
+    concurrency = max(1, concurrency or REANALYZE_CONCURRENCY)
+    batch_size = batch_size or REANALYZE_BATCH_SIZE
+    checkpoint = checkpoint or REANALYZE_CHECKPOINT
+    key = run_key(redo_all=redo_all, filename=filename, updated_before=updated_before, filename_like=filename_like)
+    state = {"key": key, "last_id": 0, "done": 0, "failed": []} if restart else load_checkpoint(checkpoint, key)
+    if state["last_id"]:
+        logger.info(f"Resuming re-analysis after resume {state['last_id']} ({state['done']} done)")
+
+    remaining = stale_resumes(redo_all, filename, updated_before, state["last_id"], filename_like).count()
+    total = state["done"] + len(state["failed"]) + remaining
+    start, processed = time.perf_counter(), 0
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="reanalyze") as executor:
+        while True:
+            ids = [row.id for row in
+                   stale_resumes(redo_all, filename, updated_before, state["last_id"], filename_like)
+                   .limit(batch_size)]
+            if not ids:
+                break
+            resumes = _load_texts(ids)
+            candidates, failed = [], []
+            for resume, structured_data in zip(resumes, executor.map(_analyze, resumes)):
+                if isinstance(structured_data, dict) and structured_data and "error" not in structured_data:
+                    candidates.append((resume.filename, resume.text_content, structured_data))
+                else:
+                    logger.warning(f"Re-analysis of {resume.filename} failed: {structured_data}")
+                    failed.append(resume.id)
+            # Detach the loaded rows before the upsert rewrites them
+            db.session.expunge_all()
+
+            failed_names = set(save_candidates(candidates, batch_size=len(candidates) or 1))
+            failed.extend(resume.id for resume in resumes if resume.filename in failed_names)
+            state["done"] += len(candidates) - len(failed_names)
+            state["failed"] += failed
+            state["last_id"] = ids[-1]
+            save_checkpoint(checkpoint, state)
+            processed += len(resumes)
+            if progress:
+                elapsed = time.perf_counter() - start
+                progress(state["done"], len(state["failed"]), total, processed / elapsed if elapsed else 0)
+
+    logger.info(f"Re-analysis finished: {state['done']} updated, {len(state['failed'])} failed")
+    return {"done": state["done"], "failed": state["failed"], "total": total}
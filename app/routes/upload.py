@@ -1,16 +1,25 @@
-from flask import Blueprint, request, jsonify,render_template,current_app
-from werkzeug.utils import secure_filename
+from flask import Blueprint, request, jsonify,render_template,current_app,Response,stream_with_context
 import os
+import shutil
 import logging
+import tempfile
 import json
 
 # Import the db instance directly from app.py
 from app import db
-from app.llm_operations.llm import get_resume_analysis
-from app.llm_operations.llm_query import query_cv_data
-from app.db_operations import save_candidate
-from app.parser.pdf_parser import extract_text_from_pdf_with_ocr
-from app.parser.docx_parser import extract_text_from_docx
+from app.llm_operations.llm_query import query_cv_data, query_cv_data_stream
+from app.llm_operations.client import LLMError
+from app.analysis_cache import cache_stats
+from app.pipeline import ingest_document, IngestionError
+from app.jobs import get_job_queue
+from app.search import semantic_search
+from app.models import Resume
+from app.candidate_search import search_candidates
+from app.batch import unpack_zip, save_uploaded_files, ingest_batch, BatchError
+from app.admission import admit, admit_streaming, priority, Overloaded, PRIORITY_INTERACTIVE
+from app.export import EXPORT_FORMATS, parse_fields, parse_date, export_chunks
+from app.uploads import (receive_upload, store_original, UploadTooLarge, UPLOAD_STORE_ORIGINALS,
+                         UPLOAD_TMP_DIR)
 
 upload_bp = Blueprint('upload', __name__)
 
@@ -26,6 +35,23 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def receive_file(file):
+    """Receives one uploaded file (hashed, size-checked, in memory or spooled) and keeps the original if configured."""
+    upload = receive_upload(file)
+    if UPLOAD_STORE_ORIGINALS:
+        try:
+            store_original(upload)
+        except OSError as e:
+            print(f"Error storing original upload: {e}")
+    return upload
+
+@upload_bp.errorhandler(413)
+@upload_bp.errorhandler(UploadTooLarge)
+def upload_too_large(e):
+    """Rejects request bodies over MAX_CONTENT_LENGTH and files over UPLOAD_MAX_BYTES."""
+    message = str(e) if isinstance(e, UploadTooLarge) else 'Request body too large'
+    return jsonify({'error': message}), 413
+
 @upload_bp.route("/", methods=['GET', 'POST'])
 def upload_file():
     if request.method == 'POST':
@@ -35,54 +61,14 @@ def upload_file():
         if file.filename == '':
             return jsonify({'error': 'No selected file'})
         if file and file.filename.lower().endswith('.pdf'):
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            file.save(filepath)
-
-            # Extract text based on file type
-            text = ""
-            if filename.endswith(".pdf"):
-                text = extract_text_from_pdf_with_ocr(filepath)
-                logger.info(f"Extracted text from PDF: {len(text)} characters")
-            elif filename.endswith(".docx"):
-                text = extract_text_from_docx(filepath)
-                logger.info(f"Extracted text from DOCX: {len(text)} characters")
-            else:
-                return jsonify({"error": "Unsupported file format"}), 400           
-
-            if text:
-                # Process the extracted text synchronously
+            # Process the upload synchronously, straight from memory (or its spooled temp file).
+            # Only pages without a usable text layer take an OCR slot, so only those can be shed
+            with receive_file(file) as upload:
                 try:
-                    structured_data = get_resume_analysis(text)
-                    # Ensure structured_data is a dictionary
-                    if isinstance(structured_data, str):  
-                        structured_data = json.loads(structured_data)  # Convert JSON string to dictionary
-
-                    logger.info(f"Successfully analyzed resume data")                   
-                    
-                    # Create and save Resume object
-                    if structured_data:
-                        save_candidate(filename,text,structured_data)
-                        # Debugging: Log template path
-                        template_path = os.path.join(current_app.root_path, 'templates', 'index.html') # app.root_path gets the root of the app.
-                        logger.info(f"Attempting to render template at: {template_path}")
-
-                        # Debugging: Check if template file exists
-                        if not os.path.exists(template_path):
-                            logger.error(f"Template not found at: {template_path}")
-                        return render_template('index.html')
-                        
-                    else:
-                        return jsonify({'error': 'Failed to analyze CV'})                  
-                    
-
-                except Exception as e:
-                    logger.error(f"Error in processing resume: {str(e)}")
-                    return jsonify({"error": f"An error occurred while processing the resume: {str(e)}"}), 500
-
-                
-            else:
-                return jsonify({'error': 'Failed to extract text from CV'})
+                    ingest_document(upload.source(), upload.filename, content_hash=upload.sha256)
+                except IngestionError as e:
+                    return jsonify({'error': e.message}), e.status_code
+            return render_template('index.html')
         else:
             return jsonify({'error': 'Unsupported file type'})
 
@@ -94,11 +80,184 @@ def query():
     data = request.get_json()
     query_text = data.get('query')
     if query_text:
-        response = query_cv_data(query_text)
+        # Stream the answer as server-sent events if the client asks for it
+        if data.get('stream') or 'text/event-stream' in request.headers.get('Accept', ''):
+            # The query slot is taken before any byte is sent (so overload is still a 503)
+            # and given back when the response is closed
+            release = admit_streaming('query', PRIORITY_INTERACTIVE)
+            response = Response(stream_with_context(stream_answer(query_text)), mimetype='text/event-stream',
+                                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+            response.call_on_close(release)
+            return response
+        with admit('query', PRIORITY_INTERACTIVE):
+            response = query_cv_data(query_text)
         return jsonify({'response': response})
     return jsonify({'error': 'No query provided'})
 
 
+def sse_event(event, data):
+    """Formats one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_answer(query_text):
+    """
+    Relays the answer to a query as 'token' events, followed by 'done' or 'error'.
+
+    If the client disconnects, the server closes this generator, which in
+    turn closes the upstream LLM request.
+    """
+    # Send something right away so the client gets the headers before retrieval and generation
+    yield ": stream opened\n\n"
+    try:
+        with priority(PRIORITY_INTERACTIVE):
+            for text in query_cv_data_stream(query_text):
+                yield sse_event('token', {'text': text})
+    except Overloaded as e:
+        yield sse_event('error', {'error': "Server is busy, please retry shortly.", 'retry_after': e.retry_after})
+        return
+    except LLMError as e:
+        if e.status_code is not None:
+            yield sse_event('error', {'error': f"HTTP {e.status_code}: {e.body}"})
+        else:
+            print(f"Error querying CV data: {e}")
+            yield sse_event('error', {'error': "Sorry, I couldn't process your query."})
+        return
+    except Exception as e:
+        print(f"Error querying CV data: {e}")
+        yield sse_event('error', {'error': "Sorry, I couldn't process your query."})
+        return
+    yield sse_event('done', {})
+
+
+@upload_bp.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queues an uploaded CV for ingestion and returns its job ID immediately."""
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file part'}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No selected file'}), 400
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Unsupported file type'}), 400
+
+    # The job gets its own uniquely named copy, which it deletes when it finishes
+    with receive_file(file) as upload:
+        filename = upload.filename
+        filepath = upload.to_file(UPLOAD_FOLDER)
+        job_id = get_job_queue(current_app._get_current_object()).submit(
+            filepath, filename, content_hash=upload.sha256, cleanup=True)
+    logger.info(f"Queued ingestion job {job_id} for {filename}")
+    return jsonify({'job_id': job_id, 'status_url': f"{request.script_root}/api/jobs/{job_id}"}), 202
+
+
+@upload_bp.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Reports the status and current stage of an ingestion job."""
+    job = get_job_queue(current_app._get_current_object()).status(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    return jsonify(job)
+
+
+@upload_bp.route('/batch', methods=['POST'])
+def upload_batch():
+    """Ingests a zip archive ('archive') or several files ('files') and returns a per-file manifest."""
+    # Files are unpacked into a private directory, removed once the batch is done
+    batch_dir = tempfile.mkdtemp(prefix="cv-batch-", dir=UPLOAD_TMP_DIR)
+    try:
+        try:
+            if 'archive' in request.files and request.files['archive'].filename:
+                entries = unpack_zip(request.files['archive'].stream, batch_dir)
+            else:
+                files = [f for f in request.files.getlist('files') if f.filename]
+                if not files:
+                    return jsonify({'error': 'No files provided'}), 400
+                entries = save_uploaded_files(files, batch_dir)
+        except BatchError as e:
+            return jsonify({'error': str(e)}), 400
+
+        manifest = ingest_batch(current_app._get_current_object(), entries)
+    finally:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+    summary = {}
+    for entry in manifest:
+        summary[entry['status']] = summary.get(entry['status'], 0) + 1
+    return jsonify({'total': len(manifest), 'summary': summary, 'files': manifest})
+
+
+@upload_bp.route('/search/semantic', methods=['GET'])
+def search_semantic():
+    """Returns the resumes whose skills, experience, projects or education best match 'q'."""
+    query_text = request.args.get('q', '').strip()
+    if not query_text:
+        return jsonify({'error': 'No query provided'}), 400
+    k = min(request.args.get('k', 10, type=int), 100)
+
+    hits = semantic_search([query_text], k=k)[0]
+    filenames = dict(db.session.query(Resume.id, Resume.filename)
+                     .filter(Resume.id.in_([hit['resume_id'] for hit in hits])).all())
+    results = [dict(hit, filename=filenames[hit['resume_id']]) for hit in hits if hit['resume_id'] in filenames]
+    return jsonify({'query': query_text, 'results': results})
+
+
+@upload_bp.route('/candidates', methods=['GET'])
+def list_candidates():
+    """
+    Structured candidate search without the LLM, e.g.
+    /api/candidates?skill=kubernetes&company=acme&graduated_after=2018&limit=20&cursor=...
+    """
+    try:
+        candidates, next_cursor = search_candidates(
+            skills=request.args.getlist('skill'),
+            company=request.args.get('company'),
+            graduated_after=request.args.get('graduated_after', type=int),
+            graduated_before=request.args.get('graduated_before', type=int),
+            limit=request.args.get('limit', 20, type=int),
+            cursor=request.args.get('cursor'),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'results': [{
+            'id': resume.id,
+            'filename': resume.filename,
+            'name': resume.personal_info.get('name') if isinstance(resume.personal_info, dict) else None,
+            'skills': resume.skills,
+        } for resume in candidates],
+        'next_cursor': next_cursor,
+    })
+
+
+@upload_bp.route('/export', methods=['GET'])
+def export_candidates():
+    """
+    Streams all candidates as JSON lines or CSV, e.g.
+    /api/export?format=csv&fields=id,filename,skills&created_after=2024-01-01
+    """
+    fmt = request.args.get('format', 'jsonl')
+    try:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt!r}")
+        fields = parse_fields(request.args.get('fields'))
+        filters = {name: parse_date(request.args.get(name))
+                   for name in ('created_after', 'created_before', 'updated_after', 'updated_before')}
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # No Content-Length: the body is sent with chunked transfer encoding as rows are read
+    mimetype = 'application/x-ndjson' if fmt == 'jsonl' else 'text/csv'
+    return Response(stream_with_context(export_chunks(fmt, fields, **filters)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename=candidates.{fmt}'})
+
+
+@upload_bp.route('/cache/stats', methods=['GET'])
+def analysis_cache_stats():
+    """Returns hit/miss counters of the extraction + analysis cache."""
+    return jsonify(cache_stats())
+
+
 
 def upload_resume():
     """
@@ -114,41 +273,14 @@ def upload_resume():
             return jsonify({"error": "No selected file"}), 400
 
         if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(UPLOAD_FOLDER, filename)
-            logger.info(f"Saving file to: {file_path}")
-            file.save(file_path)
-
-            # Extract text based on file type
-            text = ""
-            if filename.endswith(".pdf"):
-                text = extract_text_from_pdf_with_ocr(file_path)
-                logger.info(f"Extracted text from PDF: {len(text)} characters")
-            elif filename.endswith(".docx"):
-                text = extract_text_from_docx(file_path)
-                logger.info(f"Extracted text from DOCX: {len(text)} characters")
-            else:
-                return jsonify({"error": "Unsupported file format"}), 400
-
             # Process the extracted text synchronously
-            try:
-                structured_data = get_resume_analysis(text)
-                # Ensure structured_data is a dictionary
-                if isinstance(structured_data, str):  
-                    structured_data = json.loads(structured_data)  # Convert JSON string to dictionary
-
-                logger.info(f"Successfully analyzed resume data")
-
-                
-                
-                # Create and save Resume object
-                save_candidate(filename,text,structured_data)
-                
-                
-
-            except Exception as e:
-                logger.error(f"Error in processing resume: {str(e)}")
-                return jsonify({"error": f"An error occurred while processing the resume: {str(e)}"}), 500
+            with receive_file(file) as upload:
+                filename = upload.filename
+                logger.info(f"Received {filename}: {upload.size} bytes")
+                try:
+                    ingest_document(upload.source(), filename, content_hash=upload.sha256)
+                except IngestionError as e:
+                    return jsonify({"error": e.message}), 500 if e.status_code == 200 else e.status_code
 
             return jsonify({
                 "message": "File uploaded and processed successfully",
@@ -156,7 +288,11 @@ def upload_resume():
             }), 200
 
         return jsonify({"error": "Invalid file format"}), 400
-    
+
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error in file upload: {str(e)}")
         return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
\ No newline at end of file
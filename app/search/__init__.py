@@ -0,0 +1,259 @@
+# search/__init__.py
+import os
+import json
+import logging
+import threading
+
+from app.search.bm25 import BM25Index, tokenize
+from app.search.embedders import load_embedder
+from app.search.vector_index import VectorIndex
+from app.search.minhash import MinHashIndex, MINHASH_PERMUTATIONS, MINHASH_SHINGLE_SIZE
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_DIR = os.getenv("SEARCH_INDEX_DIR", os.path.join(os.getcwd(), "search_index"))
+
+_bm25_index = None
+_vector_index = None
+_minhash_index = None
+_embedder = None
+_index_lock = threading.RLock()
+
+def resume_document(resume):
+    """
+    Builds the searchable text of a Resume row: its extracted text plus skills.
+
+    Args:
+        resume (Resume): The row to index.
+
+    Returns:
+        str: Text to index.
+    """
+    skills = resume.skills
+    if isinstance(skills, (list, dict)):
+        skills = json.dumps(skills)
+    return f"{resume.text_content or ''}\n{skills or ''}"
+
+def _describe(entry, keys):
+    if isinstance(entry, dict):
+        return ", ".join(str(entry[key]) for key in keys if entry.get(key))
+    return str(entry)
+
+def resume_chunks(resume):
+    """
+    Splits the structured columns of a Resume row into sections for semantic search.
+
+    Args:
+        resume (Resume): The row to split.
+
+    Returns:
+        list: (section, text) pairs, one per skills list, job, project and degree.
+    """
+    chunks = []
+    skills = resume.skills
+    if isinstance(skills, list) and skills:
+        chunks.append(("skills", ", ".join(str(skill) for skill in skills)))
+    elif isinstance(skills, (str, dict)) and skills:
+        chunks.append(("skills", skills if isinstance(skills, str) else json.dumps(skills)))
+
+    sections = (
+        ("work_experience", resume.work_experience, ("jobTitle", "company", "duration", "responsibilities")),
+        ("projects", resume.projects, ("projectName", "description", "technologiesUsed")),
+        ("education", resume.education, ("degree", "institution", "yearOfGraduation")),
+    )
+    for section, entries, keys in sections:
+        if isinstance(entries, dict):
+            entries = [entries]
+        for entry in entries or []:
+            text = _describe(entry, keys)
+            if text.strip():
+                chunks.append((section, text))
+
+    if not chunks and resume.text_content:
+        # No structured data (e.g. failed analysis) - fall back to the raw text
+        chunks.append(("text", resume.text_content[:2000]))
+    return chunks
+
+def get_bm25_index():
+    """
+    Returns the process-wide BM25 index, building it from the database if it does not exist yet.
+
+    Must be called inside an application context.
+    """
+    global _bm25_index
+    with _index_lock:
+        if _bm25_index is None:
+            path = os.path.join(SEARCH_INDEX_DIR, "bm25.jsonl")
+            fresh = not os.path.exists(path)
+            _bm25_index = BM25Index(path)
+            if fresh:
+                rebuild_bm25_index(_bm25_index)
+        return _bm25_index
+
+def rebuild_bm25_index(index, batch_size=500):
+    """Indexes every stored resume, e.g. for an index created after resumes were saved."""
+    from app.models import Resume, resume_query
+
+    count = 0
+    last_id = 0
+    while True:
+        batch = (resume_query(Resume.id, Resume.text_content, Resume.skills).filter(Resume.id > last_id)
+                 .order_by(Resume.id).limit(batch_size).all())
+        if not batch:
+            break
+        index.add_many([(resume.id, resume_document(resume)) for resume in batch])
+        count += len(batch)
+        last_id = batch[-1].id
+    logger.info(f"Built BM25 index over {count} resumes")
+
+def get_embedder():
+    """Returns the embedder configured by EMBEDDER."""
+    global _embedder
+    with _index_lock:
+        if _embedder is None:
+            _embedder = load_embedder()
+        return _embedder
+
+def get_vector_index():
+    """
+    Returns the process-wide vector index, building it from the database if it does not exist yet.
+
+    Must be called inside an application context.
+    """
+    global _vector_index
+    embedder = get_embedder()
+    with _index_lock:
+        if _vector_index is None:
+            directory = os.path.join(SEARCH_INDEX_DIR, "vectors")
+            _vector_index = VectorIndex(directory, embedder.dim, getattr(embedder, "name", type(embedder).__name__))
+            if not os.path.exists(os.path.join(directory, "meta.json")):
+                rebuild_vector_index(_vector_index)
+        return _vector_index
+
+def _vector_items(resumes):
+    chunked = [(resume.id, resume_chunks(resume)) for resume in resumes]
+    texts = [text for _, chunks in chunked for _, text in chunks]
+    vectors = get_embedder().embed(texts) if texts else None
+    items, offset = [], 0
+    for resume_id, chunks in chunked:
+        items.append((resume_id, chunks, vectors[offset:offset + len(chunks)] if chunks else None))
+        offset += len(chunks)
+    return items
+
+def rebuild_vector_index(index, batch_size=500):
+    """Embeds every stored resume into an empty vector index."""
+    from app.models import Resume, resume_query
+
+    last_id = 0
+    while True:
+        batch = (resume_query(text=True, analysis=True).filter(Resume.id > last_id)
+                 .order_by(Resume.id).limit(batch_size).all())
+        if not batch:
+            break
+        index.upsert(_vector_items(batch))
+        last_id = batch[-1].id
+    logger.info(f"Built vector index over {len(index)} resumes")
+
+def get_minhash_index():
+    """
+    Returns the process-wide near-duplicate index, building it from the database if it does not exist yet.
+
+    Must be called inside an application context.
+    """
+    global _minhash_index
+    with _index_lock:
+        if _minhash_index is None:
+            # Signatures of other lengths or shingle sizes are not comparable; they get their own file
+            path = os.path.join(SEARCH_INDEX_DIR, f"minhash-{MINHASH_PERMUTATIONS}-{MINHASH_SHINGLE_SIZE}.jsonl")
+            fresh = not os.path.exists(path)
+            _minhash_index = MinHashIndex(path)
+            if fresh:
+                rebuild_minhash_index(_minhash_index)
+        return _minhash_index
+
+def rebuild_minhash_index(index, batch_size=500):
+    """Computes the signature of every stored resume, e.g. for an index created after resumes were saved."""
+    from app.models import Resume, resume_query
+
+    last_id = 0
+    while True:
+        batch = (resume_query(Resume.id, Resume.text_content).filter(Resume.id > last_id)
+                 .order_by(Resume.id).limit(batch_size).all())
+        if not batch:
+            break
+        index.add_many([(resume.id, resume.text_content) for resume in batch])
+        last_id = batch[-1].id
+    logger.info(f"Built MinHash index over {len(index)} resumes")
+
+def find_near_duplicates(text, threshold, exclude=None):
+    """
+    Finds stored resumes whose text is nearly identical to a new one.
+
+    Args:
+        text (str): Extracted text of the new resume.
+        threshold (float): Minimum estimated Jaccard similarity of their word shingles.
+        exclude (int): Resume ID to ignore.
+
+    Returns:
+        list: (resume_id, similarity) pairs, most similar first.
+    """
+    return get_minhash_index().query(text, threshold, exclude=exclude)
+
+def index_resumes(resumes):
+    """
+    Adds or refreshes saved resumes in the search index.
+
+    Failures are logged and never propagate, so indexing can't break a save.
+
+    Args:
+        resumes (list): Saved Resume rows.
+    """
+    try:
+        get_bm25_index().add_many([(resume.id, resume_document(resume)) for resume in resumes])
+    except Exception as e:
+        print(f"Error updating search index: {e}")
+    try:
+        get_vector_index().upsert(_vector_items(resumes))
+    except Exception as e:
+        print(f"Error updating vector index: {e}")
+    try:
+        get_minhash_index().add_many([(resume.id, resume.text_content) for resume in resumes])
+    except Exception as e:
+        print(f"Error updating near-duplicate index: {e}")
+
+def search_resume_ids(query, k=5):
+    """
+    Finds the resumes most relevant to a free-text query.
+
+    Args:
+        query (str): The user's query.
+        k (int): Maximum number of resumes.
+
+    Returns:
+        list: (resume_id, score) pairs, best first.
+    """
+    return get_bm25_index().search(query, k=k)
+
+def semantic_search(queries, k=10):
+    """
+    Finds the resumes whose sections are semantically closest to each query.
+
+    Args:
+        queries (list): Query strings; all are embedded and scored in one batch.
+        k (int): Maximum number of resumes per query.
+
+    Returns:
+        list: For each query, a list of {"resume_id", "score", "section", "text"}
+        dicts (best matching section per resume), best first.
+    """
+    vectors = get_embedder().embed(queries)
+    # Several sections of one resume can match; over-fetch, then keep the best per resume
+    results = []
+    for hits in get_vector_index().search(vectors, k=k * 4):
+        best = {}
+        for entry, score in hits:
+            if entry["resume_id"] not in best:
+                best[entry["resume_id"]] = {"resume_id": entry["resume_id"], "score": score,
+                                            "section": entry["section"], "text": entry["text"]}
+        results.append(list(best.values())[:k])
+    return results
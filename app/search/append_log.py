@@ -0,0 +1,129 @@
+# search/append_log.py
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class AppendLogIndex:
+    """
+    Base class for in-memory indexes persisted as an append-only JSON-lines log.
+
+    Each update appends {"id": ..., <value_key>: ...} (or {"id": ...,
+    "deleted": true}); loading replays the log and later entries win.
+    Other processes appending to the same log are picked up on the next
+    read by reading only the new tail. The log is compacted once it holds
+    twice as many entries as there are documents; compaction replaces the
+    file, which readers detect by its inode changing. Appends and
+    compactions hold an flock on "<path>.lock", so processes sharing the
+    log never lose each other's entries.
+
+    Subclasses set value_key and name and implement _clear, _apply,
+    _documents and __len__.
+    """
+
+    value_key = "value"
+    name = "append-log"
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._inode = None
+        self._reset()
+        self._load()
+
+    # Subclass hooks
+
+    def _clear(self):
+        """Drops every document from memory."""
+        raise NotImplementedError
+
+    def _apply(self, doc_id, value):
+        """Adds or replaces a document, or removes it if value is None."""
+        raise NotImplementedError
+
+    def _documents(self):
+        """Yields (doc_id, value) for every document, for compaction."""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    # Log maintenance
+
+    def _reset(self):
+        self._clear()
+        self._log_entries = self._offset = 0
+
+    def _load(self):
+        # Replays log lines written since the last read (by this or another process)
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            if (stat.st_dev, stat.st_ino) != self._inode or stat.st_size < self._offset:
+                # A new file: first load, or the log was compacted (by any process) - start over
+                self._reset()
+                self._inode = (stat.st_dev, stat.st_ino)
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # Partially written line; pick it up next time
+                self._offset += len(line.encode("utf-8"))
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._log_entries += 1
+                self._apply(entry["id"], None if entry.get("deleted") else entry[self.value_key])
+
+    @contextmanager
+    def _file_lock(self):
+        # Serializes appends and compactions across processes
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, entries):
+        """Appends log entries with a single write, then compacts the log if it has grown too long."""
+        data = "".join(json.dumps(entry) + "\n" for entry in entries)
+        with self._lock, self._file_lock():
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+            self._load()
+            if self._log_entries > 2 * max(len(self), 64):
+                self._compact()
+
+    def _entry(self, doc_id, value):
+        return {"id": doc_id, self.value_key: value} if value else {"id": doc_id, "deleted": True}
+
+    def remove(self, doc_id):
+        self._write([{"id": doc_id, "deleted": True}])
+
+    def _compact(self):
+        # Caller holds the file lock and has just loaded the whole log, so no entry is dropped
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for doc_id, value in self._documents():
+                f.write(json.dumps({"id": doc_id, self.value_key: value}) + "\n")
+        os.replace(tmp_path, self.path)
+        stat = os.stat(self.path)
+        self._log_entries = len(self)
+        self._offset = stat.st_size
+        self._inode = (stat.st_dev, stat.st_ino)
+        logger.info(f"Compacted {self.name} index to {self._log_entries} documents")
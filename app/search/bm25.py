@@ -0,0 +1,116 @@
+# search/bm25.py
+import re
+import math
+import logging
+from collections import Counter
+
+from app.search.append_log import AppendLogIndex
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this to was were will with "
+    "who what which whom whose where when how do does did can could should would i me my we our you your "
+    "he she they them their his her its any all".split()
+)
+
+def tokenize(text):
+    """
+    Splits text into lowercase search terms.
+
+    Keeps tech tokens such as "c++", "c#" and "node.js" intact and drops
+    common English stopwords.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        list: Search terms in order of appearance.
+    """
+    return [token for token in _TOKEN_RE.findall((text or "").lower()) if token not in STOPWORDS]
+
+class BM25Index(AppendLogIndex):
+    """
+    Incrementally updated BM25 inverted index over resumes.
+
+    Persisted as an append-only log of {"id": ..., "terms": {...}} entries,
+    see AppendLogIndex.
+    """
+
+    value_key = "terms"
+    name = "BM25"
+
+    # Maintenance
+
+    def _clear(self):
+        self._doc_terms = {}   # doc id -> {term: tf}
+        self._postings = {}    # term -> {doc id: tf}
+        self._doc_len = {}
+        self._total_len = 0
+
+    def _apply(self, doc_id, terms):
+        old = self._doc_terms.pop(doc_id, None)
+        if old is not None:
+            for term in old:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_len -= self._doc_len.pop(doc_id, 0)
+        if terms:
+            self._doc_terms[doc_id] = terms
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+            length = sum(terms.values())
+            self._doc_len[doc_id] = length
+            self._total_len += length
+
+    def _documents(self):
+        return self._doc_terms.items()
+
+    def add(self, doc_id, text):
+        """Adds or replaces the document doc_id."""
+        self.add_many([(doc_id, text)])
+
+    def add_many(self, documents):
+        """Adds or replaces several (doc_id, text) documents with a single log write."""
+        self._write([self._entry(doc_id, dict(Counter(tokenize(text)))) for doc_id, text in documents])
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    # Querying
+
+    def search(self, query, k=5):
+        """
+        Ranks documents against a query.
+
+        Args:
+            query (str): Free-text query.
+            k (int): Maximum number of results.
+
+        Returns:
+            list: (doc_id, score) pairs, best first.
+        """
+        with self._lock:
+            self._load()
+            n_docs = len(self._doc_terms)
+            if not n_docs:
+                return []
+            avg_len = self._total_len / n_docs
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
@@ -0,0 +1,70 @@
+# search/embedders.py
+import os
+import zlib
+import importlib
+
+import numpy as np
+
+from app.search.bm25 import tokenize
+
+class HashingEmbedder:
+    """
+    CPU-only embedder that needs no model download or network access.
+
+    Unigrams and bigrams are hashed into a fixed number of signed buckets
+    (the "hashing trick"), weighted with sublinear term frequency and
+    L2-normalized, so cosine similarity is a plain dot product.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim=512):
+        self.dim = dim
+
+    def _features(self, text):
+        tokens = tokenize(text)
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts):
+        """
+        Embeds a batch of texts.
+
+        Args:
+            texts (list): Texts to embed.
+
+        Returns:
+            numpy.ndarray: float32 matrix of shape (len(texts), dim) with unit-length rows.
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            if not features:
+                continue
+            hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features),
+                                 dtype=np.uint32, count=len(features))
+            buckets = (hashes % self.dim).astype(np.int64)
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], buckets, signs)
+        # Sublinear term frequency, keeping the sign of each bucket
+        np.multiply(np.sign(vectors), np.log1p(np.abs(vectors)), out=vectors)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+def load_embedder(spec=None):
+    """
+    Creates the embedder configured by EMBEDDER.
+
+    Args:
+        spec (str): "hashing" (default) or "package.module:ClassName" for a
+            custom class with a `dim` attribute and an `embed(texts)` method
+            returning an (n, dim) float32 array.
+
+    Returns:
+        object: The embedder instance.
+    """
+    spec = spec or os.getenv("EMBEDDER", "hashing")
+    if spec == "hashing":
+        return HashingEmbedder(dim=int(os.getenv("EMBEDDER_DIM", "512")))
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
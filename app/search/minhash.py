@@ -0,0 +1,148 @@
+# search/minhash.py
+import os
+import zlib
+
+import numpy as np
+
+from app.search.bm25 import tokenize
+from app.search.append_log import AppendLogIndex
+
+# Signature length and LSH banding (rows per band = permutations / bands). With 128/32, pairs
+# above ~0.4 Jaccard similarity almost always share a bucket; candidates are then checked
+# against the caller's threshold with the full signature.
+MINHASH_PERMUTATIONS = int(os.getenv("MINHASH_PERMUTATIONS", "128"))
+MINHASH_BANDS = int(os.getenv("MINHASH_BANDS", "32"))
+# Words per shingle
+MINHASH_SHINGLE_SIZE = int(os.getenv("MINHASH_SHINGLE_SIZE", "3"))
+
+# Fixed seed: signatures must be comparable across processes and restarts
+_SEED = 1
+
+def _permutations(num_perm):
+    rng = np.random.default_rng(_SEED)
+    # Random odd 64-bit multipliers for multiply-shift hashing
+    a = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64)
+    return a, b
+
+def shingles(text, size=None):
+    """
+    Splits text into overlapping word n-grams.
+
+    Uses the search tokenizer, so case, punctuation and stopwords do not
+    matter; a text shorter than one shingle is a single shingle.
+
+    Args:
+        text (str): Extracted resume text.
+        size (int): Words per shingle; defaults to MINHASH_SHINGLE_SIZE.
+
+    Returns:
+        set: Shingle strings.
+    """
+    size = size or MINHASH_SHINGLE_SIZE
+    tokens = tokenize(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+def signature(text, num_perm=None):
+    """
+    Computes the MinHash signature of a text.
+
+    Args:
+        text (str): Extracted resume text.
+        num_perm (int): Signature length; defaults to MINHASH_PERMUTATIONS.
+
+    Returns:
+        list: num_perm integers, or None for a text without words; the share
+        of equal positions between two signatures estimates the Jaccard
+        similarity of their shingle sets.
+    """
+    num_perm = num_perm or MINHASH_PERMUTATIONS
+    values = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64)
+    if not len(values):
+        return None
+    a, b = _permutations(num_perm)
+    # (a * x + b) mod 2^64, keeping the high 32 bits; one row per permutation
+    with np.errstate(over="ignore"):
+        hashed = (np.outer(a, values) + b[:, None]) >> np.uint64(32)
+    return [int(value) for value in hashed.min(axis=1)]
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(np.asarray(sig_a) == np.asarray(sig_b)))
+
+class MinHashIndex(AppendLogIndex):
+    """
+    Locality-sensitive hashing index of resume MinHash signatures.
+
+    Persisted as an append-only log of {"id": ..., "sig": [...]} entries,
+    see AppendLogIndex.
+    """
+
+    value_key = "sig"
+    name = "MinHash"
+
+    def __init__(self, path, num_perm=None, bands=None):
+        self.num_perm = num_perm or MINHASH_PERMUTATIONS
+        self.bands = bands or MINHASH_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError("MINHASH_PERMUTATIONS must be a multiple of MINHASH_BANDS")
+        self.rows = self.num_perm // self.bands
+        super().__init__(path)
+
+    def _clear(self):
+        self._signatures = {}  # doc id -> signature
+        self._buckets = [{} for _ in range(self.bands)]  # band -> {band key: set of doc ids}
+
+    def _band_keys(self, sig):
+        return [tuple(sig[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _apply(self, doc_id, sig):
+        old = self._signatures.pop(doc_id, None)
+        if old is not None:
+            for buckets, key in zip(self._buckets, self._band_keys(old)):
+                members = buckets.get(key)
+                if members is not None:
+                    members.discard(doc_id)
+                    if not members:
+                        del buckets[key]
+        if sig:
+            self._signatures[doc_id] = sig
+            for buckets, key in zip(self._buckets, self._band_keys(sig)):
+                buckets.setdefault(key, set()).add(doc_id)
+
+    def _documents(self):
+        return self._signatures.items()
+
+    def add_many(self, documents):
+        """Adds or replaces several (doc_id, text) documents with a single log write."""
+        self._write([self._entry(doc_id, signature(text, self.num_perm)) for doc_id, text in documents])
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def query(self, text, threshold, exclude=None):
+        """
+        Finds indexed documents whose estimated similarity to a text reaches the threshold.
+
+        Args:
+            text (str): Extracted text of the new document.
+            threshold (float): Minimum estimated Jaccard similarity (0-1).
+            exclude (int): Document ID to ignore, e.g. the document itself.
+
+        Returns:
+            list: (doc_id, similarity) pairs, most similar first.
+        """
+        sig = signature(text, self.num_perm)
+        if sig is None:
+            return []
+        with self._lock:
+            self._load()
+            candidates = set()
+            for buckets, key in zip(self._buckets, self._band_keys(sig)):
+                candidates.update(buckets.get(key, ()))
+            candidates.discard(exclude)
+            scored = [(doc_id, similarity(sig, self._signatures[doc_id])) for doc_id in candidates]
+        hits = [(doc_id, score) for doc_id, score in scored if score >= threshold]
+        return sorted(hits, key=lambda item: (-item[1], item[0]))
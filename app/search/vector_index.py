@@ -0,0 +1,302 @@
+# search/vector_index.py
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per matrix product, bounding temporary memory for large indexes
+SEARCH_BLOCK_ROWS = 65536
+# Rows below which dead rows are never compacted away
+VECTOR_COMPACT_MIN_ROWS = 1024
+
+class VectorIndex:
+    """
+    On-disk embedding index with incremental updates.
+
+    Vectors live in a float32 file that is memory-mapped and grown by
+    doubling, so the OS pages in only what a search touches. Row metadata
+    ({"row", "resume_id", "section", "text"}) and deletions are appended to a
+    JSON-lines log; meta.json holds the row count and is written last, so
+    readers in other processes never see rows without metadata. Updating a
+    resume zeroes and masks its old rows and appends new ones.
+
+    Once more than half of the rows are dead, the live rows are copied into
+    a new generation of both files (vectors.<n>.f32, rows.<n>.jsonl);
+    meta.json switches readers over to it and the old files are removed.
+    """
+
+    def __init__(self, directory, dim, embedder_name):
+        self.directory = directory
+        self.dim = dim
+        self.embedder_name = embedder_name
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._reset()
+        self._check_compatible()
+        self._refresh()
+
+    def _reset(self, generation=0):
+        self._set_generation(generation)
+        self._matrix = None
+        self._capacity = 0
+        self._count = 0
+        self._meta_mtime = None
+        self._rows = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._resume_rows = {}
+        self._rows_offset = 0
+
+    def _set_generation(self, generation):
+        # Generation 0 keeps the original file names
+        suffix = f".{generation}" if generation else ""
+        self._generation = generation
+        self._vectors_path = os.path.join(self.directory, f"vectors{suffix}.f32")
+        self._rows_path = os.path.join(self.directory, f"rows{suffix}.jsonl")
+
+    def _data_files(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if (name.startswith("vectors") and name.endswith(".f32"))
+                or (name.startswith("rows") and name.endswith(".jsonl"))]
+
+    def _check_compatible(self):
+        # An index written by another embedder is useless for this one: start over
+        meta = self._read_meta()
+        if meta and (meta.get("dim") != self.dim or meta.get("embedder") != self.embedder_name):
+            logger.info(f"Discarding vector index built with {meta.get('embedder')}/{meta.get('dim')}")
+            for path in self._data_files() + [self._meta_path]:
+                if os.path.exists(path):
+                    os.unlink(path)
+
+    def _read_meta(self):
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @contextmanager
+    def _file_lock(self):
+        with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # Loading
+
+    def _open_matrix(self, capacity):
+        self._matrix = None
+        if capacity:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                     shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    def _refresh(self):
+        """Picks up rows written since the last refresh, by this or another process."""
+        try:
+            mtime = os.stat(self._meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        meta = self._read_meta()
+        if meta is None:
+            return
+        if meta.get("generation", 0) != self._generation:
+            # Compacted by this or another process: reload everything from the new files
+            self._reset(meta.get("generation", 0))
+        if meta["capacity"] != self._capacity:
+            self._open_matrix(meta["capacity"])
+        self._read_rows()
+        self._count = meta["count"]
+        self._sync_alive()
+        self._meta_mtime = mtime
+
+    def _read_rows(self):
+        if not os.path.exists(self._rows_path):
+            return
+        with open(self._rows_path, "r", encoding="utf-8") as f:
+            f.seek(self._rows_offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                self._rows_offset += len(line.encode("utf-8"))
+                entry = json.loads(line)
+                if "delete" in entry:
+                    for row in self._resume_rows.pop(entry["delete"], []):
+                        self._rows[row] = None
+                    continue
+                row = entry["row"]
+                if row >= len(self._rows):
+                    self._rows.extend([None] * (row + 1 - len(self._rows)))
+                self._rows[row] = entry
+                self._resume_rows.setdefault(entry["resume_id"], []).append(row)
+
+    def _sync_alive(self):
+        # Rows without metadata (deleted, or not yet logged) are never returned
+        rows = self._rows[:self._count]
+        alive = np.fromiter((entry is not None for entry in rows), dtype=bool, count=len(rows))
+        self._alive = np.concatenate([alive, np.zeros(self._count - len(rows), dtype=bool)])
+
+    # Writing
+
+    def _ensure_capacity(self, needed):
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, 2 * self._capacity, 1024)
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._open_matrix(capacity)
+
+    def _write_meta(self):
+        tmp_path = f"{self._meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "embedder": self.embedder_name, "count": self._count,
+                       "capacity": self._capacity, "generation": self._generation}, f)
+        os.replace(tmp_path, self._meta_path)
+        self._meta_mtime = os.stat(self._meta_path).st_mtime_ns
+
+    def upsert(self, items):
+        """
+        Replaces the chunks of one or more resumes.
+
+        Args:
+            items (list): (resume_id, chunks, vectors) tuples, where chunks is a
+                list of (section, text) and vectors the matching (n, dim) array.
+        """
+        with self._lock, self._file_lock():
+            self._refresh()
+            log = []
+            for resume_id, chunks, vectors in items:
+                old_rows = self._resume_rows.pop(resume_id, [])
+                if old_rows:
+                    self._matrix[old_rows] = 0.0
+                    log.append({"delete": resume_id})
+                    for row in old_rows:
+                        self._rows[row] = None
+                if not chunks:
+                    continue
+                start = self._count
+                self._ensure_capacity(start + len(chunks))
+                self._matrix[start:start + len(chunks)] = vectors
+                if len(self._rows) < start + len(chunks):
+                    self._rows.extend([None] * (start + len(chunks) - len(self._rows)))
+                for offset, (section, text) in enumerate(chunks):
+                    entry = {"row": start + offset, "resume_id": resume_id, "section": section,
+                             "text": text[:300]}
+                    log.append(entry)
+                    self._rows[start + offset] = entry
+                self._resume_rows[resume_id] = list(range(start, start + len(chunks)))
+                self._count += len(chunks)
+
+            if not log:
+                return
+            if self._matrix is not None:
+                self._matrix.flush()
+            data = "".join(json.dumps(entry) + "\n" for entry in log)
+            with open(self._rows_path, "a", encoding="utf-8") as f:
+                f.write(data)
+            self._rows_offset = os.path.getsize(self._rows_path)
+            self._write_meta()
+            self._sync_alive()
+            if self._count > 2 * max(self._live_rows(), VECTOR_COMPACT_MIN_ROWS // 2):
+                self._compact()
+
+    def _live_rows(self):
+        return sum(len(rows) for rows in self._resume_rows.values())
+
+    def _compact(self):
+        # Caller holds the file lock. meta.json is the commit point: until it names the new
+        # generation, readers keep using the old files, which are only removed afterwards.
+        live = [row for row in range(self._count) if self._rows[row] is not None]
+        old_files = [self._vectors_path, self._rows_path]
+        old_matrix = self._matrix
+        self._set_generation(self._generation + 1)
+
+        capacity = max(len(live), VECTOR_COMPACT_MIN_ROWS)
+        with open(self._vectors_path, "wb") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._open_matrix(capacity)
+        rows, resume_rows = [], {}
+        for start in range(0, len(live), SEARCH_BLOCK_ROWS):
+            block = live[start:start + SEARCH_BLOCK_ROWS]
+            self._matrix[start:start + len(block)] = old_matrix[block]
+        with open(self._rows_path, "w", encoding="utf-8") as f:
+            for new_row, old_row in enumerate(live):
+                entry = dict(self._rows[old_row], row=new_row)
+                f.write(json.dumps(entry) + "\n")
+                rows.append(entry)
+                resume_rows.setdefault(entry["resume_id"], []).append(new_row)
+        if self._matrix is not None:
+            self._matrix.flush()
+        del old_matrix
+
+        self._rows, self._resume_rows, self._count = rows, resume_rows, len(live)
+        self._rows_offset = os.path.getsize(self._rows_path)
+        self._write_meta()
+        self._sync_alive()
+        for path in old_files:
+            try:
+                os.unlink(path)
+            except OSError as e:  # e.g. still mapped on Windows
+                logger.warning(f"Could not remove old vector index file {path}: {e}")
+        logger.info(f"Compacted vector index to {len(live)} rows (generation {self._generation})")
+
+    # Querying
+
+    def search(self, query_vectors, k=10):
+        """
+        Cosine top-k over all live rows for a batch of queries.
+
+        Args:
+            query_vectors (numpy.ndarray): (n, dim) or (dim,) unit-length query vectors.
+            k (int): Results per query.
+
+        Returns:
+            list: For each query, a list of (row metadata, score), best first.
+        """
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        with self._lock:
+            self._refresh()
+            count = self._count
+            if not count:
+                return [[] for _ in queries]
+
+            best_rows = np.empty((len(queries), 0), dtype=np.int64)
+            best_scores = np.empty((len(queries), 0), dtype=np.float32)
+            for start in range(0, count, SEARCH_BLOCK_ROWS):
+                end = min(start + SEARCH_BLOCK_ROWS, count)
+                scores = queries @ self._matrix[start:end].T
+                scores[:, ~self._alive[start:end]] = -np.inf
+                rows = np.broadcast_to(np.arange(start, end), scores.shape)
+                best_rows = np.concatenate([best_rows, rows], axis=1)
+                best_scores = np.concatenate([best_scores, scores], axis=1)
+                if best_scores.shape[1] > k:
+                    # Keep only the k best candidates per query between blocks
+                    keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                    best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                    best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+            order = np.argsort(-best_scores, axis=1)
+            results = []
+            for query_rows, query_scores, query_order in zip(best_rows, best_scores, order):
+                results.append([(self._rows[query_rows[i]], float(query_scores[i]))
+                                for i in query_order if np.isfinite(query_scores[i])])
+            return results
+
+    def __len__(self):
+        return len(self._resume_rows)
@@ -9,17 +9,41 @@ document.addEventListener('DOMContentLoaded', function() { // Run after DOM load
 
             const query = queryInput.value;
 
+            const userMessage = document.createElement('p');
+            userMessage.textContent = `User: ${query}`;
+            const botMessage = document.createElement('p');
+            botMessage.textContent = 'Bot: ';
+            messagesDiv.append(userMessage, botMessage);
+            queryInput.value = '';
+
+            // Ask for server-sent events and append tokens as they arrive
             fetch('/api/query', {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream'
                 },
-                body: JSON.stringify({ query: query })
+                body: JSON.stringify({ query: query, stream: true })
             })
-            .then(response => response.json())
-            .then(data => {
-                messagesDiv.innerHTML += `<p>User: ${query}</p><p>Bot: ${data.response}</p>`;
-                queryInput.value = '';
+            .then(async response => {
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    const events = buffer.split('\n\n');
+                    buffer = events.pop();
+                    for (const block of events) {
+                        const event = (block.match(/^event: (.*)$/m) || [])[1];
+                        const data = (block.match(/^data: (.*)$/m) || [])[1];
+                        if (!event || !data) continue;  // keep-alive comments
+                        const payload = JSON.parse(data);
+                        if (event === 'token') botMessage.textContent += payload.text;
+                        if (event === 'error') botMessage.textContent += ` [${payload.error}]`;
+                    }
+                }
             })
             .catch(error => {
                 console.error('Error:', error);
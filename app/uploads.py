@@ -0,0 +1,160 @@
+import os
+import io
+import uuid
+import shutil
+import hashlib
+import logging
+import tempfile
+
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+# Upload limits: per file, and per request (Flask MAX_CONTENT_LENGTH, which also covers batch uploads)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(200 * 1024 * 1024)))
+# Files up to this size stay in memory; larger ones are spooled to a unique temp file
+UPLOAD_MEMORY_MAX_BYTES = int(os.getenv("UPLOAD_MEMORY_MAX_BYTES", str(2 * 1024 * 1024)))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+# Optional content-addressed store of the original files (<dir>/<sha256[:2]>/<sha256><ext>)
+UPLOAD_STORE_ORIGINALS = os.getenv("UPLOAD_STORE_ORIGINALS", "false").lower() in ("1", "true", "yes")
+UPLOAD_STORE_DIR = os.getenv("UPLOAD_STORE_DIR", os.path.join(os.getcwd(), "uploads", "originals"))
+
+CHUNK_SIZE = 64 * 1024
+
+class UploadTooLarge(Exception):
+    """Raised when an uploaded file exceeds UPLOAD_MAX_BYTES."""
+
+class Upload:
+    """
+    An uploaded file, hashed while it was received.
+
+    Small files are held in memory (data); larger ones live in a temp file
+    (path) that is removed by close(), so use it as a context manager.
+    """
+
+    def __init__(self, filename, sha256, size, data=None, path=None):
+        self.filename = filename
+        self.sha256 = sha256
+        self.size = size
+        self.data = data
+        self.path = path
+        self._owned_paths = [path] if path else []
+
+    def source(self):
+        """Returns what the parsers take: the in-memory bytes, or the temp file path."""
+        return self.data if self.data is not None else self.path
+
+    def to_file(self, directory=None):
+        """
+        Writes the upload to a new uniquely named file, e.g. for a background job.
+
+        The caller owns the returned file.
+
+        Args:
+            directory (str): Target directory; defaults to UPLOAD_TMP_DIR.
+
+        Returns:
+            str: Path of the new file.
+        """
+        directory = directory or UPLOAD_TMP_DIR or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{uuid.uuid4().hex}-{self.filename}")
+        if self.data is not None:
+            with open(path, "wb") as f:
+                f.write(self.data)
+        else:
+            shutil.copyfile(self.path, path)
+        return path
+
+    def close(self):
+        for path in self._owned_paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._owned_paths = []
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def receive_upload(file, max_bytes=None, memory_max_bytes=None):
+    """
+    Reads an uploaded file once, hashing it and enforcing the size limit as it streams.
+
+    Args:
+        file (FileStorage): The uploaded file.
+        max_bytes (int): Size limit; defaults to UPLOAD_MAX_BYTES.
+        memory_max_bytes (int): Largest file kept in memory; defaults to UPLOAD_MEMORY_MAX_BYTES.
+
+    Returns:
+        Upload: The received file (close it, or use it in a with block).
+
+    Raises:
+        UploadTooLarge: As soon as more than max_bytes have been read.
+    """
+    max_bytes = UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    memory_max_bytes = UPLOAD_MEMORY_MAX_BYTES if memory_max_bytes is None else memory_max_bytes
+    filename = secure_filename(file.filename or "") or "upload"
+
+    digest = hashlib.sha256()
+    size = 0
+    buffer = io.BytesIO()
+    spool = None
+    try:
+        while True:
+            chunk = file.stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"File exceeds the {max_bytes // (1024 * 1024)} MB limit")
+            digest.update(chunk)
+            if spool is None and size > memory_max_bytes:
+                # Too big to keep in memory: move what we have to a unique temp file
+                spool = tempfile.NamedTemporaryFile(prefix="cv-upload-", suffix=os.path.splitext(filename)[1],
+                                                    dir=UPLOAD_TMP_DIR, delete=False)
+                spool.write(buffer.getvalue())
+                buffer = None
+            (spool or buffer).write(chunk)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+    if spool is not None:
+        spool.close()
+        return Upload(filename, digest.hexdigest(), size, path=spool.name)
+    return Upload(filename, digest.hexdigest(), size, data=buffer.getvalue())
+
+def store_original(upload, directory=None):
+    """
+    Keeps a copy of the original file under its content hash, once per distinct content.
+
+    Args:
+        upload (Upload): The received file.
+        directory (str): Store root; defaults to UPLOAD_STORE_DIR.
+
+    Returns:
+        str: Path of the stored original.
+    """
+    directory = directory or UPLOAD_STORE_DIR
+    ext = os.path.splitext(upload.filename)[1].lower()
+    path = os.path.join(directory, upload.sha256[:2], f"{upload.sha256}{ext}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write under a temporary name and rename, so readers never see a partial file
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    if upload.data is not None:
+        with open(tmp_path, "wb") as f:
+            f.write(upload.data)
+    else:
+        shutil.copyfile(upload.path, tmp_path)
+    os.replace(tmp_path, path)
+    return path
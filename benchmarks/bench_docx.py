@@ -0,0 +1,72 @@
+# benchmarks/bench_docx.py
+"""
+DOCX extraction benchmark: python-docx paragraph loop vs. the streaming XML extractor.
+
+Generates synthetic CVs of increasing length (body paragraphs plus a skills
+table per page), runs both extractors on the same bytes and reports the
+median time, the speedup and how many characters each one recovered.
+
+    python -m benchmarks.bench_docx
+    python -m benchmarks.bench_docx --pages 1,10,100 --repeat 5 --output docx.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="1,10,50", help="comma-separated document lengths in pages")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per extractor and document")
+    parser.add_argument("--output", help="write JSON results to this file (default: stdout)")
+    return parser.parse_args(argv)
+
+def _median_seconds(func, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+def run(args):
+    from app.parser.docx_parser import extract_text_from_docx_legacy, extract_text_from_docx_stream
+    from benchmarks.corpus import cv_lines, docx_file
+
+    results = []
+    for pages in (int(p) for p in args.pages.split(",")):
+        data = docx_file(cv_lines(f"docx-bench-{pages}", pages))
+        legacy_seconds, legacy_text = _median_seconds(
+            lambda: extract_text_from_docx_legacy(io.BytesIO(data)), args.repeat)
+        stream_seconds, stream_text = _median_seconds(
+            lambda: extract_text_from_docx_stream(data), args.repeat)
+        results.append({
+            "pages": pages,
+            "bytes": len(data),
+            "legacy_seconds": legacy_seconds,
+            "stream_seconds": stream_seconds,
+            "speedup": legacy_seconds / stream_seconds if stream_seconds else None,
+            "legacy_chars": len(legacy_text),
+            "stream_chars": len(stream_text),
+        })
+    return {"repeat": args.repeat, "results": results}
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.path.insert(0, os.path.dirname(BENCH_DIR))
+    output = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
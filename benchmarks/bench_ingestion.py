@@ -0,0 +1,213 @@
+# benchmarks/bench_ingestion.py
+"""
+Ingestion pipeline benchmark.
+
+Generates a synthetic corpus, times every stage (rasterize, legacy and fast deskew, OCR,
+extract, analyze, persist) and the end-to-end POST /api/ against a local
+LLM stub, and writes the results as JSON. Stages whose system dependencies
+(poppler, tesseract) are missing are reported as skipped.
+
+    python -m benchmarks.bench_ingestion --output bench.json
+    python -m benchmarks.bench_ingestion --check                 # gate on thresholds.json
+    python -m benchmarks.bench_ingestion --baseline old.json     # gate on relative regressions
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+from contextlib import contextmanager
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_THRESHOLDS = os.path.join(BENCH_DIR, "thresholds.json")
+
+class StageTimer:
+    """Collects wall-clock samples per stage."""
+
+    def __init__(self):
+        self.samples = {}
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        yield
+        self.samples.setdefault(stage, []).append(time.perf_counter() - start)
+
+    def summary(self):
+        stages = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            stages[stage] = {
+                "n": len(ordered),
+                "mean": statistics.fmean(ordered),
+                "p50": ordered[len(ordered) // 2],
+                "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max": ordered[-1],
+                "total": sum(ordered),
+            }
+        return stages
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="1,2,4", help="comma-separated page counts per document")
+    parser.add_argument("--per-kind", type=int, default=2, help="documents per kind and page count")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="stub LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="extra random stub latency in seconds")
+    parser.add_argument("--output", help="write JSON results to this file (default: stdout)")
+    parser.add_argument("--check", action="store_true", help="fail if a stage exceeds --thresholds")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="absolute per-stage limits (JSON)")
+    parser.add_argument("--baseline", help="previous results JSON to compare p50 against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p50 regression")
+    return parser.parse_args(argv)
+
+def run(args, workdir):
+    # Configure the app before importing it: module-level settings are read at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["SEARCH_INDEX_DIR"] = os.path.join(workdir, "search_index")
+    os.environ["CACHE_ENABLED"] = "false"
+
+    import cv2
+    import numpy as np
+    import pytesseract
+    from app import create_app, db
+    from app.llm_operations import client as llm_client
+    from app.llm_operations.llm import get_resume_analysis
+    from app.db_operations import save_candidate
+    from app.pipeline import extract_text
+    from app.parser import pdf_parser, ocr_engine
+    from benchmarks.corpus import generate_corpus
+    from benchmarks.llm_stub import LLMStub
+
+    have_poppler = shutil.which("pdftoppm") is not None
+    have_tesseract = (ocr_engine.get_ocr_engine().name == "tesserocr"
+                      or shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None)
+    skipped = []
+    if not have_poppler:
+        skipped += ["rasterize", "deskew", "deskew_fast"]
+    if not (have_poppler and have_tesseract):
+        skipped += ["ocr", "extract_scanned", "end_to_end_scanned"]
+
+    documents = generate_corpus(os.path.join(workdir, "corpus"),
+                                page_counts=tuple(int(p) for p in args.pages.split(",")),
+                                per_kind=args.per_kind)
+    timer = StageTimer()
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+
+    with LLMStub(latency=args.llm_latency, jitter=args.llm_jitter) as stub:
+        llm_client._client = llm_client.LLMClient(api_url=stub.url, api_key="bench")
+
+        for doc in documents:
+            name = os.path.basename(doc["path"])
+            kind = doc["kind"]
+
+            if kind == "scanned" and have_poppler:
+                with timer.time("rasterize"):
+                    pages = list(pdf_parser.iter_pdf_pages(doc["path"]))
+                for page in pages:
+                    with timer.time("deskew"):
+                        pdf_parser.deskew(np.array(page))
+                    with timer.time("deskew_fast"):
+                        page_arr = np.array(page)
+                        gray = page_arr if page_arr.ndim == 2 else cv2.cvtColor(page_arr, cv2.COLOR_BGR2GRAY)
+                        page_deskew, _ = pdf_parser.deskew_fast(gray)
+                    if have_tesseract:
+                        with timer.time("ocr"):
+                            ocr_engine.get_ocr_engine().image_to_data(page_deskew)
+
+            if kind == "scanned" and "extract_scanned" in skipped:
+                continue
+            with timer.time(f"extract_{kind}"):
+                text = extract_text(doc["path"], name)
+            with timer.time("analyze"):
+                analysis = get_resume_analysis(text)
+            with app.app_context(), timer.time("persist"):
+                save_candidate(name, text, analysis)
+
+            if name.endswith(".pdf"):
+                client = app.test_client()
+                with open(doc["path"], "rb") as f, timer.time(f"end_to_end_{kind}"):
+                    response = client.post("/api/", data={"file": (f, f"e2e_{name}")},
+                                           content_type="multipart/form-data")
+                if response.status_code != 200:
+                    print(f"warning: POST /api/ for {name} returned {response.status_code}", file=sys.stderr)
+
+        llm_requests = stub.requests
+
+    return {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count(), "poppler": have_poppler, "tesseract": have_tesseract,
+                        "ocr_engine": ocr_engine.get_ocr_engine().name},
+        "config": {"pages": args.pages, "per_kind": args.per_kind, "llm_latency": args.llm_latency,
+                   "documents": len(documents), "llm_requests": llm_requests},
+        "skipped": sorted(set(skipped)),
+        "stages": timer.summary(),
+    }
+
+def check_results(results, thresholds=None, baseline=None, tolerance=0.25):
+    """
+    Compares results against absolute thresholds and/or a baseline run.
+
+    Args:
+        results (dict): Output of run().
+        thresholds (dict): {stage: {"p50": seconds, "p95": seconds, ...}}.
+        baseline (dict): Earlier output of run().
+        tolerance (float): Allowed relative p50 increase over the baseline.
+
+    Returns:
+        list: Human-readable failures; empty if everything passed.
+    """
+    failures = []
+    stages = results["stages"]
+    for stage, limits in (thresholds or {}).items():
+        for metric, limit in limits.items():
+            value = stages.get(stage, {}).get(metric)
+            if value is not None and value > limit:
+                failures.append(f"{stage} {metric} {value:.4f}s exceeds threshold {limit:.4f}s")
+    for stage, old in ((baseline or {}).get("stages") or {}).items():
+        new = stages.get(stage)
+        if new and new["p50"] > old["p50"] * (1 + tolerance):
+            failures.append(f"{stage} p50 regressed {old['p50']:.4f}s -> {new['p50']:.4f}s "
+                            f"(> {tolerance:.0%} tolerance)")
+    return failures
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.path.insert(0, os.path.dirname(BENCH_DIR))
+    workdir = tempfile.mkdtemp(prefix="cv-bench-")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)  # uploads/ and cache/ are created relative to the working directory
+        results = run(args, workdir)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    thresholds = None
+    if args.check:
+        with open(args.thresholds) as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failures = check_results(results, thresholds, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
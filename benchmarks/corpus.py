@@ -0,0 +1,114 @@
+# benchmarks/corpus.py
+"""Synthetic CV corpus: digital PDFs, scanned (image-only) PDFs and DOCX files."""
+import io
+import os
+import random
+
+from PIL import Image, ImageDraw, ImageFont
+
+FIRST_NAMES = ["Alice", "Bob", "Carol", "Dmitri", "Esther", "Farid", "Grace", "Hiro", "Ines", "Jamal"]
+LAST_NAMES = ["Anders", "Baker", "Chen", "Diaz", "Eze", "Fischer", "Gupta", "Hansen", "Ito", "Jones"]
+SKILLS = ["Python", "Java", "Kubernetes", "Terraform", "React", "PostgreSQL", "Go", "AWS", "Docker",
+          "Spark", "Kafka", "TypeScript", "C++", "Rust", "Figma", "Airflow", "Django", "Flask"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+TITLES = ["Software Engineer", "Data Engineer", "SRE", "Backend Developer", "ML Engineer", "Tech Lead"]
+
+def cv_lines(seed, pages):
+    """Returns the text lines of one synthetic CV, about 40 lines per page."""
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [name, f"{name.lower().replace(' ', '.')}@example.com  +44 20 7946 {rng.randint(1000, 9999)}",
+             "", "SKILLS", ", ".join(rng.sample(SKILLS, 6)), "", "EXPERIENCE"]
+    while len(lines) < 40 * pages:
+        lines += [f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({rng.randint(2008, 2020)} - {rng.randint(2021, 2024)})",
+                  f"Built and operated {rng.choice(SKILLS)} services handling {rng.randint(2, 90)}k requests per second.",
+                  f"Led migration from {rng.choice(SKILLS)} to {rng.choice(SKILLS)}, cutting costs by {rng.randint(5, 60)}%.",
+                  ""]
+    education = ["EDUCATION", f"BSc Computer Science, University of Somewhere, {rng.randint(2005, 2020)}"]
+    return lines[:40 * pages - len(education)] + education
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def digital_pdf(lines, lines_per_page=40):
+    """Builds a PDF with a real text layer (Helvetica, one text object per page)."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        ops = ["BT /F1 10 Tf 14 TL 50 760 Td"] + [f"({_pdf_escape(line)}) Tj T*" for line in page] + ["ET"]
+        content = "\n".join(ops)
+        objects.append(f"<< /Length {len(content.encode('latin-1'))} >>\nstream\n{content}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+def scanned_pdf(lines, lines_per_page=40, dpi=150, skew=1.5):
+    """Builds an image-only PDF (no text layer), slightly rotated like a real scan."""
+    font = ImageFont.load_default()
+    width, height = int(8.5 * dpi), int(11 * dpi)
+    images = []
+    for start in range(0, max(len(lines), 1), lines_per_page):
+        image = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines[start:start + lines_per_page]):
+            draw.text((dpi // 2, dpi // 2 + row * int(dpi * 0.25)), line, fill=0, font=font)
+        images.append(image.rotate(skew, fillcolor=255))
+    buffer = io.BytesIO()
+    images[0].save(buffer, format="PDF", save_all=True, append_images=images[1:], resolution=dpi)
+    return buffer.getvalue()
+
+def docx_file(lines):
+    """Builds a DOCX with the skills section as a table, as many CV templates do."""
+    from docx import Document
+
+    document = Document()
+    for line in lines:
+        if line and line == line.upper():
+            document.add_heading(line.title(), level=2)
+        elif ", " in line and line.count(",") >= 4:
+            table = document.add_table(rows=1, cols=len(line.split(", ")))
+            for cell, skill in zip(table.rows[0].cells, line.split(", ")):
+                cell.text = skill
+        else:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def generate_corpus(directory, page_counts=(1, 2, 4), per_kind=2):
+    """
+    Writes a synthetic corpus to directory.
+
+    Args:
+        directory (str): Output directory (created if needed).
+        page_counts (tuple): Page counts to generate for every kind.
+        per_kind (int): Documents per (kind, page count).
+
+    Returns:
+        list: {"path", "kind", "pages"} dicts.
+    """
+    os.makedirs(directory, exist_ok=True)
+    documents = []
+    builders = {"digital": (digital_pdf, "pdf"), "scanned": (scanned_pdf, "pdf"), "docx": (docx_file, "docx")}
+    for kind, (build, extension) in builders.items():
+        for pages in page_counts:
+            for i in range(per_kind):
+                path = os.path.join(directory, f"{kind}_{pages}p_{i}.{extension}")
+                with open(path, "wb") as f:
+                    f.write(build(cv_lines(f"{kind}-{pages}-{i}", pages)))
+                documents.append({"path": path, "kind": kind, "pages": pages})
+    return documents
@@ -0,0 +1,69 @@
+# benchmarks/llm_stub.py
+"""Local stand-in for the Together completions endpoint with configurable latency."""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANALYSIS = {
+    "personalInfo": {"name": "Synthetic Candidate", "email": "candidate@example.com", "phone": "",
+                     "address": "", "linkedin": ""},
+    "education": [{"degree": "BSc Computer Science", "institution": "University of Somewhere",
+                   "yearOfGraduation": "2015"}],
+    "workExperience": [{"jobTitle": "Software Engineer", "company": "Acme Corp", "duration": "2016 - 2024",
+                        "responsibilities": "Built services"}],
+    "skills": ["Python", "Kubernetes", "PostgreSQL"],
+    "projects": [],
+    "certifications": [],
+}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        latency = server.latency + random.uniform(0, server.jitter)
+        time.sleep(latency)
+        payload = json.dumps({"choices": [{"text": json.dumps(ANALYSIS)}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+class LLMStub:
+    """
+    Runs the stub on a background thread.
+
+    Usage:
+        with LLMStub(latency=0.5) as stub:
+            client = LLMClient(api_url=stub.url)
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.latency = latency
+        self.server.jitter = jitter
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/completions"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,46 @@
+# tests/helpers.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from app import create_app, db
+from app import search
+
+# Process-wide indexes in app.search, rebuilt lazily from the test database
+SEARCH_INDEXES = ("_bm25_index", "_vector_index", "_minhash_index")
+
+
+class AppTestCase(unittest.TestCase):
+    """
+    Runs each test against a fresh in-memory database and empty search indexes in a temp directory.
+
+    Subclasses seed data by extending setUp (after calling super) and add
+    their own patches with self.patch; everything is undone after the test.
+    """
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_dir, True)
+        self.patch(search, "SEARCH_INDEX_DIR", self.index_dir)
+        for name in SEARCH_INDEXES:
+            self.patch(search, name, None)
+        with mock.patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:"}):
+            self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+        self.addCleanup(self.drop_database)
+
+    def drop_database(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def patch(self, target, attribute, *args, **kwargs):
+        """Patches target.attribute (see mock.patch.object) until the end of the test."""
+        patcher = mock.patch.object(target, attribute, *args, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
@@ -0,0 +1,140 @@
+# tests/test_admission.py
+
+import io
+import os
+import time
+import threading
+import unittest
+from unittest import mock
+
+from app import create_app, db
+from app import admission
+from app.admission import AdmissionPool, Overloaded, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BACKGROUND
+from app.routes import upload as upload_routes
+
+
+def start_waiter(pool, level, order):
+    def run():
+        with pool.slot(level):
+            order.append(level)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class TestAdmissionPool(unittest.TestCase):
+
+    def test_free_slots_go_to_higher_priority_first(self):
+        pool = AdmissionPool("test", 1)
+        order = []
+        pool.acquire()
+        threads = [start_waiter(pool, PRIORITY_BACKGROUND, order)]
+        wait_until(lambda: pool.queued == 1)
+        threads.append(start_waiter(pool, PRIORITY_NORMAL, order))
+        wait_until(lambda: pool.queued == 2)
+        threads.append(start_waiter(pool, PRIORITY_INTERACTIVE, order))
+        wait_until(lambda: pool.queued == 3)
+
+        pool.release()
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(order, [PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BACKGROUND])
+        self.assertEqual(pool.in_use, 0)
+
+    def test_full_queue_sheds_immediately(self):
+        pool = AdmissionPool("test", 1, max_queue=0, timeout=5)
+        pool.acquire()
+        start = time.perf_counter()
+        with self.assertRaises(Overloaded) as raised:
+            pool.acquire(PRIORITY_NORMAL)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+        with self.assertRaises(Overloaded):
+            pool.check(PRIORITY_NORMAL)
+
+    def test_wait_timeout_sheds_and_leaves_queue(self):
+        pool = AdmissionPool("test", 1, max_queue=4, timeout=0.05)
+        pool.acquire()
+        with self.assertRaises(Overloaded):
+            pool.acquire(PRIORITY_NORMAL)
+        self.assertEqual(pool.queued, 0)
+
+    def test_background_work_waits_instead_of_being_shed(self):
+        pool = AdmissionPool("test", 1, max_queue=0, timeout=0.01)
+        order = []
+        pool.acquire()
+        thread = start_waiter(pool, PRIORITY_BACKGROUND, order)
+        time.sleep(0.05)
+        self.assertEqual(order, [])
+        pool.release()
+        thread.join(2)
+        self.assertEqual(order, [PRIORITY_BACKGROUND])
+
+
+class TestAdmissionRoutes(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:"}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+        self.pool = AdmissionPool("query", 1, max_queue=0, timeout=1)
+        patch = mock.patch.dict(admission._pools, {"query": self.pool})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_saturated_query_pool_returns_503(self):
+        self.pool.acquire()
+        with mock.patch.object(upload_routes, "query_cv_data") as query:
+            response = self.client.post('/api/query', json={'query': 'python'})
+        self.assertEqual(response.status_code, 503)
+        self.assertGreaterEqual(int(response.headers['Retry-After']), 1)
+        query.assert_not_called()
+
+    def test_query_runs_interactive_and_releases_slot(self):
+        seen = []
+        with mock.patch.object(upload_routes, "query_cv_data",
+                               side_effect=lambda text: seen.append(admission.current_priority()) or "ok"):
+            response = self.client.post('/api/query', json={'query': 'python'})
+        self.assertEqual(response.get_json(), {'response': 'ok'})
+        self.assertEqual(seen, [PRIORITY_INTERACTIVE])
+        self.assertEqual(self.pool.in_use, 0)
+
+    def test_streamed_query_holds_slot_until_closed(self):
+        with mock.patch.object(upload_routes, "query_cv_data_stream", return_value=iter(["a", "b"])):
+            response = self.client.post('/api/query', json={'query': 'python', 'stream': True}, buffered=False)
+            self.assertEqual(self.pool.in_use, 1)
+            body = response.get_data(as_text=True)
+            response.close()
+        self.assertIn('event: done', body)
+        self.assertEqual(self.pool.in_use, 0)
+
+    def test_pdf_upload_is_not_shed_before_extraction(self):
+        # Digital PDFs are read from their text layer and never wait for OCR
+        ocr_pool = AdmissionPool("ocr", 1, max_queue=0, timeout=1)
+        ocr_pool.acquire()
+        with mock.patch.dict(admission._pools, {"ocr": ocr_pool}), \
+                mock.patch.object(upload_routes, "ingest_document") as ingest:
+            response = self.client.post('/api/', data={'file': (io.BytesIO(b"%PDF-1.4"), 'cv.pdf')},
+                                        content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+        ingest.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# tests/test_analysis_cache.py
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from app import analysis_cache
+
+
+class TestAnalysisCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_cache_key_depends_on_prompt_version(self):
+        key = analysis_cache.cache_key("abc")
+        with mock.patch.object(analysis_cache, "PROMPT_VERSION", "other"):
+            self.assertNotEqual(analysis_cache.cache_key("abc"), key)
+        self.assertTrue(key.startswith("abc-"))
+
+    def test_cache_key_depends_on_ocr_setup(self):
+        key = analysis_cache.cache_key("abc")
+        with mock.patch.object(analysis_cache, "resolved_engine_name", return_value="other-engine"):
+            self.assertNotEqual(analysis_cache.cache_key("abc"), key)
+        with mock.patch.object(analysis_cache, "OCR_DPI", analysis_cache.OCR_DPI + 100):
+            self.assertNotEqual(analysis_cache.cache_key("abc"), key)
+
+    def test_file_sha256(self):
+        path = os.path.join(self.cache_dir, "cv.pdf")
+        with open(path, "wb") as f:
+            f.write(b"same bytes")
+        self.assertEqual(analysis_cache.file_sha256(path, chunk_size=3),
+                         hashlib.sha256(b"same bytes").hexdigest())
+
+    def test_disk_cache_evicts_least_recently_used(self):
+        cache = analysis_cache.DiskLRUCache(self.cache_dir, max_bytes=250)
+        payload = {"text": "x" * 60}
+        for key in ("a", "b", "c"):
+            cache.set(key, payload)
+            time.sleep(0.01)
+        cache.get("a")  # "a" becomes the most recently used entry
+        time.sleep(0.01)
+        cache.set("d", payload)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("d"))
+
+    def test_hit_and_miss_counters(self):
+        cache = analysis_cache.DiskLRUCache(self.cache_dir, max_bytes=1024 * 1024)
+        with mock.patch.object(analysis_cache, "_disk_cache", cache):
+            before = analysis_cache.cache_stats()
+            self.assertIsNone(analysis_cache.get_cached_analysis("missing"))
+            analysis_cache.store_analysis("present", "text", {"skills": ["Python"]})
+            entry = analysis_cache.get_cached_analysis("present")
+            after = analysis_cache.cache_stats()
+
+        self.assertEqual(entry["structured_data"], {"skills": ["Python"]})
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_analysis_chunking.py
+
+import json
+import unittest
+from unittest import mock
+
+from app.llm_operations import llm
+from app.llm_operations.client import LLMError
+from app.llm_operations.chunking import compact_text, chunk_resume, estimate_tokens, split_sections
+
+
+def response(payload):
+    return {"choices": [{"text": payload if isinstance(payload, str) else json.dumps(payload)}]}
+
+
+def long_resume(publications=400):
+    lines = ["Jane Doe", "jane@example.com", "", "EXPERIENCE", "Professor, Example University, 2010-2024",
+             "", "Education", "PhD Physics, MIT, 2009", "", "Publications"]
+    lines += [f"{i}. A paper on topic {i} in the Journal of Things, vol {i}, 2015." for i in range(publications)]
+    lines += ["", "Skills", "Python, Physics"]
+    return "\n".join(lines)
+
+
+class TestChunking(unittest.TestCase):
+
+    def test_compact_text_removes_noise(self):
+        text = "Jane   Doe\t\n\n\n•  Python\n------------\n|\n\nSkills :  C++"
+        self.assertEqual(compact_text(text), "Jane Doe\n\nPython\n\nSkills : C++")
+
+    def test_sections_split_at_headings(self):
+        sections = split_sections("Jane Doe\nEXPERIENCE\nAcme\nEducation:\nMIT")
+        self.assertEqual(sections, ["Jane Doe", "EXPERIENCE\nAcme", "Education:\nMIT"])
+
+    def test_chunks_respect_budget_and_keep_text(self):
+        text = long_resume()
+        chunks = chunk_resume(text, 500)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(estimate_tokens(chunk) <= 500 for chunk in chunks))
+        # The small sections stay whole and the long one repeats its heading
+        self.assertIn("EXPERIENCE\nProfessor", chunks[0])
+        self.assertTrue(any(chunk.startswith("Publications (continued)") for chunk in chunks))
+        self.assertIn("Skills\nPython, Physics", chunks[-1])
+
+
+class TestTruncatedJson(unittest.TestCase):
+
+    def test_truncated_response_keeps_complete_part(self):
+        text = '{"personalInfo": {"name": "Jane"}, "skills": ["Python", "Phy'
+        self.assertEqual(llm.parse_analysis_json(text), {"personalInfo": {"name": "Jane"}, "skills": ["Python"]})
+
+    def test_fenced_response(self):
+        self.assertEqual(llm.parse_analysis_json('```json\n{"skills": ["Go"]}\n```'), {"skills": ["Go"]})
+
+    def test_garbage_is_an_error(self):
+        self.assertIn("error", llm.parse_analysis_json("Sorry, I cannot help with that."))
+
+
+class TestMapReduceAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.client = mock.Mock()
+        patch = mock.patch.object(llm, "get_llm_client", return_value=self.client)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_short_resume_uses_one_request(self):
+        self.client.complete.return_value = response({"skills": ["Python"]})
+        self.assertEqual(llm.get_resume_analysis("Jane Doe\nSkills\nPython"), {"skills": ["Python"]})
+        self.client.complete_many.assert_not_called()
+
+    def test_long_resume_is_chunked_and_merged(self):
+        partials = [
+            {"personalInfo": {"name": "Jane Doe", "email": ""}, "skills": ["Python", "physics"],
+             "workExperience": [{"jobTitle": "Professor", "company": "Example University", "duration": "2010-2024"}],
+             "education": [{"degree": "", "institution": "", "yearOfGraduation": ""}]},
+            {"personalInfo": {"name": "", "email": "jane@example.com"}, "skills": ["Physics", "LaTeX"],
+             "workExperience": [{"jobTitle": "Professor", "company": "Example University", "duration": "2010-2024"}],
+             "education": [{"degree": "PhD Physics", "institution": "MIT", "yearOfGraduation": "2009"}]},
+        ]
+        self.client.complete_many.side_effect = lambda payloads: (
+            [response(partials[0]), response(partials[1])] + [LLMError("HTTP 500")] * (len(payloads) - 2))
+
+        with mock.patch.object(llm, "ANALYSIS_CONTEXT_TOKENS", 2000), \
+                mock.patch.object(llm, "ANALYSIS_CHUNK_TOKENS", 800):
+            result = llm.get_resume_analysis(long_resume())
+
+        payloads = self.client.complete_many.call_args[0][0]
+        self.assertGreater(len(payloads), 2)
+        self.assertIn(f"part 1 of {len(payloads)}", payloads[0]["messages"][1]["content"])
+        self.assertEqual(result["personalInfo"], {"name": "Jane Doe", "email": "jane@example.com"})
+        self.assertEqual(result["skills"], ["Python", "physics", "LaTeX"])
+        self.assertEqual(len(result["workExperience"]), 1)
+        self.assertEqual(result["education"], [partials[1]["education"][0]])
+
+    def test_all_chunks_failing_is_an_error(self):
+        self.client.complete_many.side_effect = lambda payloads: [LLMError("HTTP 500")] * len(payloads)
+        with mock.patch.object(llm, "ANALYSIS_CONTEXT_TOKENS", 2000):
+            result = llm.get_resume_analysis(long_resume())
+        self.assertEqual(result, {"error": "HTTP 500"})
+
+
+if __name__ == '__main__':
+    unittest.main()
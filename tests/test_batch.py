@@ -0,0 +1,105 @@
+# tests/test_batch.py
+
+import os
+import zipfile
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from flask import json
+from app import batch
+from app.models import Resume
+from tests.helpers import AppTestCase
+
+
+def fake_prepare(filepath, filename, progress=None, content_hash=None):
+    with open(filepath, "rb") as f:
+        text = f.read().decode()
+    if "broken" in text:
+        raise batch.IngestionError("Failed to extract text from CV")
+    return {"filename": filename, "text": text, "cached": False,
+            "structured_data": {"skills": [text], "personalInfo": {"name": filename}}}
+
+
+class TestBatchUpload(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.app.config['TESTING'] = True
+
+    def tearDown(self):
+        for name in ("a.pdf", "a-1.pdf", "b.docx", "c.pdf", "copy.pdf"):
+            path = os.path.join("uploads", name)
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def build_zip(self, members):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            for name, content in members:
+                zf.writestr(name, content)
+        buffer.seek(0)
+        return buffer
+
+    def test_zip_batch_manifest(self):
+        archive = self.build_zip([
+            ("a.pdf", "alice"),
+            ("nested/a.pdf", "another alice"),
+            ("b.docx", "bob"),
+            ("copy.pdf", "alice"),
+            ("c.pdf", "broken"),
+            ("notes.txt", "ignored"),
+        ])
+        with mock.patch.object(batch, "prepare_document", side_effect=fake_prepare):
+            response = self.client.post('/api/batch', data={'archive': (archive, 'cvs.zip')},
+                                        content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+
+        statuses = {entry['filename']: entry['status'] for entry in data['files']}
+        self.assertEqual(statuses, {"a.pdf": "processed", "a-1.pdf": "processed", "b.docx": "processed",
+                                    "copy.pdf": "duplicate", "c.pdf": "failed", "notes.txt": "skipped"})
+        self.assertEqual(data['summary']['processed'], 3)
+
+        with self.app.app_context():
+            self.assertEqual(sorted(r.filename for r in Resume.query.all()), ["a-1.pdf", "a.pdf", "b.docx"])
+
+    def test_multi_file_form(self):
+        data = {'files': [(BytesIO(b"alice"), 'a.pdf'), (BytesIO(b"bob"), 'b.docx')]}
+        with mock.patch.object(batch, "prepare_document", side_effect=fake_prepare):
+            response = self.client.post('/api/batch', data=data, content_type='multipart/form-data')
+        data = json.loads(response.data)
+        self.assertEqual([entry['status'] for entry in data['files']], ["processed", "processed"])
+
+    def test_oversized_files_are_skipped(self):
+        data = {'files': [(BytesIO(b"alice"), 'a.pdf'), (BytesIO(b"x" * 64), 'big.pdf')]}
+        archive = self.build_zip([("b.docx", "bob"), ("huge.pdf", "y" * 64)])
+        with mock.patch.object(batch, "prepare_document", side_effect=fake_prepare) as prepare, \
+                mock.patch.object(batch, "BATCH_MAX_FILE_BYTES", 16):
+            form = json.loads(self.client.post('/api/batch', data=data, content_type='multipart/form-data').data)
+            zipped = json.loads(self.client.post('/api/batch', data={'archive': (archive, 'cvs.zip')},
+                                                 content_type='multipart/form-data').data)
+        self.assertEqual([(e['filename'], e['status']) for e in form['files']],
+                         [("a.pdf", "processed"), ("big.pdf", "skipped")])
+        self.assertEqual([(e['filename'], e['status']) for e in zipped['files']],
+                         [("b.docx", "processed"), ("huge.pdf", "skipped")])
+        self.assertEqual(sorted(call.args[1] for call in prepare.call_args_list), ["a.pdf", "b.docx"])
+
+    def test_invalid_zip(self):
+        response = self.client.post('/api/batch', data={'archive': (BytesIO(b"nope"), 'cvs.zip')},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+
+    def test_save_candidates_updates_existing_rows(self):
+        with self.app.app_context():
+            batch.save_candidates([("a.pdf", "old", {"skills": ["Go"]})])
+            failed = batch.save_candidates([("a.pdf", "new", {"skills": ["Rust"]}),
+                                            ("b.pdf", "bob", {"skills": []})], batch_size=1)
+            self.assertEqual(failed, [])
+            resume = Resume.query.filter_by(filename="a.pdf").one()
+            self.assertEqual(resume.skills, ["Rust"])
+            self.assertEqual(Resume.query.count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
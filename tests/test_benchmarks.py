@@ -0,0 +1,36 @@
+# tests/test_benchmarks.py
+
+import unittest
+
+from benchmarks.bench_ingestion import StageTimer, check_results
+from benchmarks.corpus import cv_lines, digital_pdf
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(cv_lines("digital-2-0", 2), cv_lines("digital-2-0", 2))
+        self.assertEqual(len(cv_lines("digital-2-0", 2)), 80)
+        self.assertTrue(digital_pdf(cv_lines("x", 1)).startswith(b"%PDF-1.4"))
+
+    def test_stage_summary(self):
+        timer = StageTimer()
+        timer.samples["ocr"] = [0.3, 0.1, 0.2]
+        summary = timer.summary()["ocr"]
+        self.assertEqual(summary["n"], 3)
+        self.assertEqual(summary["p50"], 0.2)
+        self.assertEqual(summary["max"], 0.3)
+
+    def test_threshold_and_baseline_gates(self):
+        results = {"stages": {"ocr": {"p50": 1.0, "p95": 2.0}, "persist": {"p50": 0.01, "p95": 0.02}}}
+        self.assertEqual(check_results(results, thresholds={"ocr": {"p95": 3.0}}), [])
+        self.assertEqual(len(check_results(results, thresholds={"ocr": {"p95": 1.5}})), 1)
+
+        baseline = {"stages": {"ocr": {"p50": 0.7}, "persist": {"p50": 0.01}}}
+        failures = check_results(results, baseline=baseline, tolerance=0.25)
+        self.assertEqual(len(failures), 1)
+        self.assertIn("ocr p50 regressed", failures[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
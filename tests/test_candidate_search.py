@@ -0,0 +1,75 @@
+# tests/test_candidate_search.py
+
+import unittest
+
+from app import db
+from app.candidate_search import graduation_year, backfill_facets
+from app.db_operations import save_candidate
+from app.models import ResumeSkill
+from tests.helpers import AppTestCase
+
+
+def analysis(name, skills, company, year):
+    return {
+        "personalInfo": {"name": name},
+        "skills": skills,
+        "workExperience": [{"jobTitle": "Engineer", "company": company}],
+        "education": [{"degree": "BSc", "institution": "Uni", "yearOfGraduation": year}],
+    }
+
+
+class TestCandidateSearch(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        with self.app.app_context():
+            save_candidate("alice.pdf", "Alice", analysis("Alice", ["Kubernetes", "Go"], "Acme Corp", "2019"))
+            save_candidate("bob.pdf", "Bob", analysis("Bob", {"languages": ["Python", " kubernetes "]},
+                                                      "Globex", "2012 - 2016"))
+            save_candidate("carol.pdf", "Carol", analysis("Carol", "Python, SQL", "Acme Labs", "May 2021"))
+
+    def names(self, query):
+        response = self.client.get(f'/api/candidates?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [result['name'] for result in response.get_json()['results']]
+
+    def test_graduation_year(self):
+        self.assertEqual(graduation_year("2015 - 2019"), 2019)
+        self.assertEqual(graduation_year("May 2021"), 2021)
+        self.assertIsNone(graduation_year("ongoing"))
+
+    def test_filters(self):
+        self.assertEqual(self.names("skill=KUBERNETES"), ["Alice", "Bob"])
+        self.assertEqual(self.names("skill=kubernetes&skill=python"), ["Bob"])
+        self.assertEqual(self.names("company=acme"), ["Alice", "Carol"])
+        self.assertEqual(self.names("graduated_after=2018"), ["Alice", "Carol"])
+        self.assertEqual(self.names("graduated_after=2018&skill=python"), ["Carol"])
+
+    def test_company_wildcards_are_literal(self):
+        with self.app.app_context():
+            save_candidate("dave.pdf", "Dave", analysis("Dave", ["Go"], "100% Remote_Co", "2020"))
+            save_candidate("erin.pdf", "Erin", analysis("Erin", ["Go"], "100 Remote Co", "2020"))
+        self.assertEqual(self.names("company=%25"), [])
+        self.assertEqual(self.names("company=100%25 Remote_"), ["Dave"])
+        self.assertEqual(self.names("company=100_"), [])
+
+    def test_keyset_pagination(self):
+        first = self.client.get('/api/candidates?limit=2').get_json()
+        self.assertEqual([r['name'] for r in first['results']], ["Alice", "Bob"])
+        second = self.client.get(f"/api/candidates?limit=2&cursor={first['next_cursor']}").get_json()
+        self.assertEqual([r['name'] for r in second['results']], ["Carol"])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/candidates?cursor=!!').status_code, 400)
+
+    def test_backfill(self):
+        with self.app.app_context():
+            ResumeSkill.query.delete()
+            db.session.commit()
+            self.assertEqual(backfill_facets(), 3)
+        self.assertEqual(self.names("skill=sql"), ["Carol"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# tests/test_db_operations.py
+
+import unittest
+
+from sqlalchemy import event
+
+from app import db
+from app.db_operations import save_candidate, save_candidates, upsert_resumes, _resume_values
+from app.models import Resume, ResumeSkill, resume_query, resume_summaries
+from tests.helpers import AppTestCase
+
+
+class TestResumePersistence(AppTestCase):
+
+    def capture_sql(self):
+        statements = []
+        event.listen(db.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        return statements
+
+    def test_save_candidate_updates_existing_row(self):
+        with self.app.app_context():
+            save_candidate("alice.pdf", "old text", {"personalInfo": {"name": "Alice"}, "skills": ["Go"]})
+            first_id = Resume.query.filter_by(filename="alice.pdf").one().id
+            save_candidate("alice.pdf", "new text", {"personalInfo": {"name": "Alice B"}, "skills": ["Rust"]})
+            db.session.expire_all()
+
+            resume = resume_query(text=True, analysis=True).filter_by(filename="alice.pdf").one()
+            self.assertEqual(resume.id, first_id)
+            self.assertEqual(resume.text_content, "new text")
+            self.assertEqual(resume.personal_info, {"name": "Alice B"})
+            self.assertEqual(resume.skills, ["Rust"])
+            self.assertEqual([s.name for s in ResumeSkill.query.filter_by(resume_id=first_id)], ["rust"])
+
+    def test_upsert_is_one_statement(self):
+        with self.app.app_context():
+            save_candidate("alice.pdf", "text", {"skills": ["Go"]})
+            statements = self.capture_sql()
+            ids = upsert_resumes([_resume_values("alice.pdf", "t2", {}), _resume_values("bob.pdf", "t3", {})])
+            db.session.commit()
+        self.assertEqual(sorted(ids), ["alice.pdf", "bob.pdf"])
+        resume_writes = [s for s in statements if "INTO resume " in s]
+        self.assertEqual(len(resume_writes), 1)
+        self.assertIn("ON CONFLICT", resume_writes[0])
+        self.assertFalse([s for s in statements if s.startswith("SELECT") and "FROM resume" in s])
+
+    def test_batch_keeps_last_entry_per_filename(self):
+        with self.app.app_context():
+            failed = save_candidates([("a.pdf", "first", {"skills": ["Go"]}),
+                                      ("a.pdf", "second", {"skills": ["Rust"]})])
+            self.assertEqual(failed, [])
+            resume = resume_query(text=True).filter_by(filename="a.pdf").one()
+            self.assertEqual(resume.text_content, "second")
+
+    def test_list_views_skip_text(self):
+        with self.app.app_context():
+            save_candidate("alice.pdf", "x" * 10000, {"personalInfo": {"name": "Alice"}, "skills": ["Go"]})
+            statements = self.capture_sql()
+            resume = resume_summaries().one()
+            self.assertEqual(resume.skills, ["Go"])
+            response = self.client.get("/api/candidates?skill=go")
+        self.assertEqual(response.get_json()["results"][0]["name"], "Alice")
+        self.assertTrue(statements)
+        self.assertFalse([s for s in statements if "text_content" in s])
+
+
+if __name__ == '__main__':
+    unittest.main()
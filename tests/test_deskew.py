@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from app.parser import pdf_parser
+
+
+def text_page(angle=0.0):
+    """A white page with dark text-like bars, rotated by angle degrees."""
+    page = np.full((1100, 850), 255, dtype=np.uint8)
+    for top in range(80, 1000, 24):
+        cv2.rectangle(page, (60, top), (760, top + 8), 0, -1)
+    if angle:
+        M = cv2.getRotationMatrix2D((425, 550), angle, 1.0)
+        page = cv2.warpAffine(page, M, (850, 1100), borderValue=255)
+    return page
+
+
+class TestFastDeskew(unittest.TestCase):
+    def test_recovers_angle(self):
+        for angle in (-8, -3, 2, 5):
+            with self.subTest(angle=angle):
+                page = text_page(angle)
+                estimated = pdf_parser.estimate_skew_angle(page, max_dim=400)
+                self.assertAlmostEqual(estimated, -angle, delta=0.5)
+
+                straightened, _ = pdf_parser.deskew_fast(page, max_dim=400)
+                self.assertAlmostEqual(pdf_parser.estimate_skew_angle(straightened), 0.0, delta=0.5)
+
+    def test_skips_rotation_below_tolerance(self):
+        page = text_page()
+        with mock.patch.object(pdf_parser.cv2, "warpAffine") as warp:
+            result, angle = pdf_parser.deskew_fast(page, tolerance=0.2)
+        warp.assert_not_called()
+        self.assertIs(result, page)
+        self.assertLess(abs(angle), 0.2)
+
+    def test_blank_page(self):
+        page = np.full((300, 200), 255, dtype=np.uint8)
+        self.assertEqual(pdf_parser.estimate_skew_angle(page), 0.0)
+
+    def test_process_page_reports_timings(self):
+        page = cv2.cvtColor(text_page(3), cv2.COLOR_GRAY2BGR)
+        data = {"text": ["Hello"], "block_num": [2], "par_num": [1], "line_num": [1], "level": [5]}
+        with mock.patch.object(pdf_parser, "DESKEW_MODE", "fast"), \
+                mock.patch.object(pdf_parser, "get_ocr_engine") as engine:
+            engine.return_value.image_to_data.return_value = data
+            text, timings = pdf_parser.process_page(page, strip_header_footer=False, return_timings=True)
+        self.assertEqual(engine.return_value.image_to_data.call_args.args[0].ndim, 2)
+        self.assertEqual(text, "Hello")
+        self.assertAlmostEqual(timings["skew_angle"], -3, delta=0.5)
+        self.assertIn("deskew_seconds", timings)
+        self.assertIn("ocr_seconds", timings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# tests/test_docx_parser.py
+
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+
+from docx import Document
+
+from app.parser.docx_parser import extract_text_from_docx_stream, extract_text_from_docx_legacy
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+TEXT_BOX_DOCUMENT = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document {W} {MC}><w:body>
+  <w:p><w:r><w:t>Before</w:t></w:r></w:p>
+  <w:p><w:r><mc:AlternateContent>
+    <mc:Choice Requires="wps"><w:drawing><w:txbxContent>
+      <w:p><w:r><w:t>Sidebar: Python, Go</w:t></w:r></w:p>
+    </w:txbxContent></w:drawing></mc:Choice>
+    <mc:Fallback><w:pict><w:txbxContent>
+      <w:p><w:r><w:t>Sidebar: Python, Go</w:t></w:r></w:p>
+    </w:txbxContent></w:pict></mc:Fallback>
+  </mc:AlternateContent></w:r><w:r><w:t>Anchor</w:t></w:r></w:p>
+  <w:p><w:r><w:delText>deleted</w:delText><w:t xml:space="preserve">After </w:t><w:t>text</w:t></w:r></w:p>
+</w:body></w:document>"""
+
+
+def build_cv():
+    document = Document()
+    document.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com"
+    document.sections[0].footer.paragraphs[0].text = "References on request"
+    document.add_heading("Skills", level=2)
+    table = document.add_table(rows=2, cols=2)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = ["Python", "Kubernetes", "SQL", "Terraform"][2 * r + c]
+    document.add_paragraph("Senior engineer at Acme Corp")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class TestStreamingDocxExtractor(unittest.TestCase):
+
+    def test_headers_tables_and_body_in_order(self):
+        text = extract_text_from_docx_stream(build_cv())
+        self.assertEqual(text.split("\n"), ["Jane Doe | jane@example.com", "Skills", "Python | Kubernetes",
+                                            "SQL | Terraform", "Senior engineer at Acme Corp",
+                                            "References on request"])
+
+    def test_finds_more_than_python_docx(self):
+        data = build_cv()
+        legacy = extract_text_from_docx_legacy(io.BytesIO(data))
+        self.assertNotIn("Kubernetes", legacy)
+        self.assertIn("Kubernetes", extract_text_from_docx_stream(data))
+
+    def test_text_boxes_without_fallback_duplicates(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("word/document.xml", TEXT_BOX_DOCUMENT)
+        text = extract_text_from_docx_stream(buffer.getvalue())
+        self.assertEqual(text.split("\n"), ["Before", "Sidebar: Python, Go", "Anchor", "After text"])
+
+    def test_accepts_paths_and_file_objects(self):
+        data = build_cv()
+        expected = extract_text_from_docx_stream(data)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cv.docx")
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(extract_text_from_docx_stream(path), expected)
+            with open(path, "rb") as f:
+                self.assertEqual(extract_text_from_docx_stream(f), expected)
+
+    def test_legacy_parser_accepts_bytes(self):
+        data = build_cv()
+        text = extract_text_from_docx_legacy(data)
+        self.assertIn("Senior engineer at Acme Corp", text)
+        self.assertEqual(text, extract_text_from_docx_legacy(io.BytesIO(data)))
+
+    def test_invalid_file(self):
+        self.assertEqual(extract_text_from_docx_stream(b"not a zip"), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
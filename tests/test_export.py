@@ -0,0 +1,70 @@
+# tests/test_export.py
+
+import os
+import csv
+import io
+import json
+import unittest
+from datetime import datetime
+
+from app import db
+from app.db_operations import save_candidate
+from app.export import export_chunks
+from app.models import Resume
+from tests.helpers import AppTestCase
+
+
+class TestExport(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        with self.app.app_context():
+            for i, created in enumerate(["2023-05-01", "2024-02-01", "2024-08-01"]):
+                save_candidate(f"cv{i}.pdf", f"text {i}", {"personalInfo": {"name": f"Candidate {i}"},
+                                                          "skills": ["Python", f"skill{i}"]})
+                db.session.execute(db.update(Resume).where(Resume.filename == f"cv{i}.pdf")
+                                   .values(created_at=datetime.fromisoformat(created)))
+            db.session.commit()
+
+    def test_jsonl_default_fields(self):
+        response = self.client.get('/api/export')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertIsNone(response.content_length)
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([row['filename'] for row in rows], ['cv0.pdf', 'cv1.pdf', 'cv2.pdf'])
+        self.assertNotIn('text_content', rows[0])
+        self.assertEqual(rows[2]['skills'], ['Python', 'skill2'])
+        self.assertTrue(rows[0]['created_at'].startswith('2023-05-01'))
+
+    def test_csv_with_fields_and_date_range(self):
+        response = self.client.get('/api/export?format=csv&fields=filename,skills,text_content'
+                                   '&created_after=2024-01-01&created_before=2024-06-01')
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(rows, [['filename', 'skills', 'text_content'],
+                                ['cv1.pdf', '["Python", "skill1"]', 'text 1']])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/export?fields=password').status_code, 400)
+        self.assertEqual(self.client.get('/api/export?format=xml').status_code, 400)
+        self.assertEqual(self.client.get('/api/export?created_after=yesterday').status_code, 400)
+
+    def test_chunks(self):
+        with self.app.app_context():
+            chunks = list(export_chunks('jsonl', ('id', 'filename'), chunk_bytes=40))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(len(''.join(chunks).splitlines()), 3)
+
+    def test_cli(self):
+        output = os.path.join(self.index_dir, 'export.csv')
+        result = self.app.test_cli_runner().invoke(args=[
+            'export-candidates', '--format', 'csv', '--fields', 'id,filename',
+            '--created-after', '2024-01-01', '--output', output])
+        self.assertEqual(result.exit_code, 0, result.output)
+        with open(output, encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), ['id,filename', '2,cv1.pdf', '3,cv2.pdf'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+# tests/test_jobs.py
+
+import os
+import base64
+import shutil
+import tempfile
+import time
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from flask import json
+from app import create_app, db
+from app import jobs
+from app.routes import upload as upload_routes
+
+
+class TestIngestionJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.upload_dir, True)
+        patch = mock.patch.object(upload_routes, "UPLOAD_FOLDER", self.upload_dir)
+        patch.start()
+        self.addCleanup(patch.stop)
+        with mock.patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:"}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def wait_for(self, job_id, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = json.loads(self.client.get(f'/api/jobs/{job_id}').data)
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(0.01)
+        self.fail(f"job {job_id} did not finish")
+
+    def submit(self):
+        data = {'file': (BytesIO(b'%PDF-1.4 fake'), 'job_cv.pdf')}
+        response = self.client.post('/api/jobs', data=data, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 202)
+        return json.loads(response.data)['job_id']
+
+    def test_job_runs_pipeline_in_background(self):
+        def fake_ingest(filepath, filename, progress=None, content_hash=None):
+            progress("extracting")
+            progress("analyzing")
+            progress("saving")
+            return {"filename": filename, "cached": False, "characters": 10}
+
+        with mock.patch.object(jobs, "ingest_document", side_effect=fake_ingest):
+            job = self.wait_for(self.submit())
+
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['stage'], 'done')
+        self.assertEqual(job['result']['filename'], 'job_cv.pdf')
+        # The job's private copy is gone once it finished
+        self.assertEqual(os.listdir(self.upload_dir), [])
+
+    def test_job_failure_is_reported(self):
+        with mock.patch.object(jobs, "ingest_document",
+                               side_effect=jobs.IngestionError("Failed to extract text from CV")):
+            job = self.wait_for(self.submit())
+
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], 'Failed to extract text from CV')
+
+    def test_unknown_job(self):
+        response = self.client.get('/api/jobs/does-not-exist')
+        self.assertEqual(response.status_code, 404)
+
+    def test_unsupported_file_type(self):
+        data = {'file': (BytesIO(b'text'), 'cv.txt')}
+        response = self.client.post('/api/jobs', data=data, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestCeleryJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, True)
+        self.path = os.path.join(self.dir, "cv.pdf")
+        with open(self.path, "wb") as f:
+            f.write(b"%PDF-1.4 fake")
+
+    def submit(self, inline_max_bytes):
+        with mock.patch.object(jobs.ingest_task, "delay") as delay:
+            jobs.CeleryJobQueue(inline_max_bytes).submit(self.path, "cv.pdf", content_hash="abc", cleanup=True)
+        return delay.call_args
+
+    def test_small_uploads_travel_in_the_message(self):
+        call = self.submit(inline_max_bytes=1024)
+        self.assertEqual(call.args, (None, "cv.pdf"))
+        self.assertEqual(base64.b64decode(call.kwargs["data"]), b"%PDF-1.4 fake")
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_large_uploads_are_sent_by_path(self):
+        call = self.submit(inline_max_bytes=4)
+        self.assertEqual(call.args, (self.path, "cv.pdf"))
+        self.assertNotIn("data", call.kwargs)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_worker_runs_inline_upload(self):
+        data = base64.b64encode(b"%PDF-1.4 fake").decode("ascii")
+        with mock.patch.object(jobs, "ingest_document", return_value={"filename": "cv.pdf"}) as ingest:
+            jobs.ingest_task(None, "cv.pdf", data=data)
+        self.assertEqual(ingest.call_args.args, (b"%PDF-1.4 fake", "cv.pdf"))
+
+    def test_worker_without_the_file_fails_clearly(self):
+        with mock.patch.object(jobs, "ingest_document") as ingest, \
+                self.assertRaisesRegex(RuntimeError, "not found on this worker"):
+            jobs.ingest_task(os.path.join(self.dir, "missing.pdf"), "cv.pdf")
+        ingest.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_layout.py
+
+import random
+import unittest
+
+from app.parser.layout import words_from_ocr_data
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def pandas_reference(d):
+    """The DataFrame-based filter process_page used before, kept to pin down its behavior."""
+    d_df = pd.DataFrame.from_dict(d)
+    if d_df.empty:
+        return ""
+    block_num = d_df.loc[d_df['level'] == 2, 'block_num'].max()
+    header_index = d_df[d_df['block_num'] == 1].index.values
+    footer_index = d_df[d_df['block_num'] == block_num].index.values
+    text = ' '.join(d_df.loc[
+        (d_df['level'] == 5) &
+        (~d_df.index.isin(header_index) & ~d_df.index.isin(footer_index)), 'text'
+    ].values)
+    return text.strip()
+
+
+def ocr_data(blocks):
+    """Builds an image_to_data-style dict from a list of blocks, each a list of lines of words."""
+    d = {"level": [1], "block_num": [0], "text": [""]}
+    for block_num, lines in enumerate(blocks, start=1):
+        d["level"].append(2)
+        d["block_num"].append(block_num)
+        d["text"].append("")
+        for words in lines:
+            d["level"].append(4)
+            d["block_num"].append(block_num)
+            d["text"].append("")
+            for word in words:
+                d["level"].append(5)
+                d["block_num"].append(block_num)
+                d["text"].append(word)
+    return d
+
+
+class TestHeaderFooterFilter(unittest.TestCase):
+
+    def test_strips_first_and_last_block(self):
+        d = ocr_data([[["Page", "header"]], [["Jane", "Doe"], ["Python"]], [["Page", "1"]]])
+        self.assertEqual(words_from_ocr_data(d, strip_header_footer=True), "Jane Doe Python")
+        self.assertEqual(words_from_ocr_data(d, strip_header_footer=False), "Page header Jane Doe Python Page 1")
+
+    def test_single_block_page_is_dropped_entirely(self):
+        d = ocr_data([[["Only", "block"]]])
+        self.assertEqual(words_from_ocr_data(d, strip_header_footer=True), "")
+
+    def test_empty_page(self):
+        self.assertEqual(words_from_ocr_data({"level": [], "block_num": [], "text": []}), "")
+
+    @unittest.skipIf(pd is None, "pandas is not installed")
+    def test_matches_pandas_implementation(self):
+        rng = random.Random(12)
+        vocabulary = ["Senior", "Engineer", "", " ", "Acme", "2019", "Kubernetes", "-"]
+        for _ in range(300):
+            blocks = [[[rng.choice(vocabulary) for _ in range(rng.randint(0, 4))]
+                       for _ in range(rng.randint(0, 3))]
+                      for _ in range(rng.randint(0, 5))]
+            d = ocr_data(blocks)
+            if rng.random() < 0.2:
+                # Pages without block rows keep every word
+                keep = [i for i, level in enumerate(d["level"]) if level != 2]
+                d = {key: [values[i] for i in keep] for key, values in d.items()}
+            self.assertEqual(words_from_ocr_data(d, strip_header_footer=True), pandas_reference(d))
+
+
+if __name__ == '__main__':
+    unittest.main()
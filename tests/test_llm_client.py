@@ -0,0 +1,142 @@
+# tests/test_llm_client.py
+
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.llm_operations.client import LLMClient, LLMError, completion_text
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Together-style completion endpoint driven by the server's `script` of status codes."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            status = server.script.pop(0) if server.script else 200
+        time.sleep(server.latency)
+        with server.lock:
+            server.in_flight -= 1
+
+        if status == 200 and body.get("stream"):
+            return self.stream_tokens(body["prompt"].split())
+        if status == 200:
+            payload = json.dumps({"choices": [{"text": f" echo {body['prompt']} "}]}).encode()
+        else:
+            payload = b'{"error": "busy"}'
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def stream_tokens(self, tokens):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            for token in tokens:
+                chunk = json.dumps({"choices": [{"text": token + " "}]})
+                self.wfile.write(f"data: {chunk}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(self.server.token_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.stream_aborted.set()
+        self.close_connection = True
+
+
+class TestLLMClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.connections = set()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.script = []
+        self.server.latency = 0
+        self.server.token_delay = 0
+        self.server.stream_aborted = threading.Event()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/completions"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def client(self, **kwargs):
+        kwargs.setdefault("backoff_base", 0.01)
+        return LLMClient(api_url=self.url, api_key="test", **kwargs)
+
+    def test_reuses_connections(self):
+        client = self.client()
+        for i in range(5):
+            self.assertEqual(completion_text(client.complete({"prompt": str(i)})), f"echo {i}")
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_retries_429_and_5xx(self):
+        self.server.script = [429, 503]
+        data = self.client(max_retries=3).complete({"prompt": "x"})
+        self.assertEqual(completion_text(data), "echo x")
+        self.assertEqual(self.server.requests, 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.server.script = [500, 500, 500]
+        with self.assertRaises(LLMError) as ctx:
+            self.client(max_retries=2).complete({"prompt": "x"})
+        self.assertEqual(ctx.exception.status_code, 500)
+        self.assertEqual(self.server.requests, 3)
+
+    def test_does_not_retry_client_errors(self):
+        self.server.script = [400]
+        with self.assertRaises(LLMError):
+            self.client().complete({"prompt": "x"})
+        self.assertEqual(self.server.requests, 1)
+
+    def test_complete_many_respects_in_flight_limit(self):
+        self.server.latency = 0.05
+        results = self.client(max_in_flight=3).complete_many([{"prompt": str(i)} for i in range(9)])
+        self.assertEqual([completion_text(r) for r in results], [f"echo {i}" for i in range(9)])
+        self.assertEqual(self.server.max_in_flight, 3)
+
+    def test_read_timeout(self):
+        self.server.latency = 0.3
+        with self.assertRaises(LLMError):
+            self.client(timeout=(1, 0.05), max_retries=0).complete({"prompt": "x"})
+
+    def test_stream_yields_tokens(self):
+        self.server.script = [503]
+        tokens = list(self.client().stream({"prompt": "one two three"}))
+        self.assertEqual("".join(tokens), "one two three ")
+        self.assertEqual(len(tokens), 3)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_stream_close_cancels_upstream(self):
+        self.server.token_delay = 0.01
+        stream = self.client().stream({"prompt": " ".join(["token"] * 2000)})
+        self.assertEqual(next(stream), "token ")
+        stream.close()
+        self.assertTrue(self.server.stream_aborted.wait(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# tests/test_metrics.py
+
+import os
+import unittest
+from unittest import mock
+
+from app import create_app, metrics
+
+
+class TestMetricTypes(unittest.TestCase):
+
+    def test_summary_quantiles(self):
+        summary = metrics.Summary("test_latency_seconds", "Test latency.", ("stage",), window=100)
+        for value in range(1, 101):
+            summary.observe(value / 100, stage="a")
+        quantiles = summary.quantiles(stage="a")
+        self.assertAlmostEqual(quantiles[0.5], 0.51)
+        self.assertAlmostEqual(quantiles[0.95], 0.96)
+        self.assertAlmostEqual(quantiles[0.99], 1.0)
+        self.assertEqual(summary.quantiles(stage="b"), {})
+
+        lines = summary.render()
+        self.assertIn('test_latency_seconds{stage="a",quantile="0.95"} 0.96', lines)
+        self.assertIn('test_latency_seconds_count{stage="a"} 100', lines)
+
+    def test_stage_counts_errors(self):
+        with self.assertRaises(ValueError):
+            with metrics.stage("test_failing_stage"):
+                raise ValueError("boom")
+        self.assertEqual(metrics.STAGE_ERRORS.value(stage="test_failing_stage"), 1)
+        self.assertEqual(metrics.STAGE_IN_FLIGHT.value(stage="test_failing_stage"), 0)
+        self.assertTrue(metrics.STAGE_SECONDS.quantiles(stage="test_failing_stage"))
+
+    def test_server_timing_sums_repeated_stages(self):
+        header = metrics.server_timing([("ocr_page_ocr", 0.25), ("llm_analysis", 1.5), ("ocr_page_ocr", 0.5)])
+        self.assertEqual(header, 'ocr_page_ocr;dur=750.0;desc="x2", llm_analysis;dur=1500.0;desc="x1"')
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:"}):
+            self.app = create_app()
+        self.client = self.app.test_client()
+
+        @self.app.route("/test-profiled")
+        def profiled():
+            with metrics.stage("test_profiled_stage"):
+                pass
+            return "ok"
+
+    def test_metrics_exposition(self):
+        self.client.get("/test-profiled")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        body = response.get_data(as_text=True)
+        self.assertIn("# TYPE cv_stage_seconds summary", body)
+        self.assertIn('cv_http_requests_total{endpoint="profiled",method="GET",status="200"}', body)
+        self.assertIn('cv_stage_seconds_count{stage="test_profiled_stage"}', body)
+
+    def test_profile_header(self):
+        response = self.client.get("/test-profiled")
+        self.assertNotIn("Server-Timing", response.headers)
+
+        response = self.client.get("/test-profiled", headers={metrics.PROFILE_HEADER: "1"})
+        timing = response.headers["Server-Timing"]
+        self.assertIn("test_profiled_stage;dur=", timing)
+        self.assertIn("total;dur=", timing)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# tests/test_near_duplicates.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from app import pipeline
+from app.db_operations import save_candidate
+from app.search.minhash import MinHashIndex, signature, similarity
+from tests.helpers import AppTestCase
+
+CV = "\n".join([
+    "Alice Example",
+    "alice@example.com +44 20 7946 0000",
+    "Senior backend engineer with ten years of experience building payment systems.",
+    "Acme Corp 2016-2024 led the migration of the billing platform to Kubernetes and Go.",
+    "Initech 2012-2016 built reporting pipelines in Python and PostgreSQL for finance teams.",
+    "MSc Computer Science, University of Somewhere, 2012.",
+    "Skills: Go, Python, Kubernetes, PostgreSQL, Kafka, Terraform, AWS, gRPC.",
+    "Projects: open source rate limiter used by several fintech companies in production.",
+])
+EDITED_CV = CV.replace("+44 20 7946 0000", "+44 20 7946 9999") + "\nSpeaker at GopherCon 2023."
+OTHER_CV = "\n".join([
+    "Bob Sample", "bob@example.org",
+    "Registered nurse with experience in intensive care and emergency medicine.",
+    "St Mary's Hospital 2015-2023 charge nurse on the cardiac ward.",
+    "BSc Nursing, Some College, 2014.",
+])
+
+
+class TestMinHash(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "minhash.jsonl")
+        self.addCleanup(shutil.rmtree, self.dir, True)
+
+    def test_similarity_tracks_edits(self):
+        self.assertGreater(similarity(signature(CV), signature(EDITED_CV)), 0.75)
+        self.assertLess(similarity(signature(CV), signature(OTHER_CV)), 0.2)
+        self.assertIsNone(signature("  ...  "))
+
+    def test_index_finds_near_duplicates_and_survives_reload(self):
+        index = MinHashIndex(self.path)
+        index.add_many([(1, CV), (2, OTHER_CV), (3, "")])
+        self.assertEqual([doc_id for doc_id, _ in index.query(EDITED_CV, 0.7)], [1])
+        self.assertEqual(index.query(EDITED_CV, 0.7, exclude=1), [])
+
+        reloaded = MinHashIndex(self.path)
+        self.assertEqual(len(reloaded), 2)
+        self.assertEqual([doc_id for doc_id, _ in reloaded.query(EDITED_CV, 0.7)], [1])
+
+        index.remove(1)
+        self.assertEqual(MinHashIndex(self.path).query(EDITED_CV, 0.7), [])
+
+    def test_reader_follows_writes_and_compaction_of_another_instance(self):
+        reader = MinHashIndex(self.path)
+        writer = MinHashIndex(self.path)
+        for i in range(200):
+            writer.add_many([(i % 5, OTHER_CV + f" shift {i}")])
+        writer.add_many([(9, CV)])
+        self.assertEqual(len(writer), 6)
+        with open(self.path) as f:
+            self.assertLess(sum(1 for _ in f), 200)
+        self.assertEqual([doc_id for doc_id, _ in reader.query(EDITED_CV, 0.7)], [9])
+        self.assertEqual(len(reader), 6)
+
+
+class TestNearDuplicateIngestion(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.patch(pipeline, "NEAR_DUPLICATE_THRESHOLD", 0.7)
+        self.patch(pipeline, "get_cached_analysis", return_value=None)
+        self.patch(pipeline, "store_analysis")
+        with self.app.app_context():
+            save_candidate("alice.pdf", CV, {"personalInfo": {"name": "Alice"}, "skills": ["Go", "Python"]})
+
+    def prepare(self, text, filename="alice-v2.pdf"):
+        with self.app.app_context(), mock.patch.object(pipeline, "extract_text", return_value=text):
+            return pipeline.prepare_document(b"%PDF", filename)
+
+    def test_reuse_skips_the_llm(self):
+        with mock.patch.object(pipeline, "NEAR_DUPLICATE_MODE", "reuse"), \
+                mock.patch.object(pipeline, "analyze_text") as analyze:
+            document = self.prepare(EDITED_CV)
+        analyze.assert_not_called()
+        self.assertEqual(document["structured_data"]["skills"], ["Go", "Python"])
+        self.assertEqual(document["structured_data"]["personalInfo"], {"name": "Alice"})
+        near = document["near_duplicate"]
+        self.assertEqual(near["filename"], "alice.pdf")
+        self.assertTrue(near["reused"])
+        self.assertIn("Speaker at GopherCon 2023.", near["changes"]["added"])
+        self.assertIn("alice@example.com +44 20 7946 0000", near["changes"]["removed"])
+
+    def test_reupload_under_same_filename_is_analyzed(self):
+        with mock.patch.object(pipeline, "NEAR_DUPLICATE_MODE", "reuse"), \
+                mock.patch.object(pipeline, "analyze_text", return_value={"skills": ["Go", "Rust"]}) as analyze:
+            document = self.prepare(EDITED_CV, filename="alice.pdf")
+        analyze.assert_called_once()
+        self.assertEqual(document["structured_data"], {"skills": ["Go", "Rust"]})
+        self.assertIsNone(document["near_duplicate"])
+
+    def test_flag_mode_still_analyzes(self):
+        with mock.patch.object(pipeline, "analyze_text", return_value={"skills": ["Go"]}) as analyze:
+            document = self.prepare(EDITED_CV)
+        analyze.assert_called_once()
+        self.assertEqual(document["structured_data"], {"skills": ["Go"]})
+        self.assertFalse(document["near_duplicate"]["reused"])
+
+    def test_different_cv_is_not_flagged(self):
+        with mock.patch.object(pipeline, "NEAR_DUPLICATE_MODE", "reuse"), \
+                mock.patch.object(pipeline, "analyze_text", return_value={"skills": ["Nursing"]}):
+            document = self.prepare(OTHER_CV)
+        self.assertIsNone(document["near_duplicate"])
+        self.assertEqual(document["structured_data"], {"skills": ["Nursing"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
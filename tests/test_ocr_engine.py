@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from app.parser import ocr_engine
+from app.parser.layout import words_from_ocr_data
+
+TSV = "\n".join([
+    "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext",
+    "1\t1\t0\t0\t0\t0\t0\t0\t850\t1100\t-1\t",
+    "2\t1\t1\t0\t0\t0\t60\t80\t700\t40\t-1",
+    "5\t1\t1\t1\t1\t1\t60\t80\t120\t30\t96.5\tJane",
+    "5\t1\t1\t1\t1\t2\t190\t80\t110\t30\t95.0\tDoe",
+])
+
+
+class TestParseTsv(unittest.TestCase):
+    def test_matches_image_to_data_dict(self):
+        data = ocr_engine.parse_tsv(TSV)
+        self.assertEqual(data["level"], [1, 2, 5, 5])
+        self.assertEqual(data["block_num"], [0, 1, 1, 1])
+        self.assertEqual(data["conf"], [-1.0, -1.0, 96.5, 95.0])
+        self.assertEqual(data["text"], ["", "", "Jane", "Doe"])
+        self.assertEqual(words_from_ocr_data(data, strip_header_footer=False), "Jane Doe")
+
+
+class TestEngineSelection(unittest.TestCase):
+    def test_falls_back_without_tesserocr(self):
+        with mock.patch.object(ocr_engine, "tesserocr", None):
+            self.assertEqual(ocr_engine.create_ocr_engine("auto").name, "pytesseract")
+            self.assertEqual(ocr_engine.create_ocr_engine("tesserocr").name, "pytesseract")
+
+    def test_falls_back_when_init_fails(self):
+        fake = mock.Mock()
+        fake.PyTessBaseAPI.side_effect = RuntimeError("Failed to init API, possibly an invalid tessdata path")
+        with mock.patch.object(ocr_engine, "tesserocr", fake):
+            self.assertEqual(ocr_engine.create_ocr_engine("auto").name, "pytesseract")
+
+    def test_tesserocr_engine_passes_buffer(self):
+        fake = mock.Mock()
+        fake.PyTessBaseAPI.return_value.GetTSVText.return_value = TSV
+        with mock.patch.object(ocr_engine, "tesserocr", fake):
+            engine = ocr_engine.create_ocr_engine("tesserocr")
+            image = np.zeros((20, 30), dtype=np.uint8)
+            data = engine.image_to_data(image)
+
+        self.assertEqual(engine.name, "tesserocr")
+        fake.PyTessBaseAPI.assert_called_once_with(lang=ocr_engine.OCR_LANG)
+        args = fake.PyTessBaseAPI.return_value.SetImageBytes.call_args.args
+        self.assertEqual(args[1:], (30, 20, 1, 30))
+        self.assertEqual(len(args[0]), 600)
+        fake.PyTessBaseAPI.return_value.SetSourceResolution.assert_called_once_with(ocr_engine.OCR_DPI)
+        self.assertEqual(data["text"][-1], "Doe")
+
+    def test_tesserocr_resolution_follows_set_image(self):
+        fake = mock.Mock()
+        fake.PyTessBaseAPI.return_value.GetTSVText.return_value = TSV
+        with mock.patch.object(ocr_engine, "tesserocr", fake):
+            engine = ocr_engine.TesserocrEngine(dpi=300)
+            engine.image_to_data(np.zeros((20, 30, 3), dtype=np.uint8))
+        calls = [call[0] for call in fake.PyTessBaseAPI.return_value.method_calls]
+        self.assertLess(calls.index("SetImageBytes"), calls.index("SetSourceResolution"))
+        fake.PyTessBaseAPI.return_value.SetSourceResolution.assert_called_once_with(300)
+
+    def test_resolved_engine_name_is_probed_once(self):
+        with mock.patch.object(ocr_engine, "_resolved_engine_name", None), \
+                mock.patch.object(ocr_engine, "tesserocr", None), \
+                mock.patch.object(ocr_engine, "create_ocr_engine", wraps=ocr_engine.create_ocr_engine) as create:
+            self.assertEqual(ocr_engine.resolved_engine_name(), "pytesseract")
+            self.assertEqual(ocr_engine.resolved_engine_name(), "pytesseract")
+        create.assert_called_once()
+
+    def test_engine_is_reused_per_thread(self):
+        with mock.patch.object(ocr_engine, "_local", ocr_engine.threading.local()), \
+                mock.patch.object(ocr_engine, "create_ocr_engine",
+                                  side_effect=lambda: ocr_engine.PytesseractEngine()) as create:
+            first = ocr_engine.get_ocr_engine()
+            self.assertIs(ocr_engine.get_ocr_engine(), first)
+        create.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# tests/test_ocr_pool.py
+
+import os
+import time
+import unittest
+from unittest import mock
+from concurrent.futures.process import BrokenProcessPool
+
+from app.parser import pdf_parser
+
+
+def fake_process_page(page, strip_header_footer=None, return_timings=False):
+    # Module-level so pool workers can unpickle it; later pages finish first
+    time.sleep(0.01 * (5 - page % 5))
+    text = f"text of page {page} from {os.getpid()}"
+    return (text, {"ocr_seconds": 0.01}) if return_timings else text
+
+
+class TestOcrPool(unittest.TestCase):
+
+    def setUp(self):
+        pdf_parser.shutdown_ocr_pool()
+        patch = mock.patch.object(pdf_parser, "process_page", fake_process_page)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(pdf_parser.shutdown_ocr_pool)
+
+    def test_pool_keeps_page_order(self):
+        texts = pdf_parser.process_pages(list(range(10)), workers=2)
+        self.assertEqual([text.split(" from ")[0] for text in texts], [f"text of page {n}" for n in range(10)])
+        self.assertNotIn(str(os.getpid()), " ".join(texts))
+
+    def test_streaming_pool_keeps_page_order(self):
+        texts = pdf_parser.process_pages_streaming(iter(range(10)), workers=2)
+        self.assertEqual([text.split(" from ")[0] for text in texts], [f"text of page {n}" for n in range(10)])
+
+    def test_workers_capped_at_max(self):
+        with mock.patch.object(pdf_parser, "OCR_MAX_WORKERS", 2):
+            pool = pdf_parser.get_ocr_pool(workers=16)
+        self.assertEqual(pdf_parser._ocr_pool_size, 2)
+        self.assertEqual(pool._max_workers, 2)
+
+    def test_pool_reused_across_calls(self):
+        pool = pdf_parser.get_ocr_pool(workers=2)
+        pdf_parser.process_pages([1, 2], workers=2)
+        pdf_parser.process_pages([3, 4], workers=2)
+        self.assertIs(pdf_parser.get_ocr_pool(workers=2), pool)
+
+        pdf_parser.shutdown_ocr_pool()
+        self.assertIsNot(pdf_parser.get_ocr_pool(workers=2), pool)
+
+    def test_serial_fallback_when_pool_breaks(self):
+        broken = mock.Mock()
+        broken.map.side_effect = BrokenProcessPool("worker died")
+        with mock.patch.object(pdf_parser, "get_ocr_pool", return_value=broken), \
+                mock.patch.object(pdf_parser, "shutdown_ocr_pool") as shutdown:
+            texts = pdf_parser.process_pages([1, 2, 3], workers=2)
+        shutdown.assert_called_once()
+        self.assertEqual(texts, [f"text of page {n} from {os.getpid()}" for n in (1, 2, 3)])
+
+    def test_single_worker_stays_in_process(self):
+        with mock.patch.object(pdf_parser, "get_ocr_pool") as get_pool:
+            texts = pdf_parser.process_pages([1, 2], workers=1)
+        get_pool.assert_not_called()
+        self.assertEqual(len(texts), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
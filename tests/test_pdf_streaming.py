@@ -0,0 +1,121 @@
+# tests/test_pdf_streaming.py
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.parser import pdf_parser
+
+
+def fake_convert(path, dpi=None, grayscale=None, first_page=None, last_page=None):
+    return [f"page {number}" for number in range(first_page, last_page + 1)]
+
+
+def fake_process_page(page, strip_header_footer=None, return_timings=False):
+    text = page.upper()
+    return (text, {}) if return_timings else text
+
+
+class TestPageWindows(unittest.TestCase):
+
+    def test_groups_consecutive_pages(self):
+        self.assertEqual(list(pdf_parser._page_windows([1, 2, 3, 4, 5], 2)), [(1, 2), (3, 4), (5, 5)])
+        self.assertEqual(list(pdf_parser._page_windows([1, 2, 5, 6, 7, 9], 3)), [(1, 2), (5, 7), (9, 9)])
+        self.assertEqual(list(pdf_parser._page_windows([], 4)), [])
+
+
+class TestIterPdfPages(unittest.TestCase):
+
+    def setUp(self):
+        patches = [mock.patch.object(pdf_parser, "pdfinfo_from_path", return_value={"Pages": 5}),
+                   mock.patch.object(pdf_parser, "convert_from_path", side_effect=fake_convert)]
+        self.convert = [patch.start() for patch in patches][1]
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+    def test_renders_in_windows_and_page_order(self):
+        pages = list(pdf_parser.iter_pdf_pages(b"%PDF-1.4", window=2))
+        self.assertEqual(pages, [f"page {n}" for n in range(1, 6)])
+        self.assertEqual([(c.kwargs["first_page"], c.kwargs["last_page"]) for c in self.convert.call_args_list],
+                         [(1, 2), (3, 4), (5, 5)])
+
+    def test_selected_pages_only(self):
+        pages = list(pdf_parser.iter_pdf_pages(b"%PDF-1.4", window=4, page_numbers=[5, 2, 3]))
+        self.assertEqual(pages, ["page 2", "page 3", "page 5"])
+
+    def test_missing_file(self):
+        self.assertEqual(list(pdf_parser.iter_pdf_pages("/nonexistent/cv.pdf")), [])
+        self.convert.assert_not_called()
+
+
+class TestStreamingOcr(unittest.TestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(pdf_parser, "process_page", side_effect=fake_process_page)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_keeps_page_order(self):
+        pages = (f"page {n}" for n in range(1, 8))
+        self.assertEqual(pdf_parser.process_pages_streaming(pages, workers=0),
+                         [f"PAGE {n}" for n in range(1, 8)])
+
+    def test_render_error_is_raised(self):
+        def pages():
+            yield "page 1"
+            yield "page 2"
+            raise RuntimeError("pdftoppm crashed")
+
+        with self.assertRaisesRegex(RuntimeError, "pdftoppm crashed"):
+            pdf_parser.process_pages_streaming(pages(), workers=0)
+
+    def test_ocr_path_returns_render_error(self):
+        with mock.patch.object(pdf_parser, "iter_pdf_pages", side_effect=RuntimeError("pdftoppm crashed")), \
+                mock.patch.object(pdf_parser, "PDF_STREAMING", True):
+            text = pdf_parser.extract_text_from_pdf_with_ocr(b"%PDF-1.4", workers=0)
+        self.assertTrue(text.startswith("Error:"))
+        self.assertIn("pdftoppm crashed", text)
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_error_after_items(self):
+        def items():
+            yield 1
+            yield 2
+            raise ValueError("broken page")
+
+        received = []
+        with self.assertRaisesRegex(ValueError, "broken page"):
+            for item in pdf_parser._prefetch(items(), 1):
+                received.append(item)
+        self.assertEqual(received, [1, 2])
+
+    def test_producer_exits_when_consumer_stops(self):
+        produced = []
+        finished = threading.Event()
+
+        def items():
+            try:
+                for n in range(1000):
+                    produced.append(n)
+                    yield n
+            finally:
+                finished.set()
+
+        before = threading.active_count()
+        prefetched = pdf_parser._prefetch(items(), 1)
+        self.assertEqual(next(prefetched), 0)
+        prefetched.close()
+
+        self.assertTrue(finished.wait(2))
+        self.assertLess(len(produced), 10)
+        deadline = time.time() + 2
+        while threading.active_count() > before and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(threading.active_count(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
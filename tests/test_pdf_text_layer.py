@@ -0,0 +1,137 @@
+# tests/test_pdf_text_layer.py
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from app import pipeline
+from app.metrics import STAGE_ERRORS
+from app.parser import pdf_parser, pdf_text_layer
+
+
+def build_pdf(page_texts):
+    """Builds a minimal PDF with one Helvetica text line per page (None = blank page)."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET" if text else ""
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+@unittest.skipIf(pdf_text_layer.PdfReader is None, "pypdf is not installed")
+class TestPdfTextLayer(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.pdf_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.pdf_path)
+
+    def write_pdf(self, page_texts):
+        with open(self.pdf_path, "wb") as f:
+            f.write(build_pdf(page_texts))
+
+    def test_has_usable_text(self):
+        self.assertFalse(pdf_text_layer.has_usable_text(""))
+        self.assertFalse(pdf_text_layer.has_usable_text("  \n 12 ", min_chars=5))
+        self.assertTrue(pdf_text_layer.has_usable_text("Senior Python Developer", min_chars=5))
+        self.assertFalse(pdf_text_layer.has_usable_text("(cid:1)(cid:2)(cid:3) ab", min_chars=2))
+
+    def test_digital_pdf_skips_ocr(self):
+        self.write_pdf(["Jane Doe Senior Python Developer with ten years of experience"] * 2)
+        with mock.patch.object(pdf_text_layer, "process_pages_streaming") as ocr:
+            text, stats = pdf_text_layer.extract_text_from_pdf(self.pdf_path, return_stats=True)
+        ocr.assert_not_called()
+        self.assertIn("Senior Python Developer", text)
+        self.assertEqual([s["method"] for s in stats], ["text_layer", "text_layer"])
+
+    def test_mixed_pdf_falls_back_per_page(self):
+        self.write_pdf(["Jane Doe Senior Python Developer with ten years of experience", None,
+                        "Education: MSc Computer Science, University of Somewhere 2015"])
+        with mock.patch.object(pdf_text_layer, "iter_pdf_pages") as pages, \
+                mock.patch.object(pdf_text_layer, "process_pages_streaming",
+                                  return_value=[("scanned page", {"deskew_seconds": 0.01, "ocr_seconds": 0.2})]):
+            text, stats = pdf_text_layer.extract_text_from_pdf(self.pdf_path, return_stats=True)
+        self.assertEqual(pages.call_args.kwargs["page_numbers"], [2])
+        self.assertEqual([s["method"] for s in stats], ["text_layer", "ocr", "text_layer"])
+        self.assertEqual(stats[1]["ocr_seconds"], 0.2)
+        lines = text.split("\n")
+        self.assertEqual(lines[1], "scanned page")
+        self.assertIn("Education", lines[2])
+
+    def test_ocr_fallback_failure_is_reported(self):
+        self.write_pdf(["Jane Doe Senior Python Developer with ten years of experience", None])
+        with mock.patch.object(pdf_text_layer, "iter_pdf_pages"), \
+                mock.patch.object(pdf_text_layer, "process_pages_streaming",
+                                  side_effect=RuntimeError("pdftoppm crashed")):
+            text, stats = pdf_text_layer.extract_text_from_pdf(self.pdf_path, return_stats=True)
+            with self.assertRaises(pipeline.IngestionError) as raised:
+                pipeline.extract_text(self.pdf_path, "cv.pdf")
+        self.assertIn("Senior Python Developer", text)
+        self.assertNotIn("error", stats[0])
+        self.assertEqual(stats[1]["error"], "pdftoppm crashed")
+        self.assertIn("pdftoppm crashed", raised.exception.message)
+
+    def test_ocr_engine_failure_is_reported(self):
+        self.write_pdf(["Jane Doe Senior Python Developer with ten years of experience", None])
+        engine = mock.Mock()
+        engine.image_to_data.side_effect = RuntimeError("tesseract crashed")
+        errors = STAGE_ERRORS.value(stage="ocr_page")
+        with mock.patch.object(pdf_text_layer, "iter_pdf_pages",
+                               side_effect=lambda *args, **kwargs: iter([np.full((60, 80), 255, np.uint8)])), \
+                mock.patch.object(pdf_parser, "get_ocr_engine", return_value=engine), \
+                mock.patch.object(pdf_parser, "OCR_WORKERS", 0):
+            text, stats = pdf_text_layer.extract_text_from_pdf(self.pdf_path, return_stats=True)
+            with self.assertRaisesRegex(pipeline.IngestionError, "tesseract crashed"):
+                pipeline.extract_text(self.pdf_path, "cv.pdf")
+        self.assertEqual(stats[1]["method"], "ocr")
+        self.assertEqual(stats[1]["error"], "tesseract crashed")
+        self.assertEqual(STAGE_ERRORS.value(stage="ocr_page"), errors + 2)
+
+    def test_whole_document_ocr_failure_is_reported(self):
+        with mock.patch.object(pdf_text_layer, "extract_text_layer", return_value=None), \
+                mock.patch.object(pdf_text_layer, "extract_text_from_pdf_with_ocr",
+                                  return_value="Error: No pages found in the PDF."):
+            text, stats = pdf_text_layer.extract_text_from_pdf(self.pdf_path, return_stats=True)
+            with self.assertRaisesRegex(pipeline.IngestionError, "No pages found"):
+                pipeline.extract_text(self.pdf_path, "cv.pdf")
+        self.assertEqual(text, "")
+        self.assertEqual(stats[0]["error"], "No pages found in the PDF.")
+
+    def test_ocr_fallback_without_streaming(self):
+        self.write_pdf([None, "Jane Doe Senior Python Developer with ten years of experience", None])
+        with mock.patch.object(pdf_text_layer, "PDF_STREAMING", False), \
+                mock.patch.object(pdf_text_layer, "iter_pdf_pages", return_value=iter(["p1", "p3"])) as pages, \
+                mock.patch.object(pdf_text_layer, "process_pages_streaming") as streaming, \
+                mock.patch.object(pdf_text_layer, "process_pages",
+                                  return_value=[("first", {}), ("third", {})]) as ocr:
+            text = pdf_text_layer.extract_text_from_pdf(self.pdf_path)
+        streaming.assert_not_called()
+        self.assertEqual(ocr.call_args.args[0], ["p1", "p3"])
+        self.assertEqual(pages.call_args.kwargs["page_numbers"], [1, 3])
+        self.assertEqual(text.split("\n")[0], "first")
+        self.assertEqual(text.split("\n")[2], "third")
+
+
+if __name__ == '__main__':
+    unittest.main()
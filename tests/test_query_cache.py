@@ -0,0 +1,103 @@
+# tests/test_query_cache.py
+
+import unittest
+from unittest import mock
+
+from sqlalchemy import event
+
+from app import db, query_cache
+from app.db_operations import save_candidate
+from app.llm_operations import llm_query
+from tests.helpers import AppTestCase
+
+
+def analysis(name):
+    return {"personalInfo": {"name": name}, "skills": ["Python"]}
+
+
+class TestMemoryQueryCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = query_cache.MemoryQueryCache(max_entries=2, ttl=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "3")
+
+    def test_ttl(self):
+        cache = query_cache.MemoryQueryCache(max_entries=2, ttl=60)
+        cache.set("a", "1")
+        with mock.patch.object(query_cache.time, "monotonic", return_value=query_cache.time.monotonic() + 61):
+            self.assertIsNone(cache.get("a"))
+
+    def test_normalized_queries_share_a_key(self):
+        self.assertEqual(query_cache.query_cache_key("Who knows  Python?", 3),
+                         query_cache.query_cache_key("who knows python", 3))
+        self.assertNotEqual(query_cache.query_cache_key("who knows python", 3),
+                            query_cache.query_cache_key("who knows python", 4))
+
+
+class TestQueryAnswerCache(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.patch(query_cache, "_cache", query_cache.MemoryQueryCache(16, 60))
+
+        self.llm = mock.Mock()
+        self.llm.complete.side_effect = lambda payload: {"choices": [{"text": f"answer {self.llm.complete.call_count}"}]}
+        self.llm.stream.side_effect = lambda payload: iter(["streamed ", "answer"])
+        self.patch(llm_query, "get_llm_client", return_value=self.llm)
+
+    def test_generation_bumped_on_save(self):
+        with self.app.app_context():
+            self.assertEqual(query_cache.corpus_generation(), 0)
+            save_candidate("alice.pdf", "Alice Python", analysis("Alice"))
+            save_candidate("bob.pdf", "Bob Python", analysis("Bob"))
+            self.assertEqual(query_cache.corpus_generation(), 2)
+
+    def test_bump_is_one_upsert(self):
+        with self.app.app_context():
+            statements = []
+            event.listen(db.engine, "before_cursor_execute",
+                         lambda conn, cursor, statement, *args: statements.append(statement))
+            # The first bump creates the row with the same statement later bumps use
+            for _ in range(3):
+                query_cache.bump_corpus_generation()
+                db.session.commit()
+            self.assertEqual(query_cache.corpus_generation(), 3)
+        writes = [s for s in statements if "corpus_state" in s and not s.startswith("SELECT")]
+        self.assertEqual(len(writes), 3)
+        self.assertTrue(all("ON CONFLICT" in s for s in writes))
+
+    def test_answers_reused_until_corpus_changes(self):
+        with self.app.app_context():
+            save_candidate("alice.pdf", "Alice Python", analysis("Alice"))
+            self.assertEqual(llm_query.query_cv_data("Who knows Python?"), "answer 1")
+            self.assertEqual(llm_query.query_cv_data("who knows python"), "answer 1")
+            self.assertEqual(self.llm.complete.call_count, 1)
+
+            save_candidate("bob.pdf", "Bob Python", analysis("Bob"))
+            self.assertEqual(llm_query.query_cv_data("Who knows Python?"), "answer 2")
+
+    def test_streamed_answers_are_cached(self):
+        with self.app.app_context():
+            save_candidate("alice.pdf", "Alice Python", analysis("Alice"))
+            self.assertEqual(list(llm_query.query_cv_data_stream("Python?")), ["streamed ", "answer"])
+            self.assertEqual(list(llm_query.query_cv_data_stream("python")), ["streamed answer"])
+            self.assertEqual(llm_query.query_cv_data("python"), "streamed answer")
+            self.assertEqual(self.llm.stream.call_count, 1)
+            self.llm.complete.assert_not_called()
+
+    def test_errors_are_not_cached(self):
+        self.llm.complete.side_effect = llm_query.LLMError("HTTP 500", 500, "down")
+        with self.app.app_context():
+            llm_query.query_cv_data("Python?")
+            llm_query.query_cv_data("Python?")
+        self.assertEqual(self.llm.complete.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
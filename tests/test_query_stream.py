@@ -0,0 +1,82 @@
+# tests/test_query_stream.py
+
+import os
+import json
+import unittest
+from unittest import mock
+
+from app import create_app
+from app.routes import upload
+from app.llm_operations.client import LLMError
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestQueryStream(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:"}):
+            self.app = create_app()
+        self.client = self.app.test_client()
+
+    def test_json_mode_unchanged(self):
+        with mock.patch.object(upload, "query_cv_data", return_value="Alice knows Go") as query:
+            response = self.client.post("/api/query", json={"query": "who knows Go?"})
+        query.assert_called_once_with("who knows Go?")
+        self.assertEqual(response.get_json(), {"response": "Alice knows Go"})
+
+    def test_streams_tokens(self):
+        with mock.patch.object(upload, "query_cv_data_stream", return_value=iter(["Alice ", "knows ", "Go"])):
+            response = self.client.post("/api/query", json={"query": "who knows Go?", "stream": True})
+            body = response.get_data(as_text=True)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertTrue(body.startswith(":"))
+        events = parse_events(body)
+        self.assertEqual([e for e, _ in events], ["token", "token", "token", "done"])
+        self.assertEqual("".join(data["text"] for e, data in events if e == "token"), "Alice knows Go")
+
+    def test_accept_header_selects_stream(self):
+        with mock.patch.object(upload, "query_cv_data_stream", return_value=iter(["ok"])):
+            response = self.client.post("/api/query", json={"query": "q"},
+                                        headers={"Accept": "text/event-stream"})
+            response.get_data()
+        self.assertEqual(response.mimetype, "text/event-stream")
+
+    def test_error_event(self):
+        def failing(query_text):
+            yield "partial "
+            raise LLMError("HTTP 500", 500, "upstream failed")
+
+        with mock.patch.object(upload, "query_cv_data_stream", side_effect=failing):
+            response = self.client.post("/api/query", json={"query": "q", "stream": True})
+            events = parse_events(response.get_data(as_text=True))
+        self.assertEqual(events[-1], ("error", {"error": "HTTP 500: upstream failed"}))
+
+    def test_disconnect_closes_upstream(self):
+        closed = []
+
+        def answer(query_text):
+            try:
+                while True:
+                    yield "token "
+            finally:
+                closed.append(True)
+
+        with mock.patch.object(upload, "query_cv_data_stream", side_effect=answer):
+            response = self.client.post("/api/query", json={"query": "q", "stream": True}, buffered=False)
+            chunks = iter(response.response)
+            next(chunks)
+            next(chunks)
+            response.close()
+        self.assertEqual(closed, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
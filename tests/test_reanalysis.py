@@ -0,0 +1,120 @@
+# tests/test_reanalysis.py
+
+import os
+import json
+import unittest
+from unittest import mock
+
+from app import db
+from app import reanalysis
+from app.db_operations import save_candidate
+from app.llm_operations.llm import ANALYSIS_VERSION
+from app.models import Resume, resume_query
+from tests.helpers import AppTestCase
+
+
+class TestReanalysis(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.checkpoint = os.path.join(self.index_dir, "reanalyze.checkpoint.json")
+        with self.app.app_context():
+            save_candidate("old1.pdf", "Go developer", {"skills": ["Go"]}, analysis_version="1:old-model")
+            save_candidate("old2.pdf", "Rust developer", {"skills": ["Rust"]}, analysis_version="1:old-model")
+            save_candidate("current.pdf", "Java developer", {"skills": ["Java"]})
+            save_candidate("legacy.pdf", "C developer", {"skills": ["C"]})
+            # Rows written before the column existed
+            Resume.query.filter_by(filename="legacy.pdf").update({"analysis_version": None})
+            db.session.commit()
+
+    def run_reanalysis(self, side_effect=None, **kwargs):
+        analyze = mock.Mock(side_effect=side_effect or (lambda text: {"skills": [text.split()[0] + "-v2"]}))
+        with self.app.app_context(), mock.patch.object(reanalysis, "get_resume_analysis", analyze):
+            result = reanalysis.reanalyze(checkpoint=self.checkpoint, batch_size=2, concurrency=2, **kwargs)
+        return result, analyze
+
+    def versions(self):
+        with self.app.app_context():
+            return {r.filename: (r.analysis_version, r.skills)
+                    for r in resume_query(Resume.filename, Resume.analysis_version, Resume.skills)}
+
+    def test_only_out_of_date_resumes_are_redone(self):
+        result, analyze = self.run_reanalysis()
+        self.assertEqual(result["done"], 3)
+        self.assertEqual(result["failed"], [])
+        self.assertEqual(sorted(call.args[0] for call in analyze.call_args_list),
+                         ["C developer", "Go developer", "Rust developer"])
+        versions = self.versions()
+        self.assertEqual(versions["old1.pdf"], (ANALYSIS_VERSION, ["Go-v2"]))
+        self.assertEqual(versions["legacy.pdf"], (ANALYSIS_VERSION, ["C-v2"]))
+        self.assertEqual(versions["current.pdf"], (ANALYSIS_VERSION, ["Java"]))
+
+        # Everything is current now
+        result, analyze = self.run_reanalysis(restart=True)
+        analyze.assert_not_called()
+        self.assertEqual(result["total"], 0)
+
+    def test_failures_are_recorded_and_keep_the_old_analysis(self):
+        def analyze(text):
+            return {"error": "timeout"} if text.startswith("Rust") else {"skills": ["new"]}
+        result, _ = self.run_reanalysis(side_effect=analyze)
+        with self.app.app_context():
+            failed = Resume.query.filter(Resume.id.in_(result["failed"])).one()
+        self.assertEqual(failed.filename, "old2.pdf")
+        self.assertEqual(self.versions()["old2.pdf"], ("1:old-model", ["Rust"]))
+
+    def test_resumes_after_the_last_committed_batch(self):
+        calls = []
+
+        def crash_on_third(text):
+            calls.append(text)
+            if len(calls) == 3:
+                raise RuntimeError("worker killed")
+            return {"skills": ["new"]}
+
+        with self.assertRaises(RuntimeError):
+            self.run_reanalysis(side_effect=crash_on_third)
+        with open(self.checkpoint, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["done"], 2)
+
+        result, analyze = self.run_reanalysis()
+        self.assertEqual([call.args[0] for call in analyze.call_args_list], ["C developer"])
+        self.assertEqual(result["done"], 3)
+        self.assertEqual({version for version, _ in self.versions().values()}, {ANALYSIS_VERSION})
+
+    def test_filename_filters(self):
+        with self.app.app_context():
+            save_candidate("cv_1.pdf", "Go developer", {"skills": ["Go"]}, analysis_version="1:old-model")
+            save_candidate("cvx1.pdf", "Go developer", {"skills": ["Go"]}, analysis_version="1:old-model")
+
+            def matching(**filters):
+                return sorted(row.filename for row in reanalysis.stale_resumes(**filters))
+
+            self.assertEqual(matching(filename="cv_1.pdf"), ["cv_1.pdf"])
+            self.assertEqual(matching(filename_like="cv_1%"), ["cv_1.pdf", "cvx1.pdf"])
+            self.assertEqual(matching(filename_like="cv\\_1%"), ["cv_1.pdf"])
+
+    def test_checkpoint_of_another_run_is_ignored(self):
+        self.run_reanalysis(filename_like="old%")
+        result, analyze = self.run_reanalysis()
+        self.assertEqual([call.args[0] for call in analyze.call_args_list], ["C developer"])
+        self.assertEqual(result["done"], 1)
+
+    def test_dry_run_and_sample_write_nothing(self):
+        with self.app.app_context(), mock.patch.object(reanalysis, "get_resume_analysis",
+                                                       return_value={"skills": ["Go"]}) as analyze:
+            totals = reanalysis.estimate()
+            self.assertEqual((totals["resumes"], totals["requests"]), (3, 3))
+            self.assertGreater(totals["prompt_tokens"], 0)
+            analyze.assert_not_called()
+
+            report = reanalysis.sample(2)
+        self.assertEqual([entry["filename"] for entry in report], ["old1.pdf", "old2.pdf"])
+        self.assertEqual(report[0]["changed"], [])
+        self.assertIn("skills", report[1]["changed"])
+        self.assertEqual(self.versions()["old1.pdf"], ("1:old-model", ["Go"]))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+# tests/test_search.py
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.search.bm25 import BM25Index, tokenize
+from app.search.embedders import HashingEmbedder
+from app.search.vector_index import VectorIndex, VECTOR_COMPACT_MIN_ROWS
+from app.db_operations import save_candidate
+from app.llm_operations import llm_query
+from tests.helpers import AppTestCase
+
+
+class TestBM25Index(unittest.TestCase):
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.index_dir, "bm25.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+
+    def test_tokenize_keeps_tech_terms(self):
+        self.assertEqual(tokenize("Who knows C++, C# and Node.js?"), ["knows", "c++", "c#", "node.js"])
+
+    def test_ranking(self):
+        index = BM25Index(self.path)
+        index.add(1, "Python developer with Django and Kubernetes")
+        index.add(2, "Java developer, Spring Boot")
+        index.add(3, "Kubernetes Kubernetes operator, Go, Helm")
+        results = index.search("who knows kubernetes", k=5)
+        self.assertEqual([doc_id for doc_id, _ in results], [3, 1])
+
+    def test_updates_replace_documents_and_survive_reload(self):
+        index = BM25Index(self.path)
+        index.add(1, "Java developer")
+        index.add(1, "Rust developer")
+        index.add(2, "Java architect")
+        index.remove(2)
+        self.assertEqual(index.search("java"), [])
+
+        reloaded = BM25Index(self.path)
+        self.assertEqual(len(reloaded), 1)
+        self.assertEqual([doc_id for doc_id, _ in reloaded.search("rust")], [1])
+
+    def test_picks_up_appends_from_other_processes(self):
+        reader = BM25Index(self.path)
+        writer = BM25Index(self.path)
+        writer.add(7, "Terraform engineer")
+        self.assertEqual([doc_id for doc_id, _ in reader.search("terraform")], [7])
+
+    def test_compaction_keeps_documents(self):
+        index = BM25Index(self.path)
+        for i in range(200):
+            index.add(i % 10, f"candidate {i % 10} skill{i}")
+        self.assertEqual(len(index), 10)
+        with open(self.path) as f:
+            self.assertLess(sum(1 for _ in f), 200)
+        self.assertEqual([doc_id for doc_id, _ in BM25Index(self.path).search("skill199")], [9])
+
+    def test_reader_notices_compaction_by_another_process(self):
+        writer = BM25Index(self.path)
+        writer.add(0, "candidate 0")
+        reader = BM25Index(self.path)
+        # Stop right after a compaction: the new log is larger than the reader's old offset
+        i = 0
+        while i < 20 or writer._log_entries > 10:
+            i += 1
+            writer.add(i % 10, f"candidate {i % 10} skill{i}")
+        self.assertEqual(len(reader.search("candidate", k=20)), 10)
+        for doc_id in range(10):
+            latest = max(n for n in range(i + 1) if n % 10 == doc_id)
+            self.assertEqual([hit for hit, _ in reader.search(f"skill{latest}")], [doc_id])
+
+
+class TestVectorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.embedder = HashingEmbedder(dim=64)
+
+    def tearDown(self):
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+
+    def item(self, resume_id, *texts):
+        chunks = [("skills", text) for text in texts]
+        return resume_id, chunks, self.embedder.embed(texts)
+
+    def open_index(self):
+        return VectorIndex(self.index_dir, 64, "hashing")
+
+    def test_top_k_per_query(self):
+        index = self.open_index()
+        index.upsert([self.item(1, "python django rest apis"),
+                      self.item(2, "kubernetes helm terraform", "go microservices"),
+                      self.item(3, "figma ux research")])
+        results = index.search(self.embedder.embed(["kubernetes terraform", "ux research figma"]), k=1)
+        self.assertEqual(results[0][0][0]["resume_id"], 2)
+        self.assertEqual(results[1][0][0]["resume_id"], 3)
+
+    def test_update_replaces_rows_and_persists(self):
+        index = self.open_index()
+        index.upsert([self.item(1, "java spring")])
+        index.upsert([self.item(1, "rust tokio")])
+        hits = index.search(self.embedder.embed(["java spring"]), k=5)[0]
+        self.assertTrue(all(entry["text"] != "java spring" for entry, _ in hits))
+
+        reloaded = self.open_index()
+        hits = reloaded.search(self.embedder.embed(["rust tokio"]), k=5)[0]
+        self.assertEqual([(entry["resume_id"], entry["text"]) for entry, _ in hits], [(1, "rust tokio")])
+
+    def test_grows_past_initial_capacity_and_sees_other_writers(self):
+        reader = self.open_index()
+        writer = self.open_index()
+        writer.upsert([self.item(i, f"skill{i} engineer") for i in range(1500)])
+        hits = reader.search(self.embedder.embed(["skill1234 engineer"]), k=10)[0]
+        self.assertEqual(len(reader), 1500)
+        # 64 hash buckets collide; the exact match must still share the top score
+        top = [entry["resume_id"] for entry, score in hits if score >= hits[0][1] - 1e-6]
+        self.assertIn(1234, top)
+
+    def test_updates_are_compacted_and_readers_follow(self):
+        reader = self.open_index()
+        writer = self.open_index()
+        for round_ in range(6):
+            writer.upsert([self.item(i, f"skill{i} round{round_}") for i in range(300)])
+            reader.search(self.embedder.embed(["skill1"]), k=1)
+        self.assertGreater(writer._generation, 0)
+        self.assertLessEqual(writer._count, VECTOR_COMPACT_MIN_ROWS)
+        files = sorted(os.listdir(self.index_dir))
+        self.assertEqual([name for name in files if name.startswith(("vectors", "rows"))],
+                         [f"rows.{writer._generation}.jsonl", f"vectors.{writer._generation}.f32"])
+
+        for index in (reader, self.open_index()):
+            hits = index.search(self.embedder.embed(["skill42 round5"]), k=3)[0]
+            self.assertEqual(len(index), 300)
+            self.assertEqual(hits[0][0]["text"], "skill42 round5")
+            self.assertEqual(len({entry["resume_id"] for entry, _ in hits}), len(hits))
+
+    def test_embedder_change_discards_index(self):
+        self.open_index().upsert([self.item(1, "python")])
+        self.assertEqual(len(VectorIndex(self.index_dir, 32, "hashing")), 0)
+
+
+class TestRetrieval(AppTestCase):
+
+    def test_query_prompt_only_contains_relevant_cvs(self):
+        with self.app.app_context():
+            save_candidate("alice.pdf", "Alice - Kubernetes, Helm, Go", {"skills": ["Kubernetes"]})
+            save_candidate("bob.pdf", "Bob - Java, Spring", {"skills": ["Java"]})
+            save_candidate("carol.pdf", "Carol - Figma, UX research", {"skills": ["Figma"]})
+
+            cvs = llm_query.retrieve_relevant_cvs("who has kubernetes experience", k=2)
+            self.assertEqual([cv.filename for cv in cvs], ["alice.pdf"])
+
+            # No matching terms: fall back to a bounded sample instead of the whole table
+            self.assertEqual(len(llm_query.retrieve_relevant_cvs("summarize", k=2)), 2)
+
+    def test_semantic_search_endpoint(self):
+        with self.app.app_context():
+            save_candidate("alice.pdf", "Alice", {"skills": ["Kubernetes", "Helm"],
+                                                  "workExperience": [{"jobTitle": "SRE", "company": "Acme"}]})
+            save_candidate("bob.pdf", "Bob", {"skills": ["Java", "Spring"]})
+
+        response = self.app.test_client().get('/api/search/semantic?q=kubernetes helm&k=1')
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()['results']
+        self.assertEqual([(r['filename'], r['section']) for r in results], [("alice.pdf", "skills")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+# tests/test_uploads.py
+
+import os
+import hashlib
+import tempfile
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from werkzeug.datastructures import FileStorage
+
+from app import create_app, db
+from app import uploads
+from app.routes import upload as upload_routes
+
+
+def file_storage(data, filename="cv.pdf"):
+    return FileStorage(stream=BytesIO(data), filename=filename)
+
+
+class TestReceiveUpload(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(uploads, "UPLOAD_TMP_DIR", self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_small_file_stays_in_memory(self):
+        data = b"%PDF-1.4 small"
+        with uploads.receive_upload(file_storage(data, "../my cv.pdf")) as upload:
+            self.assertEqual(upload.source(), data)
+            self.assertIsNone(upload.path)
+            self.assertEqual(upload.filename, "my_cv.pdf")
+            self.assertEqual(upload.size, len(data))
+            self.assertEqual(upload.sha256, hashlib.sha256(data).hexdigest())
+
+    def test_large_file_is_spooled_and_removed_on_close(self):
+        data = os.urandom(200 * 1024)
+        upload = uploads.receive_upload(file_storage(data), memory_max_bytes=64 * 1024)
+        self.assertIsNone(upload.data)
+        self.assertTrue(upload.path.startswith(self.tmp.name))
+        with open(upload.source(), "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(upload.sha256, hashlib.sha256(data).hexdigest())
+
+        upload.close()
+        self.assertFalse(os.path.exists(upload.path))
+
+    def test_oversized_file_is_rejected_without_leftovers(self):
+        with self.assertRaises(uploads.UploadTooLarge):
+            uploads.receive_upload(file_storage(b"x" * 300 * 1024), max_bytes=256 * 1024,
+                                   memory_max_bytes=64 * 1024)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_to_file_uses_unique_names(self):
+        with uploads.receive_upload(file_storage(b"same")) as upload:
+            first, second = upload.to_file(self.tmp.name), upload.to_file(self.tmp.name)
+        self.assertNotEqual(first, second)
+        with open(first, "rb") as f:
+            self.assertEqual(f.read(), b"same")
+
+    def test_store_original_is_content_addressed(self):
+        store = os.path.join(self.tmp.name, "originals")
+        with uploads.receive_upload(file_storage(b"cv bytes", "a.PDF")) as first:
+            path = uploads.store_original(first, store)
+        with uploads.receive_upload(file_storage(b"cv bytes", "b.pdf")) as second:
+            self.assertEqual(uploads.store_original(second, store), path)
+
+        digest = hashlib.sha256(b"cv bytes").hexdigest()
+        self.assertEqual(path, os.path.join(store, digest[:2], f"{digest}.pdf"))
+        self.assertEqual(os.listdir(os.path.dirname(path)), [f"{digest}.pdf"])
+
+
+class TestUploadRoutes(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:"}):
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_upload_is_ingested_from_memory(self):
+        data = b"%PDF-1.4 in memory"
+        with mock.patch.object(upload_routes, "ingest_document") as ingest:
+            response = self.client.post('/api/', data={'file': (BytesIO(data), 'cv.pdf')},
+                                        content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+        ingest.assert_called_once_with(data, 'cv.pdf', content_hash=hashlib.sha256(data).hexdigest())
+
+    def test_oversized_file_returns_413(self):
+        with mock.patch.object(uploads, "UPLOAD_MAX_BYTES", 10), \
+                mock.patch.object(upload_routes, "ingest_document") as ingest:
+            response = self.client.post('/api/jobs', data={'file': (BytesIO(b"x" * 100), 'cv.pdf')},
+                                        content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('limit', response.get_json()['error'])
+        ingest.assert_not_called()
+
+    def test_oversized_request_returns_413(self):
+        self.app.config['MAX_CONTENT_LENGTH'] = 100
+        response = self.client.post('/api/jobs', data={'file': (BytesIO(b"x" * 1000), 'cv.pdf')},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 413)
+
+
+if __name__ == '__main__':
+    unittest.main()